@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 from utils.database import save_report
 from datetime import datetime
 from services.langfuse_helper import LangfuseGeminiWrapper, get_user_id, get_session_id
+from utils.rerun_profiler import profiled_fragment, rerun_fragment
 
 
 load_dotenv()
@@ -21,7 +22,12 @@ def render_career_growth_quiz():
     st.markdown('<div class="cc-page-active">', unsafe_allow_html=True)
     st.header("↗ Career Growth Quiz")
     st.markdown('</div>', unsafe_allow_html=True)
+    render_quiz()
 
+
+@profiled_fragment("career_growth_quiz")
+def render_quiz():
+    """Mode choice, questions and report; answering a question reruns only this fragment"""
     has_cv_data = bool(st.session_state.get("cv_data"))
     if "quiz_mode" not in st.session_state:
         st.session_state.quiz_mode = None
@@ -32,7 +38,7 @@ def render_career_growth_quiz():
             if st.button("← Restart", width='stretch', key="restart_quiz_btn"):
                 st.session_state.quiz_mode = None
                 _reset_quiz_state()
-                st.rerun()
+                rerun_fragment()
         st.divider()
 
     # back to mode chooser
@@ -40,7 +46,7 @@ def render_career_growth_quiz():
         if st.button("← Back to options", width='stretch'):
             st.session_state.quiz_mode = None
             _reset_quiz_state()
-            st.rerun()
+            rerun_fragment()
 
     # decide mode
     if st.session_state.quiz_mode is None:
@@ -51,12 +57,12 @@ def render_career_growth_quiz():
                 if st.button("✓ Use my CV", width='stretch', type="primary"):
                     st.session_state.quiz_mode = "with_cv"
                     _reset_quiz_state()
-                    st.rerun()
+                    rerun_fragment()
             with col2:
                 if st.button("⃠ Continue without CV", width='stretch'):
                     st.session_state.quiz_mode = "no_cv"
                     _reset_quiz_state()
-                    st.rerun()
+                    rerun_fragment()
             
             st.divider()
             st.caption("✂ Or prepare your CV first:")
@@ -80,7 +86,7 @@ def render_career_growth_quiz():
                 if st.button("⃠ Continue without a CV", width='stretch', type="primary"):
                     st.session_state.quiz_mode = "no_cv"
                     _reset_quiz_state()
-                    st.rerun()
+                    rerun_fragment()
 
             with col2:
                 if st.button("✓ I already have a CV", width='stretch'):
@@ -104,12 +110,12 @@ def render_career_growth_quiz():
         with col1:
             if st.button("↩ Go to CV Analysis", width='stretch', type="primary"):
                 st.session_state.redirect_to = "CV Analysis"
-                st.stop()
+                st.rerun()
         with col2:
             if st.button("⃠ Continue without a CV instead", width='stretch'):
                 st.session_state.quiz_mode = "no_cv"
                 _reset_quiz_state()
-                st.rerun()
+                rerun_fragment()
         return
 
     if st.session_state.quiz_mode == "with_cv":
@@ -192,7 +198,7 @@ def _render_quiz_intro():
     if st.button("⟡ Start Career Growth Quiz", width='stretch', type="primary"):
         st.session_state.quiz_started = True
         _generate_experience_questions()
-        st.rerun()
+        rerun_fragment()
 
 def _generate_experience_questions():
     mode = st.session_state.quiz_mode
@@ -246,6 +252,7 @@ Rules:
                 temperature=0.3,
                 user_id=get_user_id(),
                 session_id=get_session_id(),
+                feature="career_growth_experience_questions",
             )
             text = text.strip()
 
@@ -334,10 +341,10 @@ def _render_quiz_questions():
             st.session_state.quiz_phase = 2
             st.session_state.current_question_index = 0
             _generate_softskills_questions()
-            st.rerun()
+            rerun_fragment()
         else:
             _generate_final_report()
-            st.rerun()
+            rerun_fragment()
         return
 
     q = questions[idx]
@@ -385,7 +392,7 @@ def _render_quiz_questions():
     with col1:
         if idx > 0 and st.button("← Back", width='stretch'):
             st.session_state.current_question_index -= 1
-            st.rerun()
+            rerun_fragment()
     with col2:
         if st.button("Next →", width='stretch', type="primary"):
             if q_type == "slider":
@@ -405,7 +412,7 @@ def _render_quiz_questions():
                 "aspect": q.get("aspect", "unknown"),
             }
             st.session_state.current_question_index += 1
-            st.rerun()
+            rerun_fragment()
 
 def _generate_softskills_questions():
     exp_answers = st.session_state.experience_answers
@@ -442,6 +449,7 @@ Rules:
                 temperature=0.3,
                 user_id=get_user_id(),
                 session_id=get_session_id(),
+                feature="career_growth_softskills_questions",
             ).strip()
 
             if text.startswith("```json"):
@@ -526,18 +534,19 @@ At the TOP of your response, add: SECTOR: [one word sector]
 """
 
     try:
-        with st.spinner("Generating your career growth report..."):
-            text = QUIZ_GEMINI.generate_content(
-                prompt=prompt,
-                system_instruction=(
-                    "You are a senior career counselor. "
-                    "Return a concise markdown report starting with 'SECTOR: ...'."
-                ),
-                temperature=0.3,
-                user_id=get_user_id(),
-                session_id=get_session_id(),
-            )
-            st.session_state.quiz_final_report = text
+        st.caption("Generating your career growth report...")
+        text = st.write_stream(QUIZ_GEMINI.generate_content_stream(
+            prompt=prompt,
+            system_instruction=(
+                "You are a senior career counselor. "
+                "Return a concise markdown report starting with 'SECTOR: ...'."
+            ),
+            temperature=0.3,
+            user_id=get_user_id(),
+            session_id=get_session_id(),
+            feature="career_growth_report",
+        ))
+        st.session_state.quiz_final_report = text
     except Exception as e:
         st.error(f"Error generating report: {e}")
         st.session_state.quiz_final_report = "There was an error generating your report."
@@ -9,6 +9,10 @@ from utils.database import save_report, save_user_cv, load_reports
 from google.genai import types
 
 load_dotenv()
+GEMINI = LangfuseGeminiWrapper(
+    api_key=os.getenv("GOOGLE_API_KEY"),
+    model="gemini-2.5-flash",
+)
 
 CV_SCHEMA = {
     "full_name": "What is the full name of the candidate?",
@@ -23,11 +27,6 @@ CV_SCHEMA = {
 
 def _extract_structured_multimodal(uploaded_file, schema: dict):
     """Extract structured CV data using native multimodal processing."""
-    GEMINI = LangfuseGeminiWrapper(
-        api_key=os.getenv("GOOGLE_API_KEY"), 
-        model="gemini-2.5-flash"
-    )
-    
     if hasattr(uploaded_file, 'seek'):
         uploaded_file.seek(0)
     file_bytes = uploaded_file.read()
@@ -198,11 +197,6 @@ CV DATA:
 {cv_text}
 """
             
-            GEMINI = LangfuseGeminiWrapper(
-                api_key=os.getenv("GOOGLE_API_KEY"), 
-                model="gemini-2.5-flash"
-            )
-            
             feedback = GEMINI.generate_content(
                 prompt=feedback_prompt,
                 temperature=0.3,
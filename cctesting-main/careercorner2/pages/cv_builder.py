@@ -259,19 +259,19 @@ def render_cover_letter():
         )
 
     if st.button("Generate Cover Letter", width="stretch", type="primary", key="gen_cover") and job_desc.strip():
-        with st.spinner("Writing your letter..."):
-            cover_letter = generate_cover_letter(profile, job_desc, tone, length)
-            st.session_state.cover_letter = cover_letter
+        st.divider()
+        st.subheader("Your Cover Letter")
+        content = st.write_stream(stream_cover_letter(profile, job_desc, tone, length))
+        cover_letter = {
+            "job_title": _job_title_from_letter(content),
+            "content": content,
+        }
+        st.session_state.cover_letter = cover_letter
 
-        content = cover_letter["content"]
-        job_title = cover_letter.get("job_title", "role")
+        job_title = cover_letter["job_title"]
         
         st.success("Cover letter generated!")
         
-        st.divider()
-        st.subheader("Your Cover Letter")
-        st.markdown(content)
-        
         st.download_button(
             "Download Cover Letter (TXT)",
             data=content,
@@ -312,6 +312,7 @@ Return ONLY the JSON, no markdown formatting."""
             temperature=0.4,
             user_id=get_user_id(),
             session_id=get_session_id(),
+            feature="cv_polish",
         )
         cleaned = resp.strip()
         if cleaned.startswith("```"):
@@ -325,9 +326,9 @@ Return ONLY the JSON, no markdown formatting."""
         return quiz_data
 
 
-def generate_cover_letter(cv_data: dict, job_desc: str, tone: str, length: str) -> dict:
+def stream_cover_letter(cv_data: dict, job_desc: str, tone: str, length: str):
+    """Streaming the cover letter as plain text so it renders while being written"""
     name = cv_data.get("name") or cv_data.get("full_name", "")
-    email = cv_data.get("email", "")
     
     word_count = 200 if "Short" in length else 350
     
@@ -346,34 +347,33 @@ Requirements:
 - Include specific examples from the candidate's experience that match the job requirements
 - Show enthusiasm and fit for the role
 
-Return ONLY valid JSON with this structure:
-{{
-  "job_title": "extracted job title from description",
-  "content": "Full cover letter text starting with 'Dear Hiring Manager,' and ending with 'Best regards,\\\\n{name}'"
-}}
+Output format:
+- First line: "Re: [job title extracted from the description]"
+- Then a blank line, then the letter starting with 'Dear Hiring Manager,' and ending with 'Best regards,\n{name}'
 
-Return ONLY the JSON, no markdown formatting."""
+Return ONLY the letter text, no JSON and no markdown code blocks."""
 
     try:
-        resp = GEMINI.generate_content(
+        yield from GEMINI.generate_content_stream(
             prompt=prompt,
             temperature=0.7,
             user_id=get_user_id(),
             session_id=get_session_id(),
+            metadata={"type": "cover_letter"},
         )
-        cleaned = resp.strip()
-        if cleaned.startswith("```"):
-            cleaned = cleaned.split("```")[1]
-            if cleaned.startswith("json"):
-                cleaned = cleaned[4:]
-        cleaned = cleaned.strip()
-        return json.loads(cleaned)
     except Exception as e:
         print("Cover letter error:", e)
-        return {
-            "job_title": "Role",
-            "content": f"Dear Hiring Manager,\\n\\n[Cover letter based on the job ad goes here.]\\n\\nBest regards,\\n{name}",
-        }
+        yield f"Dear Hiring Manager,\n\n[Cover letter based on the job ad goes here.]\n\nBest regards,\n{name}"
+
+
+def _job_title_from_letter(content: str) -> str:
+    """Reading the job title back from the 'Re: ...' line of a streamed letter"""
+    first_line = content.strip().split("\n", 1)[0].strip()
+    if first_line.lower().startswith("re:"):
+        title = first_line[3:].strip().strip("*").strip()
+        if title:
+            return title
+    return "role"
 
 
 def generate_cv_json(cv_data: dict) -> bytes:
@@ -12,6 +12,12 @@ from pathlib import Path
 import tempfile
 warnings.filterwarnings("ignore", message=".*Session State.*|.*widget with key.*")
 
+load_dotenv()
+GEMINI = LangfuseGeminiWrapper(
+    api_key=os.getenv("GOOGLE_API_KEY"),
+    model="gemini-2.5-flash",
+)
+
 def _sector_with_other(label: str, key_prefix: str, default: str | None = None):
     options = ["Technology", "Healthcare", "Business", "Engineering", "Creative", "Other"]
     sector = st.selectbox(
@@ -218,7 +224,7 @@ def render_interactive_questions(sector):
         st.error("GOOGLE_API_KEY missing")
         return
 
-    gemini_client = LangfuseGeminiWrapper(api_key=api_key, model="gemini-2.5-flash")
+    gemini_client = GEMINI
     user_id = get_user_id()
     session_id = get_session_id()
 
@@ -326,21 +332,20 @@ def generate_final_report(gemini_client, sector, user_id, session_id):
         render_save_and_next_controls(sector, st.session_state.degree_final_report)
         return
 
-    with st.spinner("Generating recommendations..."):
-        answers_summary = "\n".join(
-            [f"Q: {q}\nA: {a}" for q, a in st.session_state.degree_answers.items()]
-        )
-        grades_context = (
-            f"\nGrades: {st.session_state.get('grades_data', 'N/A')}"
-            if "grades_data" in st.session_state
-            else ""
-        )
+    answers_summary = "\n".join(
+        [f"Q: {q}\nA: {a}" for q, a in st.session_state.degree_answers.items()]
+    )
+    grades_context = (
+        f"\nGrades: {st.session_state.get('grades_data', 'N/A')}"
+        if "grades_data" in st.session_state
+        else ""
+    )
 
-        region = st.session_state.get("degree_region", "International")
+    region = st.session_state.get("degree_region", "International")
 
-        # portugal validation
-        if region == "Portugal":
-            report_prompt = f"""You are a DGES specialist creating a degree recommendation for a Portuguese student.
+    # portugal validation
+    if region == "Portugal":
+        report_prompt = f"""You are a DGES specialist creating a degree recommendation for a Portuguese student.
 
 SECTOR: {sector}
 STUDENT ANSWERS:
@@ -398,8 +403,8 @@ OUTPUT FORMAT:
 2. Research these specific universities: [list 3-4]
 3. Prepare for exams: [specific subjects]
 """
-        else:
-            report_prompt = f"""You are an international university advisor creating degree recommendations.
+    else:
+        report_prompt = f"""You are an international university advisor creating degree recommendations.
 
 SECTOR: {sector}
 STUDENT ANSWERS:
@@ -443,24 +448,24 @@ OUTPUT FORMAT:
 ## Challenges + Solutions
 ## Next Steps
 """
-        try:
-            # generating main report
-            report = gemini_client.generate_content(
-                prompt=report_prompt,
-                system_instruction=(
-                    "DGES specialist for Portuguese students. STRICT validation required."
-                    if region == "Portugal"
-                    else "International university advisor. No restrictions."
-                ),
-                temperature=0.4 if region == "Portugal" else 0.6,
-                user_id=user_id,
-                session_id=session_id,
-                metadata={"type": "degree_report", "region": region},
-            )
-            st.session_state.degree_final_report = report
-
-            # extracting degree names for university finder
-            degrees_prompt = f"""
+    try:
+        # streaming main report so the first lines show up straight away
+        report = st.write_stream(gemini_client.generate_content_stream(
+            prompt=report_prompt,
+            system_instruction=(
+                "DGES specialist for Portuguese students. STRICT validation required."
+                if region == "Portugal"
+                else "International university advisor. No restrictions."
+            ),
+            temperature=0.4 if region == "Portugal" else 0.6,
+            user_id=user_id,
+            session_id=session_id,
+            metadata={"type": "degree_report", "region": region},
+        ))
+        st.session_state.degree_final_report = report
+
+        # extracting degree names for university finder
+        degrees_prompt = f"""
 From the report below, extract at most 3 SHORT degree names.
 
 Rules:
@@ -473,7 +478,8 @@ Rules:
 REPORT:
 {report}
 """
-            try:
+        try:
+            with st.spinner("Extracting recommended degrees..."):
                 degrees_json = gemini_client.generate_content(
                     prompt=degrees_prompt,
                     system_instruction="Extract degree names as clean JSON array.",
@@ -482,31 +488,30 @@ REPORT:
                     session_id=session_id,
                     metadata={"type": "degree_recommended_list"},
                 )
-                st.session_state.recommended_degrees = json.loads(degrees_json)
-            except Exception:
-                st.session_state.recommended_degrees = []
-
-            # auto saving
-            if "username" in st.session_state and st.session_state.username:
-                if not st.session_state.get("degree_report_saved", False):
-                    try:
-                        save_report(
-                            user_id=st.session_state.username,
-                            report_type="degree",
-                            title=f"Degree Picker - {sector} ({region}) - {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-                            content=report,
-                            cv_data=None,
-                        )
-                        st.session_state.degree_report_saved = True
-                        st.success("🗂️ Report automatically saved to My Reports!")
-                    except Exception as e:
-                        st.warning(f"Could not auto-save: {e}")
-
-            st.markdown(report)
-            render_save_and_next_controls(sector, report)
-
-        except Exception as e:
-            st.error(f"⃠ Report error: {e}")
+            st.session_state.recommended_degrees = json.loads(degrees_json)
+        except Exception:
+            st.session_state.recommended_degrees = []
+
+        # auto saving
+        if "username" in st.session_state and st.session_state.username:
+            if not st.session_state.get("degree_report_saved", False):
+                try:
+                    save_report(
+                        user_id=st.session_state.username,
+                        report_type="degree",
+                        title=f"Degree Picker - {sector} ({region}) - {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+                        content=report,
+                        cv_data=None,
+                    )
+                    st.session_state.degree_report_saved = True
+                    st.success("🗂️ Report automatically saved to My Reports!")
+                except Exception as e:
+                    st.warning(f"Could not auto-save: {e}")
+
+        render_save_and_next_controls(sector, report)
+
+    except Exception as e:
+        st.error(f"⃠ Report error: {e}")
 
 
 def render_save_and_next_controls(sector, report):
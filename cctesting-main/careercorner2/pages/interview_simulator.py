@@ -248,6 +248,7 @@ Return ONLY valid JSON:
                 temperature=0.5,
                 user_id=get_user_id(),
                 session_id=get_session_id(),
+                feature="interview_practice_questions",
             )
 
             response_text = response.strip()
@@ -321,6 +322,7 @@ Return ONLY JSON with question, category, and tips for each.
                 temperature=0.5,
                 user_id=get_user_id(),
                 session_id=get_session_id(),
+                feature="interview_mock_questions",
             )
 
             response_text = response.strip()
@@ -490,15 +492,16 @@ Be constructive, specific, and encouraging. Use markdown formatting.
 """
 
     try:
-        with st.spinner("Analyzing your interview performance..."):
-            feedback = INTERVIEW_GEMINI.generate_content(
-                prompt=prompt,
-                system_instruction="You are an experienced interview coach providing constructive feedback.",
-                temperature=0.6,
-                user_id=get_user_id(),
-                session_id=get_session_id(),
-            )
-            st.session_state.interview_feedback = feedback
+        st.caption("Analyzing your interview performance...")
+        feedback = st.write_stream(INTERVIEW_GEMINI.generate_content_stream(
+            prompt=prompt,
+            system_instruction="You are an experienced interview coach providing constructive feedback.",
+            temperature=0.6,
+            user_id=get_user_id(),
+            session_id=get_session_id(),
+            feature="interview_feedback",
+        ))
+        st.session_state.interview_feedback = feedback
     except Exception as e:
         st.error(f"Error: {e}")
 
@@ -7,8 +7,14 @@ from services.langfuse_helper import (
     get_session_id,
     log_user_feedback,
 )
+from services.chat_engine import session_chat_engine
+from utils.rerun_profiler import profiled_fragment, rerun_fragment
 
 load_dotenv()
+DASHBOARD_GEMINI = LangfuseGeminiWrapper(
+    api_key=os.getenv("GOOGLE_API_KEY"),
+    model="gemini-2.5-flash",
+)
 
 def render_dashboard_chat():
     """Rendering the AI-powered dashboard chat interface"""
@@ -38,16 +44,23 @@ def render_dashboard_chat():
     If you're still unsure what option to pick, let me help you!</p>
     """
     st.markdown(typewriter_html, unsafe_allow_html=True)
-    
+    render_chat()
+
+
+@profiled_fragment("professional_chat")
+def render_chat():
+    """Chat history, input and recommendations; a chat turn reruns only this fragment"""
     col1, col2 = st.columns([3, 1])
     with col2:
         if st.button("⟲ Start Over"):
             st.session_state.professional_chat_history = []
+            if "professional_chat_engine" in st.session_state:
+                st.session_state.professional_chat_engine.reset()
             st.session_state.conversation_turn = 0
             st.session_state.recommended_option = None
             if "professional_trace_ids" in st.session_state:
                 st.session_state.professional_trace_ids = []
-            st.rerun()
+            rerun_fragment()
 
     load_dotenv()
     api_key = os.getenv("GOOGLE_API_KEY")
@@ -56,33 +69,44 @@ def render_dashboard_chat():
         st.error("GOOGLE_API_KEY not found in your .env file.")
         return
 
-    gemini_client = LangfuseGeminiWrapper(
-        api_key=api_key,
-        model="gemini-2.5-flash"
-    )
+    gemini_client = DASHBOARD_GEMINI
     
     user_id = get_user_id()
     session_id = get_session_id()
+
+    # structured multi-turn history, compacted to a token budget and persisted per user
+    chat_engine = session_chat_engine(
+        st.session_state,
+        "professional_chat_engine",
+        gemini_client,
+        user_id,
+        chat_key="professional_dashboard",
+        feature="professional_dashboard_assistant",
+    )
     
     if "conversation_turn" not in st.session_state:
-        st.session_state.conversation_turn = 0
+        st.session_state.conversation_turn = chat_engine.turn
     
     if "professional_chat_history" not in st.session_state:
-        st.session_state.professional_chat_history = []
+        st.session_state.professional_chat_history = chat_engine.messages()
 
     user_input = st.chat_input("Ask Career Corner Assistant anything about your career!", key="prof_chat_input")
     
+    # displaying previous messages before streaming the new turn
+    if chat_engine.summary:
+        st.caption("Earlier messages in this chat were summarized.")
+    for msg in st.session_state.professional_chat_history:
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
+
     if user_input:
         st.session_state.conversation_turn += 1
         st.session_state.professional_chat_history.append({
             "role": "user", 
             "content": user_input
         })
-
-        conversation_context = "\n".join([
-            f"{msg['role'].upper()}: {msg['content']}" 
-            for msg in st.session_state.professional_chat_history[-4:]
-        ])
+        with st.chat_message("user"):
+            st.markdown(user_input)
 
         system_instruction = f"""You are Career Corner Assistant, a friendly career counselor.
 
@@ -104,26 +128,24 @@ Have completely natural conversations like talking to a colleague about career.
 TOOLS (recommend ONLY after 5 questions): CV Analysis, Career Growth, Your Next Steps, Interview Prep, CV Builder, My Reports
 
 Current turn: {st.session_state.conversation_turn}
-Previous context:
-{conversation_context}
 """
 
         try:
-            ai_message = gemini_client.generate_content(
-                prompt=user_input,
-                system_instruction=system_instruction,
-                temperature=0.4,
-                user_id=user_id,
-                session_id=session_id,
-                metadata={
-                    "conversation_type": "professional_dashboard_assistant",
-                    "user_type": "professional",
-                    "turn": st.session_state.conversation_turn,
-                    "message_count": len(st.session_state.professional_chat_history)
-                }
-            )
+            with st.chat_message("assistant"):
+                ai_message = st.write_stream(chat_engine.stream_reply(
+                    user_input,
+                    system_instruction=system_instruction,
+                    temperature=0.4,
+                    session_id=session_id,
+                    metadata={
+                        "conversation_type": "professional_dashboard_assistant",
+                        "user_type": "professional",
+                        "turn": st.session_state.conversation_turn,
+                        "message_count": len(st.session_state.professional_chat_history)
+                    }
+                ))
             
-            current_trace_id = gemini_client.last_trace_id
+            current_trace_id = chat_engine.finish_turn(session_id)
             if "professional_trace_ids" not in st.session_state:
                 st.session_state.professional_trace_ids = []
             st.session_state.professional_trace_ids.append(current_trace_id)
@@ -154,10 +176,6 @@ Previous context:
         if "student dashboard" in ai_message.lower():
             st.session_state.show_student_redirect = True
 
-    for idx, msg in enumerate(st.session_state.professional_chat_history):
-        with st.chat_message(msg["role"]):
-            st.markdown(msg["content"])
-
     if st.session_state.get("recommended_option") and st.session_state.professional_choice != st.session_state.recommended_option:
         st.markdown("---")
         st.success(f"⟡ Ready to get started with **{st.session_state.recommended_option}**?")
@@ -188,5 +206,5 @@ Previous context:
                 st.rerun()
         with col2:
             if st.button("Stay on Professional Dashboard", width='stretch', on_click=stay_professional, key="stay_prof_btn"):
-                st.rerun()
+                rerun_fragment()
 
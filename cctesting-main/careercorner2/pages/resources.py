@@ -2,8 +2,12 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 from google.genai import types
-from services.langfuse_helper import LangfuseGeminiWrapper
-from utils.database import load_reports
+from services.langfuse_helper import LangfuseGeminiWrapper, get_session_id
+from services.session_budget import restore_offloaded
+from services.context_cache import session_context_cache, close_session_cache
+from services.tool_loop import run_tool_loop
+from services.user_context import UserContext
+from services.report_index import use_retrieval, retrieve_excerpts
 from services.tools import (
     render_job_search_tool,
     render_course_finder_tool,
@@ -96,11 +100,11 @@ def render_resources_chat():
 
     user_id = st.session_state.get("username", "demo_user")
     
-    # Load all CVs (from both CV Analysis and CV Builder - same report type)
-    cv_reports = load_reports(user_id, "professional_cv") or []
-    
-    # Load quizzes
-    quiz_reports = load_reports(user_id, "professional_career_quiz") or []
+    # CVs (from both CV Analysis and CV Builder - same report type) and quizzes in one query,
+    # the same snapshot is handed to the function-calling tools below
+    user_context = UserContext.for_professional(user_id)
+    cv_reports = user_context.reports("professional_cv")
+    quiz_reports = user_context.reports("professional_career_quiz")
     
     col1, col2 = st.columns(2)
     with col1:
@@ -136,14 +140,77 @@ def render_resources_chat():
 • CVs: {len(cv_reports)} available
 • Quizzes: {len(quiz_reports)} available"""
 
+    # long reports aren't pasted whole: each message gets the most relevant excerpts instead
+    retrieval = use_retrieval(selected_cv_data, selected_quiz_data)
+    if retrieval:
+        cv_context = "Relevant excerpts are attached to each message"
+        quiz_context = "Relevant excerpts are attached to each message" if selected_quiz_data else "No quiz completed"
+    else:
+        cv_context = selected_cv_data.get('content', 'No CV uploaded') if selected_cv_data else 'No CV uploaded'
+        quiz_context = selected_quiz_data.get('content', 'No quiz completed') if selected_quiz_data else 'No quiz completed'
+
     # internal context for the ai
     internal_context = f"""You have access to this professional's data:
 
 SELECTED CV: {selected_cv_data.get('title', 'None') if selected_cv_data else 'None'}
-CV Content: {selected_cv_data.get('content', 'No CV uploaded') if selected_cv_data else 'No CV uploaded'}
+CV Content: {cv_context}
 
 SELECTED CAREER QUIZ: {selected_quiz_data.get('title', 'None') if selected_quiz_data else 'None'}
-Quiz Content: {selected_quiz_data.get('content', 'No quiz completed') if selected_quiz_data else 'No quiz completed'}"""
+Quiz Content: {quiz_context}"""
+
+    # static per chat session: sent once as a cached system instruction, not with every message
+    system_instruction = f"""{internal_context}
+
+USER_ID: {user_id}
+
+INSTRUCTIONS:
+- Be supportive, empathetic, and encouraging
+- Reference their CV/quiz data specifically when relevant
+- **IMPORTANT: When using tools, ALWAYS pass user_id: {user_id}**
+
+HANDLING MISSING DATA:
+- If tool returns "has_data": False, politely redirect them:
+  "You need to complete [CV Analysis/Career Quiz] first. Click **← Back to Quick Search**, 
+   complete it, then return here for personalized insights!"
+- Be encouraging and explain the benefit of completing it
+- If they only have CV (no quiz), tools still work but mention quiz is optional for better results
+
+REDIRECT TO QUICK SEARCH TOOLS:
+If they ask for any of these, tell them to use Quick Search instead:
+- Job listings, job links, job postings → "Use the Job Search tool in Quick Search"
+- Course links, online courses, Udemy/Coursera → "Use the Course Finder tool in Quick Search"
+- Salary info, wage data, pay ranges → "Use the Wage Finder tool in Quick Search"
+- LinkedIn optimization, profile tips → "Use the LinkedIn Optimizer tool in Quick Search"
+- Company info, reviews, culture → "Use the Company Research tool in Quick Search"
+
+DO NOT provide links or search results for these - ONLY redirect them.
+
+WHEN TO USE TOOLS:
+- Use analyze_skill_gaps when they mention a target role and want to know what skills they need
+- Use get_career_roadmap when they ask about steps, timeline, or how to transition to a role
+- Use compare_career_paths when they're deciding between 2-3 career options
+- Use calculate_career_readiness when they ask if they're ready for a role or want a readiness score
+- Use rank_career_readiness when they ask which roles they're most ready for or have no target role yet
+
+NOTE: Their CV and quiz data is already available in context - you don't need to fetch it.
+
+NUDGE STRATEGY:
+- If they ask a vague question (e.g., "help me", "what should I do?", "I'm confused"), respond supportively BUT:
+  1. Acknowledge their feelings
+  2. Offer to use a specific tool to help them
+  3. Ask a clarifying question that would trigger a tool
+  
+Examples:
+- "I need career advice" → "I'd love to help! Would you like me to analyze your CV to see your strengths? Or tell me a role you're interested in and I can show you what skills you need?"
+- "I'm lost" → "Let's figure this out together. Want me to check what careers match your personality from your quiz? Or do you have a dream role in mind that I can create a roadmap for?"
+- "Help" → "I'm here for you! I can look at your skills, analyze career paths, or build you a roadmap. What would be most helpful right now?"
+
+RULES:
+- Suggest courses/skills by NAME only (e.g., "Consider learning Python" - no links)
+- **If they ask for job/course/salary/company links, redirect to Quick Search tools**
+- Focus on guidance and support, not direct job searches
+- Always acknowledge tool results naturally in your response
+- **GENTLY GUIDE vague questions toward specific tool-triggering questions**"""
     
     welcome_message = f"""Hi! I'm here to support you on your career journey!
 
@@ -164,6 +231,7 @@ I can help you with:
 
 What's on your mind today?"""
 
+    restore_offloaded(st.session_state, get_session_id(), "resources_chat_history")
     if "resources_chat_history" not in st.session_state:
         st.session_state.resources_chat_history = [
             {"role": "assistant", "content": welcome_message}
@@ -180,141 +248,46 @@ What's on your mind today?"""
         
         with st.chat_message("assistant"):
             with st.spinner("𖦹 Thinking..."):
-                # Function calling setup
-                contents = [types.Content(role="user", parts=[types.Part(text=f"""{internal_context}
-    
-    USER_ID: {user_id}
-    
-    User question: {prompt}
-    
-    INSTRUCTIONS:
-    - Be supportive, empathetic, and encouraging
-    - Reference their CV/quiz data specifically when relevant
-    - **IMPORTANT: When using tools, ALWAYS pass user_id: {user_id}**
-    
-    HANDLING MISSING DATA:
-    - If tool returns "has_data": False, politely redirect them:
-      "You need to complete [CV Analysis/Career Quiz] first. Click **← Back to Quick Search**, 
-       complete it, then return here for personalized insights!"
-    - Be encouraging and explain the benefit of completing it
-    - If they only have CV (no quiz), tools still work but mention quiz is optional for better results
-    
-    REDIRECT TO QUICK SEARCH TOOLS:
-    If they ask for any of these, tell them to use Quick Search instead:
-    - Job listings, job links, job postings → "Use the Job Search tool in Quick Search"
-    - Course links, online courses, Udemy/Coursera → "Use the Course Finder tool in Quick Search"
-    - Salary info, wage data, pay ranges → "Use the Wage Finder tool in Quick Search"
-    - LinkedIn optimization, profile tips → "Use the LinkedIn Optimizer tool in Quick Search"
-    - Company info, reviews, culture → "Use the Company Research tool in Quick Search"
-    
-    DO NOT provide links or search results for these - ONLY redirect them.
-    
-    WHEN TO USE TOOLS:
-    - Use analyze_skill_gaps when they mention a target role and want to know what skills they need
-    - Use get_career_roadmap when they ask about steps, timeline, or how to transition to a role
-    - Use compare_career_paths when they're deciding between 2-3 career options
-    - Use calculate_career_readiness when they ask if they're ready for a role or want a readiness score
-    
-    NOTE: Their CV and quiz data is already available in context - you don't need to fetch it.
-
-    NUDGE STRATEGY:
-    - If they ask a vague question (e.g., "help me", "what should I do?", "I'm confused"), respond supportively BUT:
-      1. Acknowledge their feelings
-      2. Offer to use a specific tool to help them
-      3. Ask a clarifying question that would trigger a tool
-      
-    Examples:
-    - "I need career advice" → "I'd love to help! Would you like me to analyze your CV to see your strengths? Or tell me a role you're interested in and I can show you what skills you need?"
-    - "I'm lost" → "Let's figure this out together. Want me to check what careers match your personality from your quiz? Or do you have a dream role in mind that I can create a roadmap for?"
-    - "Help" → "I'm here for you! I can look at your skills, analyze career paths, or build you a roadmap. What would be most helpful right now?"
-    
-    RULES:
-    - Suggest courses/skills by NAME only (e.g., "Consider learning Python" - no links)
-    - **If they ask for job/course/salary/company links, redirect to Quick Search tools**
-    - Focus on guidance and support, not direct job searches
-    - Always acknowledge tool results naturally in your response
-    - **GENTLY GUIDE vague questions toward specific tool-triggering questions**""")])]
-
+                turn_text = prompt
+                if retrieval:
+                    excerpts = retrieve_excerpts(
+                        user_id, prompt, user_context.reports_by_type, [selected_cv_data, selected_quiz_data]
+                    )
+                    turn_text = f"Relevant excerpts from their CV/quiz:\n{excerpts}\n\nUser: {prompt}"
+                contents = [types.Content(role="user", parts=[types.Part(text=turn_text)])]
                 
-                config = types.GenerateContentConfig(
+                # instructions + CV/quiz context are cached once per chat session and referenced by name
+                chat_cache = session_context_cache(
+                    st.session_state,
+                    "resources_context_cache",
+                    GEMINI_CHAT.client,
+                    "gemini-2.5-flash",
+                    system_instruction,
                     tools=[PROFESSIONAL_TOOLS],
-                    temperature=0.7
                 )
                 
-                response = GEMINI_CHAT.client.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=contents,
-                    config=config
+                # tool calls of a round run concurrently, over up to TOOL_LOOP_MAX_STEPS rounds
+                response = run_tool_loop(
+                    lambda contents: chat_cache.generate_content(
+                        contents,
+                        feature="resources_chat",
+                        temperature=0.7,
+                    ),
+                    contents,
+                    execute_function_call,
+                    on_tool_call=lambda name: st.caption(f"🔧 Using: {name}"),
+                    memo_seed={user_context.memo_key: user_context},
                 )
-                
-                response_text = None
-                
-                # CHECK: Does response have actual content?
-                if not response.candidates or not response.candidates[0].content.parts:
-                    # Empty response - retry without tools
-                    st.caption("⚠ Retrying...")
-                    response_text = GEMINI_CHAT.generate_content(
-                        prompt=f"{internal_context}\n\nUser: {prompt}",
-                        user_id=user_id,
-                        session_id=user_id,
-                        temperature=0.7
-                    )
-                
-                # Handle function calls if present
-                elif hasattr(response.candidates[0].content.parts[0], 'function_call'):
-                    function_responses = []
-                    for part in response.candidates[0].content.parts:
-                        try:
-                            if hasattr(part, 'function_call') and part.function_call:
-                                fn_call = part.function_call
-                                
-                                if not fn_call or not hasattr(fn_call, 'name') or not fn_call.name:
-                                    continue
-                                
-                                st.caption(f"🔧 Using: {fn_call.name}")
-                                result = execute_function_call(fn_call.name, dict(fn_call.args))
-                                function_responses.append(
-                                    types.Part.from_function_response(
-                                        name=fn_call.name,
-                                        response={"result": result}
-                                    )
-                                )
-                        except AttributeError:
-                            continue
-                        except Exception as e:
-                            st.warning(f"⚠ Function call failed: {e}")
-                            continue
-                    
-                    if function_responses:
-                        contents.append(response.candidates[0].content)
-                        contents.append(types.Content(role="user", parts=function_responses))
-                        
-                        final_response = GEMINI_CHAT.client.models.generate_content(
-                            model="gemini-2.5-flash",
-                            contents=contents,
-                            config=config
-                        )
-                        
-                        response_text = final_response.text
-                    else:
-                        # Function calls failed - fallback
-                        response_text = GEMINI_CHAT.generate_content(
-                            prompt=f"{internal_context}\n\nUser: {prompt}",
-                            user_id=user_id,
-                            session_id=user_id,
-                            temperature=0.7
-                        )
-                else:
-                    # Normal text response
-                    response_text = response.text
+                response_text = response.text
                 
                 # FINAL CHECK: If still empty/None, use fallback
                 if not response_text or response_text.strip() == "":
                     response_text = GEMINI_CHAT.generate_content(
-                        prompt=f"{internal_context}\n\nUser: {prompt}",
+                        prompt=f"{internal_context}\n\n{turn_text if retrieval else f'User: {prompt}'}",
                         user_id=user_id,
                         session_id=user_id,
-                        temperature=0.7
+                        temperature=0.7,
+                        feature="resources_chat_fallback",
                     )
                 
                 st.markdown(response_text)
@@ -326,6 +299,7 @@ What's on your mind today?"""
     
     with col1:
         if st.button("⟲ Restart Chat", width='stretch'):
+            close_session_cache(st.session_state, "resources_context_cache")
             st.session_state.resources_chat_history = [
                 {"role": "assistant", "content": welcome_message}
             ]
@@ -333,6 +307,7 @@ What's on your mind today?"""
     
     with col2:
         if st.button("← Back to Quick Search", width='stretch'):
+            close_session_cache(st.session_state, "resources_context_cache")
             st.session_state.resources_mode = "tools"
             st.rerun()
 
@@ -1,6 +1,7 @@
 import streamlit as st
 from services.langfuse_helper import LangfuseGeminiWrapper, get_user_id, get_session_id
 from utils.database import save_report
+from utils.rerun_profiler import profiled_fragment, rerun_fragment
 from datetime import datetime
 import os
 import re
@@ -16,7 +17,12 @@ QUIZ_GEMINI = LangfuseGeminiWrapper(
 
 def render_student_career_quiz():
     st.header("★ Career Discovery Quiz")
-    
+    render_quiz()
+
+
+@profiled_fragment("student_career_quiz")
+def render_quiz():
+    """Intro, questions and report; answering a question reruns only this fragment"""
     # initialising state
     if "career_quiz_active" not in st.session_state:
         st.session_state.career_quiz_active = False
@@ -62,7 +68,7 @@ def render_quiz_intro():
         st.session_state.career_quiz_active = True
         st.session_state.career_quiz_question_num = 0
         st.session_state.career_quiz_answers = []
-        st.rerun()
+        rerun_fragment()
 
 
 def render_quiz_questions():
@@ -72,7 +78,7 @@ def render_quiz_questions():
     # checking if done
     if current_q_num >= MAX_QUESTIONS:
         generate_final_report()
-        st.rerun()
+        rerun_fragment()
         return
     
     # progress
@@ -83,7 +89,7 @@ def render_quiz_questions():
     # generating question if needed
     if st.session_state.career_quiz_current_question is None:
         generate_next_question()
-        st.rerun()
+        rerun_fragment()
         return
     
     # displaying the question
@@ -110,7 +116,7 @@ def render_quiz_questions():
                 # removing last answer
                 if st.session_state.career_quiz_answers:
                     st.session_state.career_quiz_answers.pop()
-                st.rerun()
+                rerun_fragment()
     
     with col2:
         if st.button("Next →", width='stretch', type="primary"):
@@ -123,7 +129,7 @@ def render_quiz_questions():
                 })
                 st.session_state.career_quiz_question_num += 1
                 st.session_state.career_quiz_current_question = None
-                st.rerun()
+                rerun_fragment()
             else:
                 st.warning("Please write an answer before continuing!")
 
@@ -288,40 +294,40 @@ OUTPUT FORMAT (strict markdown):
 """
 
     try:
-        with st.spinner("Analyzing your responses and discovering your perfect career match..."):
-            report = QUIZ_GEMINI.generate_content(
-                prompt=prompt,
-                system_instruction="You are an expert career psychologist. Give broad sectors with % AND specific paths within them.",
-                temperature=0.6,
-                user_id=get_user_id(),
-                session_id=get_session_id(),
-                metadata={"type": "career_discovery_report"}
-            )
+        st.caption("Analyzing your responses and discovering your perfect career match...")
+        report = st.write_stream(QUIZ_GEMINI.generate_content_stream(
+            prompt=prompt,
+            system_instruction="You are an expert career psychologist. Give broad sectors with % AND specific paths within them.",
+            temperature=0.6,
+            user_id=get_user_id(),
+            session_id=get_session_id(),
+            metadata={"type": "career_discovery_report"}
+        ))
+        
+        st.session_state.career_quiz_final_report = report
+        
+        # pattern is **Technology** - 60% or **Technology** - 100%
+        sector_pattern = r'###\s*\d+\.\s*([A-Za-z\s&]+)\s*\((\d+)%\)'
+        sector_matches = re.findall(sector_pattern, report)
+        
+        if sector_matches:
+            # storing sectors with percentages
+            sectors_dict = {sector.strip(): int(pct) for sector, pct in sector_matches}
             
-            st.session_state.career_quiz_final_report = report
+            # primary = highest %
+            primary_sector = max(sectors_dict.items(), key=lambda x: x[1])[0]
             
-            # pattern is **Technology** - 60% or **Technology** - 100%
-            sector_pattern = r'###\s*\d+\.\s*([A-Za-z\s&]+)\s*\((\d+)%\)'
-            sector_matches = re.findall(sector_pattern, report)
+            # saving for dropdowns
+            st.session_state.recommended_sectors = sectors_dict  # {'Healthcare': 100} or {'Healthcare': 60, 'Education': 40}
+            st.session_state.recommended_sector = primary_sector  # 'Healthcare'
             
-            if sector_matches:
-                # storing sectors with percentages
-                sectors_dict = {sector.strip(): int(pct) for sector, pct in sector_matches}
-                
-                # primary = highest %
-                primary_sector = max(sectors_dict.items(), key=lambda x: x[1])[0]
-                
-                # saving for dropdowns
-                st.session_state.recommended_sectors = sectors_dict  # {'Healthcare': 100} or {'Healthcare': 60, 'Education': 40}
-                st.session_state.recommended_sector = primary_sector  # 'Healthcare'
-                
-                # also saving as formatted string for display
-                st.session_state.sectors_display = ", ".join([f"{s} ({p}%)" for s, p in sectors_dict.items()])
-            else:
-                # fallback
-                st.session_state.recommended_sector = "General"
-                st.session_state.recommended_sectors = {"General": 100}
-        
+            # also saving as formatted string for display
+            st.session_state.sectors_display = ", ".join([f"{s} ({p}%)" for s, p in sectors_dict.items()])
+        else:
+            # fallback
+            st.session_state.recommended_sector = "General"
+            st.session_state.recommended_sectors = {"General": 100}
+    
     except Exception as e:
         st.error(f"⚠︎ Error generating report: {e}")
         st.session_state.career_quiz_final_report = "Error generating report. Please try again."
@@ -395,7 +401,7 @@ def render_final_report():
 
     if st.button("↻ Retake Quiz", width='stretch'):
         reset_quiz()
-        st.rerun()
+        rerun_fragment()
 
 
 
@@ -8,9 +8,15 @@ from services.langfuse_helper import (
     get_session_id,
     log_user_feedback,
 )
+from services.chat_engine import session_chat_engine
+from utils.rerun_profiler import profiled_fragment, rerun_fragment
 
 
 load_dotenv()
+DASHBOARD_GEMINI = LangfuseGeminiWrapper(
+    api_key=os.getenv("GOOGLE_API_KEY"),
+    model="gemini-2.5-flash",
+)
 
 def render_dashboard_chat():
     """Rendering the AI-powered dashboard chat interface"""
@@ -40,16 +46,23 @@ def render_dashboard_chat():
     If you're still unsure what option to pick, let me help you!</p>
     """
     st.markdown(typewriter_html, unsafe_allow_html=True)
-    
+    render_chat()
+
+
+@profiled_fragment("student_chat")
+def render_chat():
+    """Chat history, input and recommendations; a chat turn reruns only this fragment"""
     col1, col2 = st.columns([3, 1])
     with col2:
         if st.button("⟲ Start Over"):
             st.session_state.student_chat_history = []
+            if "student_chat_engine" in st.session_state:
+                st.session_state.student_chat_engine.reset()
             st.session_state.conversation_turn = 0
             st.session_state.recommended_option = None
             if "last_trace_ids" in st.session_state:
                 st.session_state.last_trace_ids = []
-            st.rerun()
+            rerun_fragment()
 
     load_dotenv()
     api_key = os.getenv("GOOGLE_API_KEY")
@@ -58,37 +71,46 @@ def render_dashboard_chat():
         st.error("GOOGLE_API_KEY not found in your .env file.")
         return
 
-    # initializing Langfuse-wrapped Gemini client
-    gemini_client = LangfuseGeminiWrapper(
-        api_key=api_key,
-        model="gemini-2.5-flash"
-    )
+    gemini_client = DASHBOARD_GEMINI
 
     # getting user and session IDs for tracing
     user_id = get_user_id()
     session_id = get_session_id()
+
+    # structured multi-turn history, compacted to a token budget and persisted per user
+    chat_engine = session_chat_engine(
+        st.session_state,
+        "student_chat_engine",
+        gemini_client,
+        user_id,
+        chat_key="student_dashboard",
+        feature="student_dashboard_assistant",
+    )
     
     # initialising conversation counter
     if "conversation_turn" not in st.session_state:
-        st.session_state.conversation_turn = 0
+        st.session_state.conversation_turn = chat_engine.turn
     
     if "student_chat_history" not in st.session_state:
-        st.session_state.student_chat_history = []
+        st.session_state.student_chat_history = chat_engine.messages()
 
     user_input = st.chat_input("Ask Career Corner Assistant anything about your studies!")
     
+    # displaying previous messages before streaming the new turn
+    if chat_engine.summary:
+        st.caption("Earlier messages in this chat were summarized.")
+    for msg in st.session_state.student_chat_history:
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
+
     if user_input:
         st.session_state.conversation_turn += 1
         st.session_state.student_chat_history.append({
             "role": "user", 
             "content": user_input
         })
-        
-        # building conversation context for the AI
-        conversation_context = "\n".join([
-            f"{msg['role'].upper()}: {msg['content']}" 
-            for msg in st.session_state.student_chat_history[-4:] #last 4 messages for context
-        ])
+        with st.chat_message("user"):
+            st.markdown(user_input)
 
         system_instruction = f"""You are Career Corner Assistant, a friendly career counselor.
 
@@ -107,28 +129,26 @@ Have completely natural conversations. Ask whatever feels right.
 - Jobs/work → Job Recommendations (turn 6+)
 
 Current turn: {st.session_state.conversation_turn}
-Previous context:
-{conversation_context}
 """
 
         try:
             # generating response with langfuse tracing
-            ai_message = gemini_client.generate_content(
-                prompt=user_input,
-                system_instruction=system_instruction,
-                temperature=0.4,
-                user_id=user_id,
-                session_id=session_id,
-                metadata={
-                    "conversation_type": "student_dashboard_assistant",
-                    "user_type": "student",
-                    "turn": st.session_state.conversation_turn,
-                    "message_count": len(st.session_state.student_chat_history)
-                }
-            )
+            with st.chat_message("assistant"):
+                ai_message = st.write_stream(chat_engine.stream_reply(
+                    user_input,
+                    system_instruction=system_instruction,
+                    temperature=0.4,
+                    session_id=session_id,
+                    metadata={
+                        "conversation_type": "student_dashboard_assistant",
+                        "user_type": "student",
+                        "turn": st.session_state.conversation_turn,
+                        "message_count": len(st.session_state.student_chat_history)
+                    }
+                ))
             
-            # storing the trace id for potential feedback
-            current_trace_id = gemini_client.last_trace_id
+            # compacting and saving the chat, then storing the reply's trace id for potential feedback
+            current_trace_id = chat_engine.finish_turn(session_id)
             if "last_trace_ids" not in st.session_state:
                 st.session_state.last_trace_ids = []
             st.session_state.last_trace_ids.append(current_trace_id)
@@ -162,28 +182,6 @@ Previous context:
         if "professional dashboard" in ai_message.lower():
             st.session_state.show_professional_redirect = True
 
-    # displaying messages with feedback buttons
-    for idx, msg in enumerate(st.session_state.student_chat_history):
-        with st.chat_message(msg["role"]):
-            st.markdown(msg["content"])
-            
-            '''# Add feedback buttons for assistant messages
-            if msg["role"] == "assistant":
-                assistant_message_index = idx // 2
-                
-                if "last_trace_ids" in st.session_state and assistant_message_index < len(st.session_state.last_trace_ids):
-                    trace_id = st.session_state.last_trace_ids[assistant_message_index]
-                    
-                    col1, col2, col3 = st.columns([1, 1, 10])
-                    with col1:
-                        if st.button("👍", key=f"thumbs_up_{idx}"):
-                            log_user_feedback(trace_id, score=1.0, comment="Helpful response")
-                            st.success("Thanks!")
-                    with col2:
-                        if st.button("👎", key=f"thumbs_down_{idx}"):
-                            log_user_feedback(trace_id, score=0.0, comment="Not helpful")
-                            st.warning("Thanks for your feedback!")'''
-
     # showing redirect button if recommendation exists
     if st.session_state.get("recommended_option") and st.session_state.get("student_choice") != st.session_state.recommended_option:
         st.markdown("---")
@@ -216,4 +214,4 @@ Previous context:
                 st.rerun()
         with col2:
             if st.button("Stay on Student Dashboard", width='stretch', on_click=stay_student):
-                st.rerun()
+                rerun_fragment()
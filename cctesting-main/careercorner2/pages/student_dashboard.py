@@ -1,15 +1,20 @@
 import streamlit as st
 from dotenv import load_dotenv
-from pages.student_chat import render_dashboard_chat
-from pages.student_career_quiz import render_student_career_quiz
-from pages.grades_analysis import render_grades_analysis
-from pages.degree_picker import render_degree_picker
-from utils.reports import render_reports_center_student
-from pages.student_resources import render_student_resources
-from pages.university_finder import render_university_finder
+from utils.page_router import LazyPage, route
 
 load_dotenv()
 
+# sidebar choice -> page, imported only when first selected
+STUDENT_PAGES = {
+    "Dashboard": LazyPage("pages.student_chat", "render_dashboard_chat"),
+    "Career Quiz": LazyPage("pages.student_career_quiz", "render_student_career_quiz"),
+    "Degree Picker": LazyPage("pages.degree_picker", "render_degree_picker"),
+    "Grades Analysis": LazyPage("pages.grades_analysis", "render_grades_analysis"),
+    "University Finder": LazyPage("pages.university_finder", "render_university_finder"),
+    "Resources": LazyPage("pages.student_resources", "render_student_resources"),
+    "My Reports": LazyPage("utils.reports", "render_reports_center_student"),
+}
+
 
 def render_student_dashboard(choice: str):
     """
@@ -60,23 +65,4 @@ def render_student_dashboard(choice: str):
         return  # do not render any student tools yet
 
     # after onboarding we can route to actual pages
-    if choice == "Dashboard":
-        render_dashboard_chat()
-
-    elif choice == "Career Quiz":
-        render_student_career_quiz()
-
-    elif choice == "Degree Picker":
-        render_degree_picker()
-
-    elif choice == "Grades Analysis":
-        render_grades_analysis()
-
-    elif choice == "University Finder":
-        render_university_finder()
-        
-    elif choice == "Resources":
-        render_student_resources()
-        
-    elif choice == "My Reports":
-        render_reports_center_student()
+    route(STUDENT_PAGES, choice)
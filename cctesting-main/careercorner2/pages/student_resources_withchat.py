@@ -3,7 +3,10 @@ import os
 from dotenv import load_dotenv
 from google.genai import types
 from services.langfuse_helper import LangfuseGeminiWrapper
-from utils.database import get_saved_universities, load_reports
+from services.context_cache import session_context_cache, close_session_cache
+from services.tool_loop import run_tool_loop
+from services.user_context import UserContext
+from services.report_index import use_retrieval, retrieve_excerpts
 from services.tools import (
     render_exam_papers_tool,
     render_scholarships_tool,
@@ -30,9 +33,10 @@ def render_student_main_resources():
     # Check if user has data
     has_data = False
     try:
-        degree_reports = load_reports(user_id, "degree")
-        grades_reports = load_reports(user_id, "grades")
-        saved_unis = get_saved_universities(user_id)
+        user_context = UserContext.for_student(user_id)
+        degree_reports = user_context.reports("degree")
+        grades_reports = user_context.reports("grades")
+        saved_unis = user_context.saved_universities
         
         has_degree = len(degree_reports) > 0
         has_grades = len(grades_reports) > 0
@@ -103,10 +107,11 @@ def render_student_resources_chat():
     
     user_id = st.session_state.get("username", "demo_user")
     
-    # Load all user data
-    degree_reports = load_reports(user_id, "degree")
-    grades_reports = load_reports(user_id, "grades")
-    saved_unis = get_saved_universities(user_id)
+    # Load all user data in one go, the same snapshot is handed to the function-calling tools below
+    user_context = UserContext.for_student(user_id)
+    degree_reports = user_context.reports("degree")
+    grades_reports = user_context.reports("grades")
+    saved_unis = user_context.saved_universities
     
     # Split saved universities by type
     portuguese_unis = [uni for uni in saved_unis if uni.get('type') != 'International']
@@ -162,15 +167,37 @@ def render_student_resources_chat():
     if not saved_unis:
         unis_context = "\n\nSAVED UNIVERSITIES: None yet"
     
+    # long reports aren't pasted whole: each message gets the most relevant excerpts instead
+    retrieval = use_retrieval(selected_degree_data, selected_grades_data)
+    if retrieval:
+        degree_context = "Relevant excerpts are attached to each message" if selected_degree_data else 'No degree recommendations yet'
+        grades_context = "Relevant excerpts are attached to each message" if selected_grades_data else 'No grades uploaded yet'
+    else:
+        degree_context = selected_degree_data.get('content', 'No degree recommendations yet') if selected_degree_data else 'No degree recommendations yet'
+        grades_context = selected_grades_data.get('content', 'No grades uploaded yet') if selected_grades_data else 'No grades uploaded yet'
+
     # Internal context for AI
     internal_context = f"""You have access to this student's data:
 
 SELECTED DEGREE: {selected_degree_data.get('title', 'None') if selected_degree_data else 'None'}
-Degree Content: {selected_degree_data.get('content', 'No degree recommendations yet') if selected_degree_data else 'No degree recommendations yet'}
+Degree Content: {degree_context}
 
 SELECTED GRADES: {selected_grades_data.get('title', 'None') if selected_grades_data else 'None'}
-Grades Content: {selected_grades_data.get('content', 'No grades uploaded yet') if selected_grades_data else 'No grades uploaded yet'}
+Grades Content: {grades_context}
 {unis_context}"""
+
+    # static per chat session: sent once as a cached system instruction, not with every message
+    system_instruction = f"""{internal_context}
+
+USER ID: {user_id}
+
+INSTRUCTIONS:
+- Be supportive, encouraging, and empathetic
+- Reference their degree reports, grades, and saved universities when relevant
+- Use tools (search_saved_universities, calculate_admission_grade, get_student_profile) when helpful
+- Give specific, actionable advice based on their actual data
+- If they ask for study resources/exam papers/scholarships, remind them to use Quick Search tools
+- Focus on guidance, motivation, and decision support"""
     
     welcome_message = f"""Hi! I'm here to support you on your academic journey!
 
@@ -203,68 +230,37 @@ What's on your mind today?"""
         
         with st.chat_message("assistant"):
             with st.spinner("𖦹 Thinking..."):
-                # Function calling setup
-                contents = [types.Content(role="user", parts=[types.Part(text=f"""{internal_context}
-                
-USER ID: {user_id}
-User question: {prompt}
-
-INSTRUCTIONS:
-- Be supportive, encouraging, and empathetic
-- Reference their degree reports, grades, and saved universities when relevant
-- Use tools (search_saved_universities, calculate_admission_grade, get_student_profile) when helpful
-- Give specific, actionable advice based on their actual data
-- If they ask for study resources/exam papers/scholarships, remind them to use Quick Search tools
-- Focus on guidance, motivation, and decision support""")])]
+                turn_text = prompt
+                if retrieval:
+                    excerpts = retrieve_excerpts(
+                        user_id, prompt, user_context.reports_by_type, [selected_degree_data, selected_grades_data]
+                    )
+                    turn_text = f"Relevant excerpts from their degree/grades reports:\n{excerpts}\n\nUser: {prompt}"
+                contents = [types.Content(role="user", parts=[types.Part(text=turn_text)])]
                 
-                config = types.GenerateContentConfig(
+                # degree/grades/universities context is cached once per chat session and referenced by name
+                chat_cache = session_context_cache(
+                    st.session_state,
+                    "student_resources_context_cache",
+                    GEMINI_CHAT.client,
+                    "gemini-2.5-flash",
+                    system_instruction,
                     tools=[STUDENT_TOOLS],
-                    temperature=0.7
                 )
                 
-                response = GEMINI_CHAT.client.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=contents,
-                    config=config
+                # tool calls of a round run concurrently, over up to TOOL_LOOP_MAX_STEPS rounds
+                response = run_tool_loop(
+                    lambda contents: chat_cache.generate_content(
+                        contents,
+                        feature="student_resources_chat",
+                        temperature=0.7,
+                    ),
+                    contents,
+                    execute_function_call,
+                    on_tool_call=lambda name: st.caption(f"🔧 Using: {name}"),
+                    memo_seed={user_context.memo_key: user_context},
                 )
-
-                # Handle function calls
-                if response.candidates[0].content.parts and hasattr(response.candidates[0].content.parts[0], 'function_call'):
-                    function_responses = []
-                    for part in response.candidates[0].content.parts:
-                        try:
-                            if hasattr(part, 'function_call') and part.function_call:
-                                fn_call = part.function_call
-                                
-                                if not fn_call or not hasattr(fn_call, 'name') or not fn_call.name:
-                                    continue
-                                
-                                st.caption(f"🔧 Using: {fn_call.name}")
-                                result = execute_function_call(fn_call.name, dict(fn_call.args))
-                                function_responses.append(
-                                    types.Part.from_function_response(
-                                        name=fn_call.name,
-                                        response={"result": result}
-                                    )
-                                )
-                        except AttributeError:
-                            continue
-                        except Exception as e:
-                            st.warning(f"⚠ Function call failed: {e}")
-                            continue
-                    
-                    contents.append(response.candidates[0].content)
-                    contents.append(types.Content(role="user", parts=function_responses))
-                    
-                    final_response = GEMINI_CHAT.client.models.generate_content(
-                        model="gemini-2.5-flash",
-                        contents=contents,
-                        config=config
-                    )
-                    
-                    response_text = final_response.text
-                else:
-                    response_text = response.text
+                response_text = response.text
                 
                 # ✅ FIX: Check if response is actually empty
                 if not response_text or response_text.strip() == "":
@@ -273,7 +269,8 @@ INSTRUCTIONS:
                         prompt=f"User said: {prompt}\n\nRespond in a friendly, supportive way.",
                         user_id=user_id,
                         session_id=user_id,
-                        temperature=0.7
+                        temperature=0.7,
+                        feature="student_resources_chat_fallback",
                     )
                     response_text = simple_response if simple_response else "I'm here to help! What would you like to talk about?"
                 
@@ -286,6 +283,7 @@ INSTRUCTIONS:
     
     with col1:
         if st.button("⟲ Restart Chat", width='stretch'):
+            close_session_cache(st.session_state, "student_resources_context_cache")
             st.session_state.student_resources_chat_history = [
                 {"role": "assistant", "content": welcome_message}
             ]
@@ -293,6 +291,7 @@ INSTRUCTIONS:
     
     with col2:
         if st.button("← Back to Quick Search", width='stretch'):
+            close_session_cache(st.session_state, "student_resources_context_cache")
             st.session_state.resources_mode = "tools"
             st.rerun()
 
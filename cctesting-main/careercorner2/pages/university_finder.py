@@ -7,7 +7,6 @@ import unicodedata
 import json
 import os
 from utils.database import (
-    init_database,
     save_university,
     get_saved_universities,
     remove_saved_university,
@@ -19,12 +18,12 @@ from utils.database import (
     save_report
 )
 from services.langfuse_helper import LangfuseGeminiWrapper, get_user_id, get_session_id
+from services.session_budget import restore_offloaded
+from utils.rerun_profiler import profiled_fragment, rerun_fragment
 from datetime import datetime
 import traceback
 
 
-init_database()
-
 GEMINI = LangfuseGeminiWrapper(
     api_key=os.getenv("GOOGLE_API_KEY"),
     model="gemini-2.5-flash",
@@ -186,12 +185,12 @@ def select_degree_section():
             st.session_state.last_degree_select = degree_select
             st.session_state.last_degree_input = ""
             degree = degree_select
-            st.rerun()
+            rerun_fragment()
         elif degree_input != st.session_state.last_degree_input:
             st.session_state.last_degree_input = degree_input
             st.session_state.last_degree_select = ""
             degree = degree_input
-            st.rerun()
+            rerun_fragment()
         else:
             degree = degree_select if degree_select else degree_input
 
@@ -253,7 +252,8 @@ Return ONLY the JSON, no other text or markdown formatting."""
             prompt=prompt,
             temperature=0.5,
             user_id=get_user_id(),
-            session_id=get_session_id()
+            session_id=get_session_id(),
+            feature="university_search",
         )
 
         cleaned = response.strip()
@@ -288,8 +288,14 @@ def render_university_finder():
     """Main university finder with Portugal and International buttons"""
     st.header("𖤣 University Finder")
 
-    user_id = get_user_id()
+    # search results evicted from memory while the page wasn't used
+    restore_offloaded(st.session_state, get_session_id(), "university_results", "intl_university_results")
+    render_finder()
+
 
+@profiled_fragment("university_finder")
+def render_finder():
+    """Searches, results and save buttons; these rerun only this fragment"""
     if "university_finder_mode" not in st.session_state:
         st.session_state.university_finder_mode = None
 
@@ -299,11 +305,11 @@ def render_university_finder():
     with col1:
         if st.button("Portugal", width="stretch", type="primary" if st.session_state.university_finder_mode == "Portugal" else "secondary"):
             st.session_state.university_finder_mode = "Portugal"
-            st.rerun()
+            rerun_fragment()
     with col2:
         if st.button("International", width="stretch", type="primary" if st.session_state.university_finder_mode == "International" else "secondary"):
             st.session_state.university_finder_mode = "International"
-            st.rerun()
+            rerun_fragment()
 
     if st.session_state.university_finder_mode == "Portugal":
         render_portuguese_finder()
@@ -350,13 +356,13 @@ def render_portuguese_finder():
                     ):
                         if remove_saved_university(user_id, uni["name"], uni["program_name"]):
                             st.success("Removed!")
-                            st.rerun()
+                            rerun_fragment()
 
             if st.button("Clear All Portuguese Universities", type="secondary"):
                 for uni in portuguese_unis:
                     remove_saved_university(user_id, uni["name"], uni["program_name"])
                 st.success("Cleared Portuguese universities")
-                st.rerun()
+                rerun_fragment()
 
         st.markdown("---")
 
@@ -462,12 +468,12 @@ def render_portuguese_finder():
             st.session_state.last_degree_select = degree_select
             st.session_state.last_degree_input = ""
             degree = degree_select
-            st.rerun()
+            rerun_fragment()
         elif degree_input != st.session_state.last_degree_input:
             st.session_state.last_degree_input = degree_input
             st.session_state.last_degree_select = ""
             degree = degree_input
-            st.rerun()
+            rerun_fragment()
         else:
             degree = degree_select if degree_select else degree_input
 
@@ -517,7 +523,7 @@ def render_portuguese_finder():
     else:
         if st.button("Search Universities", width="stretch", type="primary"):
             search_universities(degree, location, uni_type, ranking, show_grade_filter, grade_margin)
-            st.rerun()
+            rerun_fragment()
 
     if "university_results" in st.session_state and st.session_state.university_results:
         render_university_results()
@@ -724,7 +730,7 @@ def render_university_results():
                         if save_university(user_id, uni):
                             save_single_university_to_reports(user_id, uni)
                             st.success("Saved to your list and My Reports")
-                            st.rerun()
+                            rerun_fragment()
                         else:
                             st.warning("Already in your saved list")
 
@@ -749,13 +755,13 @@ def render_international_finder():
                     if st.button("Remove", key=f"remove_intl_{uni['name']}_{uni['program_name']}"):
                         if remove_saved_university(user_id, uni["name"], uni["program_name"]):
                             st.success("Removed!")
-                            st.rerun()
+                            rerun_fragment()
             
             if st.button("Clear All International Universities", type="secondary"):
                 for uni in international_unis:
                     remove_saved_university(user_id, uni["name"], uni["program_name"])
                 st.success("Cleared international universities")
-                st.rerun()
+                rerun_fragment()
         
         st.markdown("---")
 
@@ -867,7 +873,7 @@ def render_international_finder():
                 if universities:
                     st.session_state.intl_university_results = universities
                     st.success(f"Found {len(universities)} universities")
-                    st.rerun()
+                    rerun_fragment()
                 else:
                     st.warning("No universities found. Try different search criteria.")
 
@@ -955,7 +961,7 @@ def render_international_results():
                         save_university(user_id, formatted_uni)
                         save_single_university_to_reports(user_id, formatted_uni)
                         st.success("Saved")
-                        st.rerun()
+                        rerun_fragment()
 
                 if uni.get('website') and uni['website'] not in ['#', 'N/A']:
                     st.link_button("Visit Website", uni['website'], width="stretch")
@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+# run from the app folder:
+#   python scripts/bench_app.py [--repeat 3] [--out bench/results.json] [--tracemalloc]
+#   python scripts/bench_app.py --compare bench/old.json bench/new.json [--threshold 20]
+# drives zapp.py through scripted user journeys with streamlit.testing.v1.AppTest against
+# a throwaway database, with GEMINI_BACKEND=fake and in-memory Langfuse traces (no network)
+APP_DIR = Path(__file__).resolve().parent.parent
+USER = {"username": "bench", "display_name": "Bench User", "email": "bench@example.com"}
+PASSWORD = "bench-password"
+FAKE_API_KEY = "bench-fake-key"
+TIMEOUT_S = 60
+
+_statements: list[str] = []
+_connect = sqlite3.connect
+
+
+def _traced_connect(*args, **kwargs):
+    conn = _connect(*args, **kwargs)
+    conn.set_trace_callback(_statements.append)
+    return conn
+
+
+def _isolate():
+    """Throwaway temp dir (database, report index, bench user), in-memory traces, fake Gemini backend"""
+    tempfile.tempdir = tempfile.mkdtemp(prefix="career_corner_bench_")
+    os.environ["GOOGLE_API_KEY"] = FAKE_API_KEY
+    os.environ["GEMINI_BACKEND"] = "fake"
+    # app overhead only, pass GEMINI_FAKE_LATENCY to include model time
+    os.environ.setdefault("GEMINI_FAKE_LATENCY", "0")
+    os.environ.setdefault("GEMINI_FAKE_TTFT", "0")
+    os.environ["LANGFUSE_SINK"] = "memory"
+    os.environ["REPORT_INDEX_DIR"] = str(Path(tempfile.tempdir) / "index")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, str(APP_DIR))
+    sqlite3.connect = _traced_connect
+
+    from services.authentication import create_user, init_db
+    from utils.database import save_report
+    init_db()
+    create_user(None, USER["username"], USER["display_name"], USER["email"], PASSWORD)
+    save_report(USER["email"], "degree", "Degree Picker - Informática", "### 1. Informática (Lisboa)\nGood fit.")
+    save_report(USER["email"], "grades", "Grades - 2025", "Average 16.4/20")
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Recorder:
+    """Times one AppTest run per step and collects SQL statements and memory"""
+
+    def __init__(self, trace_memory: bool):
+        self.trace_memory = trace_memory
+        self.steps = []
+
+    def step(self, name: str, at, action=None):
+        start_sql = len(_statements)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        (action or at.run)()
+        wall_ms = (time.perf_counter() - start) * 1000
+        result = {
+            "step": name,
+            "wall_ms": round(wall_ms, 1),
+            "sql_statements": len(_statements) - start_sql,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "exceptions": [e.message for e in at.exception],
+        }
+        if self.trace_memory:
+            result["peak_python_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        self.steps.append(result)
+        return at
+
+
+def _button(at, label: str):
+    return next(b for b in at.button if b.label == label)
+
+
+def _new_app():
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(str(APP_DIR / "zapp.py"), default_timeout=TIMEOUT_S)
+
+
+def _logged_in_student(rec: Recorder):
+    """Logged-out first load, then the login form and the student dashboard (shared start of every journey)"""
+    at = _new_app()
+    rec.step("logged_out_load", at)
+    at.text_input(key="login_username").input(USER["username"])
+    at.text_input(key="login_password").input(PASSWORD)
+    # password check, user lookup, then the rerun that loads the profile
+    rec.step("login", at, _button(at, "Login").click().run)
+    assert at.session_state["logged_in"], "bench login failed"
+    at.session_state["user_type"] = "student"
+    at.session_state["student_onboarding_done"] = True
+    rec.step("student_dashboard", at)
+    return at
+
+
+def journey_university_finder(rec: Recorder):
+    at = _logged_in_student(rec)
+    at.sidebar.radio(key="student_choice").set_value("University Finder")
+    rec.step("open_university_finder", at)
+    rec.step("choose_portugal", at, _button(at, "Portugal").click().run)
+    at.checkbox(key="uf_use_report").uncheck()
+    rec.step("manual_degree", at)
+    at.text_input(key="degree_text_input").input("Informática")
+    rec.step("type_degree", at)
+    rec.step("search", at, _button(at, "Search Universities").click().run)
+    rec.step("idle_rerun", at)
+
+
+def journey_grades_analysis(rec: Recorder):
+    at = _logged_in_student(rec)
+    at.sidebar.radio(key="student_choice").set_value("Grades Analysis")
+    rec.step("open_grades_analysis", at)
+    rec.step("portuguese_student", at, at.button(key="btn_portuguese").click().run)
+    rec.step("manual_entry", at, at.button(key="btn_manual_entry").click().run)
+    rec.step("idle_rerun", at)
+
+
+def journey_my_reports(rec: Recorder):
+    at = _logged_in_student(rec)
+    at.sidebar.radio(key="student_choice").set_value("My Reports")
+    rec.step("open_my_reports", at)
+    rec.step("idle_rerun", at)
+
+
+JOURNEYS = {
+    "university_finder": journey_university_finder,
+    "grades_analysis": journey_grades_analysis,
+    "my_reports": journey_my_reports,
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _median_steps(runs: list[list[dict]]) -> list[dict]:
+    """Per-step medians over repeated runs of one journey"""
+    merged = []
+    for samples in zip(*runs):
+        step = dict(samples[-1])
+        for field in ("wall_ms", "sql_statements"):
+            step[field] = statistics.median(s[field] for s in samples)
+        step["wall_ms_runs"] = [s["wall_ms"] for s in samples]
+        merged.append(step)
+    return merged
+
+
+def run_benchmarks(repeat: int, trace_memory: bool, only: list[str] | None) -> dict:
+    _isolate()
+    if trace_memory:
+        tracemalloc.start()
+
+    # cold start: the first script run pays for every import of zapp.py
+    at = _new_app()
+    start = time.perf_counter()
+    at.run()
+    cold_start_ms = (time.perf_counter() - start) * 1000
+
+    journeys = {}
+    for name, journey in JOURNEYS.items():
+        if only and name not in only:
+            continue
+        runs = []
+        for _ in range(repeat):
+            rec = Recorder(trace_memory)
+            journey(rec)
+            runs.append(rec.steps)
+        steps = _median_steps(runs)
+        journeys[name] = {
+            "steps": steps,
+            "total_wall_ms": round(sum(s["wall_ms"] for s in steps), 1),
+            "total_sql_statements": sum(s["sql_statements"] for s in steps),
+        }
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "cold_start_ms": round(cold_start_ms, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "journeys": journeys,
+    }
+
+
+def compare(old_path: str, new_path: str, threshold_pct: float) -> list[str]:
+    """Printing per-step deltas between two result files, returning the regressions"""
+    old, new = json.loads(Path(old_path).read_text()), json.loads(Path(new_path).read_text())
+    regressions = []
+
+    def line(label, before, after, unit, slack=0):
+        delta = after - before
+        pct = (delta / before * 100) if before else 0.0
+        flag = ""
+        if delta > slack and (not before or pct > threshold_pct):
+            flag = "  <-- regression"
+            regressions.append(f"{label}: {before:g} -> {after:g} {unit}")
+        print(f"  {label:<45} {before:>9g} -> {after:>9g} {unit:<5} ({pct:+.0f}%){flag}")
+
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    line("cold_start", old["cold_start_ms"], new["cold_start_ms"], "ms", slack=50)
+    line("peak_rss", old["peak_rss_mb"], new["peak_rss_mb"], "MB", slack=5)
+    for name, journey in new["journeys"].items():
+        before = {s["step"]: s for s in old["journeys"].get(name, {}).get("steps", [])}
+        print(name)
+        for step in journey["steps"]:
+            if step["step"] not in before:
+                continue
+            prev = before[step["step"]]
+            # small absolute changes are noise, whatever the percentage
+            line(f"{step['step']} wall", prev["wall_ms"], step["wall_ms"], "ms", slack=20)
+            line(f"{step['step']} sql", prev["sql_statements"], step["sql_statements"], "stmts")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AppTest benchmark of zapp.py user journeys")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per journey, steps report the median")
+    parser.add_argument("--journey", action="append", choices=sorted(JOURNEYS), help="only these journeys")
+    parser.add_argument("--tracemalloc", action="store_true", help="also record peak Python allocations per step (slower)")
+    parser.add_argument("--out", help="JSON results file (default: bench/<commit>-<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files instead of running")
+    parser.add_argument("--threshold", type=float, default=20.0, help="percent slowdown reported as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(*args.compare, threshold_pct=args.threshold)
+        print()
+        print("\n".join(regressions) if regressions else "No regressions")
+        sys.exit(1 if regressions else 0)
+
+    results = run_benchmarks(args.repeat, args.tracemalloc, args.journey)
+    out = Path(args.out) if args.out else APP_DIR / "bench" / f"{results['commit'] or 'nogit'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2) + "\n")
+
+    print(f"cold start: {results['cold_start_ms']:.0f} ms, peak RSS {results['peak_rss_mb']:.0f} MB")
+    failed = False
+    for name, journey in results["journeys"].items():
+        print(f"{name}: {journey['total_wall_ms']:.0f} ms, {journey['total_sql_statements']} SQL statements")
+        for step in journey["steps"]:
+            errors = f"  !! {step['exceptions'][0]}" if step["exceptions"] else ""
+            failed = failed or bool(step["exceptions"])
+            print(f"    {step['step']:<24} {step['wall_ms']:>8.1f} ms {step['sql_statements']:>4} sql{errors}")
+    print(f"Wrote {out}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import hashlib
+import json
+from io import BytesIO
+from pathlib import Path
+from PIL import Image
+
+# run from the app folder: python scripts/build_assets.py
+STATIC_DIR = Path("static")
+MANIFEST = STATIC_DIR / "assets.json"
+
+# source image -> max width of the optimized variant (backgrounds are faded, detail isn't visible)
+ASSETS = {
+    "data/bg2.png": 1600,
+    "data/crumpledpaper3.avif": 480,
+}
+WEBP_QUALITY = 70
+
+
+def optimize(source: Path, max_width: int) -> bytes:
+    """Resizing to max_width and re-encoding as WebP"""
+    image = Image.open(source).convert("RGB")
+    if image.width > max_width:
+        height = round(image.height * max_width / image.width)
+        image = image.resize((max_width, height), Image.LANCZOS)
+    out = BytesIO()
+    image.save(out, format="WEBP", quality=WEBP_QUALITY, method=6)
+    return out.getvalue()
+
+
+def main():
+    STATIC_DIR.mkdir(exist_ok=True)
+    manifest = {}
+    for source, max_width in ASSETS.items():
+        data = optimize(Path(source), max_width)
+        # content hash in the name, so browsers can cache it forever
+        name = f"{Path(source).stem}.{hashlib.sha256(data).hexdigest()[:8]}.webp"
+        (STATIC_DIR / name).write_bytes(data)
+        manifest[source] = name
+        print(f"{source}: {Path(source).stat().st_size // 1024} KB -> {name}: {len(data) // 1024} KB")
+
+    # drop variants of earlier builds
+    for path in STATIC_DIR.glob("*.webp"):
+        if path.name not in manifest.values():
+            path.unlink()
+    MANIFEST.write_text(json.dumps(manifest, indent=2) + "\n")
+    print(f"Wrote {MANIFEST}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# run from the app folder: python scripts/count_db_statements.py [--json]
+# counts the SQL statements init_database() and the user profile cache issue on the
+# first run and on reruns, against a throwaway database; exits with 1 when a rerun
+# queries the database
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+RERUNS = 5
+USER = "someone@example.com"
+
+_statements: list[str] = []
+_connect = sqlite3.connect
+
+
+def _traced_connect(*args, **kwargs):
+    conn = _connect(*args, **kwargs)
+    conn.set_trace_callback(_statements.append)
+    return conn
+
+
+def _count(fn, *args) -> list[str]:
+    """Statements issued while fn runs"""
+    start = len(_statements)
+    fn(*args)
+    return _statements[start:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQL statements issued by database initialisation")
+    parser.add_argument("--json", action="store_true", help="print one JSON report instead of text")
+    args = parser.parse_args()
+
+    # the database lives in the temp dir, point it somewhere empty before importing
+    tempfile.tempdir = tempfile.mkdtemp(prefix="career_corner_stmts_")
+    sqlite3.connect = _traced_connect
+    from utils import database  # initialises on import
+
+    report = {"import": list(_statements)}
+    report["reruns"] = [_count(database.init_database) for _ in range(RERUNS)]
+    report["load_reports"] = _count(database.load_reports, USER, "CV Analysis")
+
+    # what zapp.py does for a logged-in user on every rerun
+    from services.user_profile import load_user_profile
+    session = {}
+    report["profile_login"] = _count(load_user_profile, session, USER)
+    report["profile_reruns"] = [_count(load_user_profile, session, USER) for _ in range(RERUNS)]
+    database.save_user_cv(USER, {"skills": ["Python"]})
+    report["profile_after_save"] = _count(load_user_profile, session, USER)
+
+    failures = []
+    if not any(s.lstrip().upper().startswith("CREATE") for s in report["import"]):
+        failures.append("first initialisation created no tables")
+    for i, statements in enumerate(report["reruns"], 1):
+        if statements:
+            failures.append(f"rerun {i}: {len(statements)} statements (expected 0)")
+    if len(report["load_reports"]) != 1:
+        failures.append(f"load_reports: {len(report['load_reports'])} statements (expected 1)")
+    for i, statements in enumerate(report["profile_reruns"], 1):
+        if statements:
+            failures.append(f"profile rerun {i}: {len(statements)} statements (expected 0)")
+    if not report["profile_after_save"] or session.get("cv_data") != {"skills": ["Python"]}:
+        failures.append("profile not reloaded after save_user_cv")
+
+    if args.json:
+        print(json.dumps({**report, "failures": failures}, indent=2))
+    else:
+        print(f"import: {len(report['import'])} statements")
+        for i, statements in enumerate(report["reruns"], 1):
+            print(f"rerun {i}: {len(statements)} statements")
+        print(f"load_reports: {len(report['load_reports'])} statements")
+        print(f"profile on login: {len(report['profile_login'])} statements")
+        for i, statements in enumerate(report["profile_reruns"], 1):
+            print(f"profile rerun {i}: {len(statements)} statements")
+        print(f"profile after save_user_cv: {len(report['profile_after_save'])} statements")
+        print()
+        print("\n".join(failures) if failures else "No database work on reruns")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
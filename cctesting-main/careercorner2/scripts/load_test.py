@@ -0,0 +1,731 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+# run from the app folder:
+#   python scripts/load_test.py [--users 50] [--ramp-up 60] [--duration 300] [--out bench/load.json]
+# starts `streamlit run zapp.py` in a subprocess (GEMINI_BACKEND=fake, throwaway database,
+# pre-registered users) and drives it with simulated browser sessions over the
+# /_stcore/stream websocket: each one logs in through the login form and loops through
+# student or professional journeys with think times between interactions
+APP_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = "load-test-password"
+LOCK_WAIT_SAMPLES = 5000
+
+try:
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ClientState_pb2 import ClientState
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from streamlit.proto.WidgetStates_pb2 import WidgetState, WidgetStates
+except ImportError as e:  # websockets ships with recent Streamlit releases
+    sys.exit(f"load_test.py needs streamlit and websockets installed ({e})")
+
+sys.path.insert(0, str(APP_DIR))
+from services.rate_limiter import percentile
+
+
+# ============================================================================
+# SERVER SIDE (--serve): streamlit in this process, SQLite lock waits and RSS recorded
+# ============================================================================
+
+_lock_stats = {"waits": 0, "timeouts": 0, "wait_s_total": 0.0, "wait_s": deque(maxlen=LOCK_WAIT_SAMPLES)}
+_lock_stats_lock = threading.Lock()
+_connect = sqlite3.connect
+
+
+def _waiting_for_lock(conn, fn, *args, **kwargs):
+    """
+    Retrying while another connection holds the database lock, the way SQLite's busy
+    handler would (connections are opened with timeout=0), and recording the time waited
+    """
+    started = None
+    delay = 0.001
+    while True:
+        try:
+            result = fn(*args, **kwargs)
+            break
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            now = time.perf_counter()
+            started = started or now
+            if now - started >= conn.busy_timeout_s:
+                with _lock_stats_lock:
+                    _lock_stats["timeouts"] += 1
+                raise
+            time.sleep(delay)
+            delay = min(delay * 2, 0.025)
+    if started is not None:
+        waited = time.perf_counter() - started
+        with _lock_stats_lock:
+            _lock_stats["waits"] += 1
+            _lock_stats["wait_s_total"] += waited
+            _lock_stats["wait_s"].append(waited)
+    return result
+
+
+class _LockTimedCursor(sqlite3.Cursor):
+    def execute(self, *args, **kwargs):
+        return _waiting_for_lock(self.connection, super().execute, *args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return _waiting_for_lock(self.connection, super().executemany, *args, **kwargs)
+
+
+class _LockTimedConnection(sqlite3.Connection):
+    busy_timeout_s = 5.0
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or _LockTimedCursor)
+
+    def execute(self, *args, **kwargs):
+        return _waiting_for_lock(self, super().execute, *args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return _waiting_for_lock(self, super().executemany, *args, **kwargs)
+
+    def executescript(self, *args, **kwargs):
+        return _waiting_for_lock(self, super().executescript, *args, **kwargs)
+
+    def commit(self):
+        return _waiting_for_lock(self, super().commit)
+
+
+def _lock_timed_connect(database, *args, **kwargs):
+    timeout = args[0] if args else kwargs.pop("timeout", 5.0)
+    kwargs.setdefault("factory", _LockTimedConnection)
+    conn = _connect(database, 0, *args[1:], **kwargs)
+    conn.busy_timeout_s = timeout
+    return conn
+
+
+def _current_rss_mb() -> float | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        return None  # not Linux, the report leaves RSS out
+
+
+def _seed_users(count: int):
+    """Registering load0..loadN-1 directly (one password hash for all of them)"""
+    from werkzeug.security import generate_password_hash
+    from services.authentication import HASH_METHOD
+    from utils.database import DB_PATH, init_database
+
+    init_database()
+    # same method as the app, so the first login doesn't rehash every account
+    pw_hash = generate_password_hash(PASSWORD, HASH_METHOD)
+    now = datetime.now(timezone.utc).isoformat()
+    conn = _connect(DB_PATH)
+    conn.executemany(
+        "INSERT OR IGNORE INTO users (username, display_name, email, password_hash, created_at) VALUES (?, ?, ?, ?, ?)",
+        [(f"load{i}", f"Load User {i}", f"load{i}@example.com", pw_hash, now) for i in range(count)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _write_server_stats(path: Path, interval_s: float):
+    """Snapshot of lock waits, RSS and the app's own rerun timings, rewritten every interval"""
+    from services.metrics import rerun_stats
+
+    while True:
+        with _lock_stats_lock:
+            waits = list(_lock_stats["wait_s"])
+            snapshot = {
+                "time": time.time(),
+                "rss_mb": _current_rss_mb(),
+                "threads": threading.active_count(),
+                "lock_waits": _lock_stats["waits"],
+                "lock_timeouts": _lock_stats["timeouts"],
+                "lock_wait_ms_total": round(_lock_stats["wait_s_total"] * 1000, 1),
+            }
+        snapshot["lock_wait_ms_p50"] = round(percentile(waits, 50) * 1000, 1)
+        snapshot["lock_wait_ms_p95"] = round(percentile(waits, 95) * 1000, 1)
+        snapshot["lock_wait_ms_max"] = round(max(waits, default=0.0) * 1000, 1)
+        snapshot["reruns"] = rerun_stats()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(snapshot))
+        tmp.replace(path)
+        time.sleep(interval_s)
+
+
+def serve(port: int, users: int, stats_path: Path, interval_s: float):
+    """Running zapp.py under `streamlit run` in this process, with instrumented SQLite"""
+    os.chdir(APP_DIR)
+    sqlite3.connect = _lock_timed_connect
+    _seed_users(users)
+    threading.Thread(target=_write_server_stats, args=(stats_path, interval_s), name="load-stats", daemon=True).start()
+
+    from streamlit.web import cli as stcli
+    sys.argv = [
+        "streamlit", "run", str(APP_DIR / "zapp.py"),
+        "--server.headless=true",
+        f"--server.port={port}",
+        "--server.address=127.0.0.1",
+        "--server.fileWatcherType=none",
+        "--browser.gatherUsageStats=false",
+    ]
+    sys.exit(stcli.main())
+
+
+# ============================================================================
+# CLIENT SIDE: simulated browser sessions
+# ============================================================================
+
+FINAL_STATUSES = {
+    ForwardMsg.FINISHED_SUCCESSFULLY,
+    ForwardMsg.FINISHED_WITH_COMPILE_ERROR,
+    ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+}
+
+
+class InteractionError(RuntimeError):
+    """A rerun raised in the app, timed out, or a widget the journey needs wasn't rendered"""
+
+
+class Widget:
+    def __init__(self, kind: str, proto, fragment_id: str):
+        self.kind = kind
+        self.id = proto.id
+        self.label = getattr(proto, "label", "")
+        self.fragment_id = fragment_id
+
+
+class BrowserSession:
+    """
+    One simulated browser tab: keeps the widgets of the last run and sends reruns the way
+    the frontend does (widgets inside a fragment rerun the fragment). Only changed values
+    are sent, the server keeps every other widget at its current value.
+    """
+
+    def __init__(self, url: str, stats: "LoadStats", timeout_s: float):
+        self.url = url
+        self.stats = stats
+        self.timeout_s = timeout_s
+        self.ws = None
+        self.widgets: dict[str, Widget] = {}
+        self.pending: dict[str, WidgetState] = {}
+        self.page_script_hash = ""
+        self._cache: dict[str, ForwardMsg] = {}
+
+    async def __aenter__(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None, open_timeout=self.timeout_s)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ws.close()
+
+    def find(self, key: str | None = None, label: str | None = None, kind: str | None = None) -> Widget | None:
+        for widget in reversed(self.widgets.values()):
+            if key is not None and not widget.id.endswith(f"-{key}"):
+                continue
+            if label is not None and widget.label != label:
+                continue
+            if kind is not None and widget.kind != kind:
+                continue
+            return widget
+        return None
+
+    def has(self, **query) -> bool:
+        return self.find(**query) is not None
+
+    def _need(self, **query) -> Widget:
+        widget = self.find(**query)
+        if widget is None:
+            raise InteractionError(f"widget not rendered: {query}")
+        return widget
+
+    def fill(self, text: str, **query):
+        widget = self._need(**query)
+        self.pending[widget.id] = WidgetState(id=widget.id, string_value=text)
+
+    def select(self, option: str, **query):
+        widget = self._need(**query)
+        self.pending[widget.id] = WidgetState(id=widget.id, string_value=option)
+
+    def check(self, value: bool, **query):
+        widget = self._need(**query)
+        self.pending[widget.id] = WidgetState(id=widget.id, bool_value=value)
+
+    def _receive(self, msg: ForwardMsg, errors: list[str]):
+        kind = msg.WhichOneof("type")
+        if kind == "ref_hash":
+            msg = self._cache.get(msg.ref_hash, msg)
+            kind = msg.WhichOneof("type")
+        elif msg.hash and msg.metadata.cacheable:
+            self._cache[msg.hash] = msg
+
+        if kind == "new_session":
+            self.page_script_hash = msg.new_session.page_script_hash
+            rerun_fragments = set(msg.new_session.fragment_ids_this_run)
+            self.widgets = {
+                wid: w for wid, w in self.widgets.items()
+                if rerun_fragments and w.fragment_id not in rerun_fragments
+            }
+        elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+            element = msg.delta.new_element
+            element_kind = element.WhichOneof("type")
+            if element_kind == "exception":
+                errors.append(f"{element.exception.type}: {element.exception.message}")
+                return
+            proto = getattr(element, element_kind, None) if element_kind else None
+            if proto is not None and getattr(proto, "id", ""):
+                self.widgets.pop(proto.id, None)  # re-rendered, keep page order
+                self.widgets[proto.id] = Widget(element_kind, proto, msg.delta.fragment_id)
+
+    async def rerun(self, step: str, trigger: WidgetState | None = None, fragment_id: str = "") -> float:
+        """Sending one rerun and reading until the script (or fragment) finished, returns seconds"""
+        states = list(self.pending.values()) + ([trigger] if trigger is not None else [])
+        self.pending = {}
+        back = BackMsg(rerun_script=ClientState(
+            query_string="",
+            page_script_hash=self.page_script_hash,
+            fragment_id=fragment_id,
+            widget_states=WidgetStates(widgets=states),
+        ))
+
+        errors = []
+        started = time.perf_counter()
+        self.stats.in_flight += 1
+        try:
+            await self.ws.send(back.SerializeToString())
+            deadline = started + self.timeout_s
+            while True:
+                msg = ForwardMsg()
+                msg.ParseFromString(await asyncio.wait_for(self.ws.recv(), max(0.0, deadline - time.perf_counter())))
+                self._receive(msg, errors)
+                if msg.WhichOneof("type") == "script_finished" and msg.script_finished in FINAL_STATUSES:
+                    break
+        except asyncio.TimeoutError:
+            self.stats.record(step, time.perf_counter() - started, fragment_id, error="timeout")
+            raise InteractionError(f"{step}: no response within {self.timeout_s:.0f} s")
+        finally:
+            self.stats.in_flight -= 1
+
+        elapsed = time.perf_counter() - started
+        self.stats.record(step, elapsed, fragment_id, error=errors[0] if errors else None)
+        if errors:
+            raise InteractionError(f"{step}: {errors[0]}")
+        return elapsed
+
+    async def click(self, step: str, **query) -> float:
+        widget = self._need(**query)
+        return await self.rerun(step, WidgetState(id=widget.id, trigger_value=True), widget.fragment_id)
+
+    async def chat(self, step: str, text: str, **query) -> float:
+        widget = self._need(kind="chat_input", **query)
+        trigger = WidgetState(id=widget.id)
+        trigger.chat_input_value.data = text
+        return await self.rerun(step, trigger, widget.fragment_id)
+
+    async def submit(self, step: str, **query) -> float:
+        """Rerun after fill/select/check, like the frontend on blur or change"""
+        widget = self._need(**query)
+        return await self.rerun(step, fragment_id=widget.fragment_id)
+
+
+# ============================================================================
+# JOURNEYS
+# ============================================================================
+
+class User:
+    """Session-level state of one virtual user: its browser, account, think time and journey count"""
+
+    def __init__(self, index: int, session: BrowserSession, think, rng: random.Random):
+        self.index = index
+        self.browser = session
+        self._think = think
+        self.rng = rng
+
+    async def think(self):
+        await asyncio.sleep(self._think(self.rng))
+
+
+async def login(user: User, role: str):
+    b = user.browser
+    await b.rerun("open_app")
+    await user.think()
+    b.fill(f"load{user.index}", key="login_username")
+    b.fill(PASSWORD, key="login_password")
+    await b.click("login", label="Login", kind="button")
+    await user.think()
+    await b.click("choose_role", key=f"btn_{role}")
+    if role == "student":
+        await user.think()
+        await b.click("student_onboarding", label="✌︎︎ I'm a High School Student!", kind="button")
+
+
+async def _open(user: User, choice_key: str, page: str):
+    await user.think()
+    user.browser.select(page, key=choice_key)
+    await user.browser.submit(f"open_{page.lower().replace(' ', '_')}", key=choice_key)
+
+
+async def journey_student_chat(user: User):
+    await _open(user, "student_choice", "Dashboard")
+    for turn in range(3):
+        await user.think()
+        await user.browser.chat("student_chat_turn", f"What could I study if I like maths? ({turn})")
+
+
+async def journey_grades_analysis(user: User):
+    b = user.browser
+    await _open(user, "student_choice", "Grades Analysis")
+    for back in ("btn_back_from_intl_entry", "btn_back_from_file_upload", "btn_back_to_student_type"):
+        if b.has(key=back):
+            await user.think()
+            await b.click("grades_back", key=back)
+    if not b.has(key="btn_portuguese"):
+        return  # grades already entered, the visit ends on the results
+    await user.think()
+    await user.browser.click("portuguese_student", key="btn_portuguese")
+    await user.think()
+    await user.browser.click("manual_entry", key="btn_manual_entry")
+
+
+async def journey_university_finder(user: User):
+    b = user.browser
+    await _open(user, "student_choice", "University Finder")
+    await user.think()
+    await b.click("choose_portugal", label="Portugal", kind="button")
+    if b.has(key="uf_use_report"):
+        b.check(False, key="uf_use_report")
+        await b.submit("manual_degree", key="uf_use_report")
+    await user.think()
+    b.fill("Informática", key="degree_text_input")
+    await b.submit("type_degree", key="degree_text_input")
+    await user.think()
+    await b.click("search_universities", label="Search Universities", kind="button")
+
+
+async def journey_student_reports(user: User):
+    await _open(user, "student_choice", "My Reports")
+
+
+async def journey_professional_chat(user: User):
+    await _open(user, "professional_choice", "Dashboard")
+    for turn in range(3):
+        await user.think()
+        await user.browser.chat("professional_chat_turn", f"How do I move into data science? ({turn})", key="prof_chat_input")
+
+
+async def journey_interview_practice(user: User):
+    b = user.browser
+    await _open(user, "professional_choice", "Interview Prep")
+    if b.has(label="← Back to interview setup", kind="button"):
+        # the previous practice is still open
+        await user.think()
+        await b.click("back_to_setup", label="← Back to interview setup", kind="button")
+    await user.think()
+    await b.click("start_practice", label="⟡ Start Quick Practice", kind="button")
+    for question in range(10):
+        if not b.has(key=f"answer_{question}"):
+            break
+        await user.think()
+        b.fill("I led a small team through a tight deadline and shipped on time.", key=f"answer_{question}")
+        await b.click("answer_question", label="Next →", kind="button")
+
+
+async def journey_professional_reports(user: User):
+    await _open(user, "professional_choice", "My Reports")
+
+
+JOURNEYS = {
+    "student": {
+        "student_chat": journey_student_chat,
+        "grades_analysis": journey_grades_analysis,
+        "university_finder": journey_university_finder,
+        "student_reports": journey_student_reports,
+    },
+    "professional": {
+        "professional_chat": journey_professional_chat,
+        "interview_practice": journey_interview_practice,
+        "professional_reports": journey_professional_reports,
+    },
+}
+
+
+# ============================================================================
+# RUNNER AND REPORT
+# ============================================================================
+
+class LoadStats:
+    """Interaction latencies and counters of the whole run (all sessions share one event loop)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latencies: list[float] = []
+        self.by_step: dict[str, list[float]] = defaultdict(list)
+        self.by_scope: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.journeys: dict[str, int] = defaultdict(int)
+        self.failed_journeys: dict[str, int] = defaultdict(int)
+        self.active_sessions = 0
+        self.in_flight = 0
+
+    def record(self, step: str, seconds: float, fragment_id: str, error: str | None = None):
+        if error:
+            self.errors[f"{step}: {error[:120]}"] += 1
+            return
+        self.latencies.append(seconds)
+        self.by_step[step].append(seconds)
+        self.by_scope["fragment" if fragment_id else "app"].append(seconds)
+
+
+def _lognormal_think(median_s: float, p95_s: float):
+    if median_s <= 0:
+        return lambda rng: 0.0
+    sigma = math.log(p95_s / median_s) / 1.645 if p95_s > median_s else 0.0
+    return lambda rng: rng.lognormvariate(math.log(median_s), sigma)
+
+
+async def virtual_user(index: int, args, stats: LoadStats, deadline: float, think):
+    """Logging in, running journeys until the deadline, starting a new session every --session-journeys"""
+    rng = random.Random(args.seed * 100003 + index)
+    role = "student" if rng.random() < args.student_share else "professional"
+    url = f"ws://127.0.0.1:{args.port}/_stcore/stream"
+    while time.perf_counter() < deadline:
+        stats.active_sessions += 1
+        try:
+            async with BrowserSession(url, stats, args.timeout) as browser:
+                user = User(index, browser, think, rng)
+                await login(user, role)
+                for _ in range(args.session_journeys):
+                    if time.perf_counter() >= deadline:
+                        break
+                    name, journey = rng.choice(list(JOURNEYS[role].items()))
+                    try:
+                        await journey(user)
+                        stats.journeys[name] += 1
+                    except InteractionError as e:
+                        stats.failed_journeys[name] += 1
+                        if "widget not rendered" in str(e):
+                            stats.errors[f"{name}: {str(e)[:120]}"] += 1
+                        break  # state unknown, start over with a fresh session
+        except (InteractionError, OSError, websockets.WebSocketException) as e:
+            stats.errors[f"session: {type(e).__name__}: {str(e)[:120]}"] += 1
+        finally:
+            stats.active_sessions -= 1
+
+
+def _read_server_stats(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+async def _sample(stats: LoadStats, stats_path: Path, interval_s: float, timeline: list, deadline: float):
+    while time.perf_counter() < deadline:
+        server = _read_server_stats(stats_path)
+        timeline.append({
+            "t_s": round(time.perf_counter() - stats.started, 1),
+            "active_sessions": stats.active_sessions,
+            "in_flight": stats.in_flight,
+            "interactions": len(stats.latencies),
+            "rss_mb": round(server["rss_mb"], 1) if server.get("rss_mb") else None,
+            "lock_waits": server.get("lock_waits"),
+        })
+        await asyncio.sleep(interval_s)
+
+
+def _wait_for_server(port: int, server: subprocess.Popen, timeout_s: float = 90):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(f"streamlit exited with {server.returncode} before it was ready")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    sys.exit("streamlit did not become healthy in time")
+
+
+def _latency_ms(samples: list[float]) -> dict:
+    return {
+        "count": len(samples),
+        "p50": round(percentile(samples, 50) * 1000, 1),
+        "p95": round(percentile(samples, 95) * 1000, 1),
+        "p99": round(percentile(samples, 99) * 1000, 1),
+        "max": round(max(samples, default=0.0) * 1000, 1),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run_load(args, stats_path: Path) -> dict:
+    stats = LoadStats()
+    think = _lognormal_think(args.think_median, args.think_p95)
+    deadline = stats.started + args.ramp_up + args.duration
+    timeline = []
+    sampler = asyncio.create_task(_sample(stats, stats_path, args.sample_interval, timeline, deadline))
+
+    users = []
+    for index in range(args.users):
+        # sessions start evenly over the ramp-up
+        users.append(asyncio.create_task(virtual_user(index, args, stats, deadline, think)))
+        await asyncio.sleep(args.ramp_up / args.users if args.users else 0)
+    await asyncio.gather(*users)
+    await sampler
+    elapsed = time.perf_counter() - stats.started
+
+    server = _read_server_stats(stats_path)
+    rss = [p["rss_mb"] for p in timeline if p["rss_mb"]]
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "users": args.users,
+            "ramp_up_s": args.ramp_up,
+            "duration_s": args.duration,
+            "student_share": args.student_share,
+            "think_median_s": args.think_median,
+            "think_p95_s": args.think_p95,
+            "session_journeys": args.session_journeys,
+            "model_latency": args.model_latency,
+            "server_env": args.server_env,
+        },
+        "elapsed_s": round(elapsed, 1),
+        "throughput": {
+            "interactions": len(stats.latencies),
+            "interactions_per_s": round(len(stats.latencies) / elapsed, 2),
+            "journeys": dict(stats.journeys),
+            "journeys_per_min": round(sum(stats.journeys.values()) / elapsed * 60, 1),
+            "failed_journeys": dict(stats.failed_journeys),
+        },
+        "latency_ms": {
+            "all": _latency_ms(stats.latencies),
+            "by_scope": {scope: _latency_ms(s) for scope, s in sorted(stats.by_scope.items())},
+            "by_step": {step: _latency_ms(s) for step, s in sorted(stats.by_step.items())},
+        },
+        "errors": dict(sorted(stats.errors.items(), key=lambda kv: -kv[1])),
+        "server": {
+            "rss_mb_start": rss[0] if rss else None,
+            "rss_mb_peak": max(rss) if rss else None,
+            "rss_mb_end": rss[-1] if rss else None,
+            "threads": server.get("threads"),
+            "lock_waits": server.get("lock_waits"),
+            "lock_timeouts": server.get("lock_timeouts"),
+            "lock_wait_ms_total": server.get("lock_wait_ms_total"),
+            "lock_wait_ms_p50": server.get("lock_wait_ms_p50"),
+            "lock_wait_ms_p95": server.get("lock_wait_ms_p95"),
+            "lock_wait_ms_max": server.get("lock_wait_ms_max"),
+            "reruns": server.get("reruns", {}),
+        },
+        "timeline": timeline,
+    }
+
+
+def _start_server(args, stats_path: Path) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "GEMINI_BACKEND": "fake",
+        "GOOGLE_API_KEY": env.get("GOOGLE_API_KEY") or "load-test-fake-key",
+        "LANGFUSE_SINK": "memory",
+        "TMPDIR": str(stats_path.parent),  # throwaway database and report index
+    })
+    if args.model_latency:
+        env["GEMINI_FAKE_LATENCY"] = args.model_latency
+    for item in args.server_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    log = open(stats_path.parent / "streamlit.log", "w")
+    return subprocess.Popen(
+        [sys.executable, __file__, "--serve", "--port", str(args.port), "--users", str(args.users),
+         "--stats-file", str(stats_path), "--sample-interval", str(args.sample_interval)],
+        cwd=APP_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+def _print_report(results: dict):
+    t, lat, srv = results["throughput"], results["latency_ms"], results["server"]
+    print(f"{results['config']['users']} users, {results['elapsed_s']:.0f} s: "
+          f"{t['interactions']} interactions ({t['interactions_per_s']}/s), {t['journeys_per_min']} journeys/min")
+    print(f"rerun latency p50 {lat['all']['p50']:.0f} ms, p95 {lat['all']['p95']:.0f} ms, p99 {lat['all']['p99']:.0f} ms")
+    for scope, s in lat["by_scope"].items():
+        print(f"    {scope:<24} {s['count']:>6} runs  p50 {s['p50']:>8.0f}  p95 {s['p95']:>8.0f}  p99 {s['p99']:>8.0f} ms")
+    for step, s in lat["by_step"].items():
+        print(f"    {step:<24} {s['count']:>6} runs  p50 {s['p50']:>8.0f}  p95 {s['p95']:>8.0f}  p99 {s['p99']:>8.0f} ms")
+    print(f"SQLite lock waits: {srv['lock_waits']} ({srv['lock_wait_ms_total']} ms total, "
+          f"p95 {srv['lock_wait_ms_p95']} ms, max {srv['lock_wait_ms_max']} ms, {srv['lock_timeouts']} timeouts)")
+    if srv["rss_mb_peak"]:
+        print(f"server RSS: {srv['rss_mb_start']:.0f} MB -> peak {srv['rss_mb_peak']:.0f} MB, end {srv['rss_mb_end']:.0f} MB")
+    if results["errors"]:
+        print(f"errors ({sum(results['errors'].values())}):")
+        for error, count in list(results["errors"].items())[:10]:
+            print(f"    {count:>5}  {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-session load test of zapp.py over the Streamlit websocket")
+    parser.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    parser.add_argument("--ramp-up", type=float, default=60, help="seconds over which the users start")
+    parser.add_argument("--duration", type=float, default=300, help="seconds of full load after the ramp-up")
+    parser.add_argument("--student-share", type=float, default=0.6, help="fraction of users on the student dashboard")
+    parser.add_argument("--think-median", type=float, default=5.0, help="median seconds between interactions")
+    parser.add_argument("--think-p95", type=float, default=20.0, help="95th percentile think time")
+    parser.add_argument("--session-journeys", type=int, default=3, help="journeys per login before the user opens a new session")
+    parser.add_argument("--model-latency", help="GEMINI_FAKE_LATENCY for the server (default: the fake's own)")
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE", help="extra environment for the server, e.g. GEMINI_REQUESTS_PER_MINUTE=6000")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds before an interaction counts as failed")
+    parser.add_argument("--sample-interval", type=float, default=2.0, help="seconds between RSS/lock wait samples")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON results file (default: bench/load-<commit>-<time>.json)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--stats-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.users, Path(args.stats_file), args.sample_interval)
+        return
+
+    workdir = Path(tempfile.mkdtemp(prefix="career_corner_load_"))
+    stats_path = workdir / "server_stats.json"
+    server = _start_server(args, stats_path)
+    try:
+        _wait_for_server(args.port, server)
+        results = asyncio.run(run_load(args, stats_path))
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    out = Path(args.out) if args.out else APP_DIR / "bench" / f"load-{results['commit'] or 'nogit'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2) + "\n")
+    _print_report(results)
+    print(f"Server log: {workdir / 'streamlit.log'}")
+    print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
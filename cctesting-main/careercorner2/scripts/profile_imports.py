@@ -0,0 +1,94 @@
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# run from the app folder: python scripts/profile_imports.py [--json]
+# exits with 1 when a module is over budget or a dashboard imports a page eagerly
+APP_DIR = Path(__file__).resolve().parent.parent
+
+DASHBOARDS = ["pages.student_dashboard", "pages.professional_dashboard"]
+PAGES = [
+    "pages.student_chat",
+    "pages.student_career_quiz",
+    "pages.degree_picker",
+    "pages.grades_analysis",
+    "pages.university_finder",
+    "pages.student_resources",
+    "pages.professional_chat",
+    "pages.cv_analysis",
+    "pages.career_growth_quiz",
+    "pages.resources",
+    "pages.interview_simulator",
+    "pages.cv_builder",
+    "utils.reports",
+]
+
+DASHBOARD_BUDGET_MS = 1500  # cold import of a dashboard (streamlit + dotenv + router)
+PAGE_BUDGET_MS = 4000       # first render of a page pays for its own imports
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile(module: str) -> dict:
+    """Cold import of one module in a fresh interpreter under -X importtime"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+    )
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000, "depth": len(indent) // 2})
+    total = next((i["cumulative_ms"] for i in imports if i["module"] == module), None)
+    error = None if proc.returncode == 0 else proc.stderr.strip().splitlines()[-1]
+    return {"module": module, "total_ms": total, "imports": imports, "error": error}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of the dashboards and pages")
+    parser.add_argument("--json", action="store_true", help="print one JSON report instead of text")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports listed per module")
+    parser.add_argument("--dashboard-budget-ms", type=float, default=DASHBOARD_BUDGET_MS)
+    parser.add_argument("--page-budget-ms", type=float, default=PAGE_BUDGET_MS)
+    args = parser.parse_args()
+
+    report, failures = [], []
+    for module in DASHBOARDS + PAGES:
+        result = profile(module)
+        budget = args.dashboard_budget_ms if module in DASHBOARDS else args.page_budget_ms
+        result["budget_ms"] = budget
+        if result["error"]:
+            failures.append(f"{module}: import failed ({result['error']})")
+        elif result["total_ms"] > budget:
+            failures.append(f"{module}: {result['total_ms']:.0f} ms > {budget:.0f} ms budget")
+        if module in DASHBOARDS:
+            # the router must not pull in page modules at import time
+            eager = sorted({i["module"] for i in result["imports"]} & set(PAGES))
+            result["eager_pages"] = eager
+            if eager:
+                failures.append(f"{module}: imports pages eagerly: {', '.join(eager)}")
+        result["slowest"] = sorted(result.pop("imports"), key=lambda i: -i["self_ms"])[:args.top]
+        report.append(result)
+
+    if args.json:
+        print(json.dumps({"modules": report, "failures": failures}, indent=2))
+    else:
+        for result in report:
+            total = "failed" if result["error"] else f"{result['total_ms']:.0f} ms"
+            print(f"{result['module']}: {total} (budget {result['budget_ms']:.0f} ms)")
+            for i in result["slowest"]:
+                print(f"    {i['self_ms']:8.1f} ms  {i['module']}")
+        print()
+        print("\n".join(failures) if failures else "All imports within budget")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
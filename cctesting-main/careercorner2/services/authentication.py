@@ -1,5 +1,10 @@
 import streamlit as st
 import sqlite3
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timezone
 import re
@@ -8,50 +13,229 @@ from dotenv import load_dotenv
 from pathlib import Path
 import tempfile
 from utils.database import init_database
+from services.rate_limiter import FailureWindow
 
 load_dotenv()
 
 DB_PATH = Path(tempfile.gettempdir()) / "career_corner.db"
 
+# werkzeug method string; stored hashes made with another method are upgraded on the next successful login
+HASH_METHOD = os.getenv("AUTH_HASH_METHOD", "scrypt:32768:8:1")
+HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "2"))           # password hashes computed at once (scrypt uses 32 MB each)
+HASH_MAX_PENDING = int(os.getenv("AUTH_HASH_MAX_PENDING", "16"))  # running + queued hashes before logins are turned away
+DB_POOL_SIZE = int(os.getenv("AUTH_DB_POOL_SIZE", "4"))
+DB_POOL_TIMEOUT_S = float(os.getenv("AUTH_DB_POOL_TIMEOUT_S", "5"))  # wait for a free connection before turning the login away
+MAX_ACCOUNT_FAILURES = int(os.getenv("AUTH_MAX_ACCOUNT_FAILURES", "5"))
+MAX_IP_FAILURES = int(os.getenv("AUTH_MAX_IP_FAILURES", "20"))
+FAILURE_WINDOW_S = float(os.getenv("AUTH_FAILURE_WINDOW_S", "300"))
+CLIENT_IP_HEADER = os.getenv("AUTH_CLIENT_IP_HEADER", "")  # e.g. X-Forwarded-For behind a proxy, else the websocket peer
+
+_USER_COLUMNS = "id, username, display_name, email, password_hash"
+
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-hash")
+_account_failures = FailureWindow(MAX_ACCOUNT_FAILURES, FAILURE_WINDOW_S)
+_ip_failures = FailureWindow(MAX_IP_FAILURES, FAILURE_WINDOW_S)
+_stats_lock = threading.Lock()
+_stats = {"hash_pending": 0, "hashes": 0, "busy_rejections": 0, "pool_timeouts": 0, "rehashed": 0}
+
 def init_db():
     return init_database()
 
+class LoginThrottled(RuntimeError):
+    """Raised when an account or client failed too often, or too many hashes are already queued"""
+
+    def __init__(self, message: str, retry_after_s: float):
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+def _count(stat: str):
+    with _stats_lock:
+        _stats[stat] += 1
+
+class _ConnectionPool:
+    """A few long-lived connections shared by all sessions, opened on first use"""
+
+    def __init__(self, size: int, timeout_s: float):
+        self.size = size
+        self.timeout_s = timeout_s
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                conn = None
+                if self._opened < self.size:
+                    self._opened += 1
+                    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            if conn is None:
+                try:
+                    conn = self._idle.get(timeout=self.timeout_s)
+                except queue.Empty:
+                    _count("pool_timeouts")
+                    raise LoginThrottled("Too many sign-ins right now, please try again in a few seconds.", self.timeout_s)
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+_pool = _ConnectionPool(DB_POOL_SIZE, DB_POOL_TIMEOUT_S)
+
+def auth_connection():
+    """
+    Borrowing a pooled connection to the users database: `with auth_connection() as conn:`.
+    Held only around queries, never while a password hash runs.
+    """
+    return _pool.connection()
+
+@contextmanager
+def _connection(conn=None):
+    # the caller's connection when it passed one, else a pooled one for this block
+    if conn is not None:
+        yield conn
+        return
+    with auth_connection() as pooled:
+        yield pooled
+
+def _run_hash(fn, *args):
+    # the script thread waits for the result, but only HASH_WORKERS hashes burn CPU at once
+    with _stats_lock:
+        if _stats["hash_pending"] >= HASH_MAX_PENDING:
+            _stats["busy_rejections"] += 1
+            raise LoginThrottled("Too many sign-ins right now, please try again in a few seconds.", 5.0)
+        _stats["hash_pending"] += 1
+        _stats["hashes"] += 1
+    try:
+        return _hash_pool.submit(fn, *args).result()
+    finally:
+        with _stats_lock:
+            _stats["hash_pending"] -= 1
+
+def hash_password(password: str) -> str:
+    return _run_hash(generate_password_hash, password, HASH_METHOD)
+
+def verify_password(pw_hash: str, password: str) -> bool:
+    return _run_hash(check_password_hash, pw_hash, password)
+
+@lru_cache(maxsize=1)
+def _reference_hash() -> str:
+    # checked against for unknown users, so they cost as much as a wrong password
+    return hash_password("career-corner-no-such-user")
+
+def _needs_rehash(pw_hash: str) -> bool:
+    return pw_hash.split("$", 1)[0] != _reference_hash().split("$", 1)[0]
+
+def _row_to_user(row):
+    return {
+        "id": row[0], "username": row[1], "display_name": row[2],
+        "email": row[3], "password_hash": row[4]
+    }
+
 def get_user_by_username(conn, username):
+    # two lookups, each on its own unique index; emails are tried first when it looks like one
+    identifier = username.lower()
+    columns = ("email", "username") if "@" in identifier else ("username", "email")
     cur = conn.cursor()
-    cur.execute("SELECT * FROM users WHERE username = ? OR email = ?", (username.lower(), username.lower()))
-    row = cur.fetchone()
-    if row:
-        return {
-            "id": row[0], "username": row[1], "display_name": row[2],
-            "email": row[3], "password_hash": row[4]
-        }
+    for column in columns:
+        cur.execute(f"SELECT {_USER_COLUMNS} FROM users WHERE {column} = ?", (identifier,))
+        row = cur.fetchone()
+        if row:
+            return _row_to_user(row)
     return None
 
 def create_user(conn, username, display_name, email, password):
+    # hashed before a connection is borrowed (conn=None uses the pool)
+    pw_hash = hash_password(password)
+    now_utc = datetime.now(timezone.utc).isoformat()
     try:
-        pw_hash = generate_password_hash(password)
-        now_utc = datetime.now(timezone.utc).isoformat()
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO users (username, display_name, email, password_hash, created_at) VALUES (?, ?, ?, ?, ?)",
-            (username.lower(), display_name, email.lower(), pw_hash, now_utc)
-        )
-        conn.commit()
+        with _connection(conn) as db:
+            cur = db.cursor()
+            cur.execute(
+                "INSERT INTO users (username, display_name, email, password_hash, created_at) VALUES (?, ?, ?, ?, ?)",
+                (username.lower(), display_name, email.lower(), pw_hash, now_utc)
+            )
+            db.commit()
         return True
     except sqlite3.IntegrityError:
         return False
 
+def client_ip():
+    """Client address used for per-IP throttling (None for localhost)"""
+    if CLIENT_IP_HEADER:
+        forwarded = st.context.headers.get(CLIENT_IP_HEADER)
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return st.context.ip_address
+
+def authenticate(identifier, password, ip=None, conn=None):
+    """
+    Checking a username/email and password, returning the user or None.
+
+    Clients and accounts with too many recent failures are refused before any
+    hashing is done (LoginThrottled); unknown users are checked against a
+    reference hash so they take as long as a wrong password. Pooled connections
+    are borrowed for the lookup and the rehash UPDATE only.
+    """
+    ip_key = f"ip:{ip}" if ip else None
+    if ip_key:
+        wait = _ip_failures.retry_after(ip_key)
+        if wait:
+            raise LoginThrottled(f"Too many failed logins, try again in {wait:.0f}s.", wait)
+
+    with _connection(conn) as db:
+        user = get_user_by_username(db, identifier)
+    account_key = f"user:{user['id']}" if user else f"name:{identifier.lower()}"
+    wait = _account_failures.retry_after(account_key)
+    if wait:
+        raise LoginThrottled(f"Too many failed logins for this account, try again in {wait:.0f}s.", wait)
+
+    valid = verify_password(user["password_hash"] if user else _reference_hash(), password)
+    if not (user and valid):
+        _account_failures.record_failure(account_key)
+        if ip_key:
+            _ip_failures.record_failure(ip_key)
+        return None
+
+    _account_failures.reset(account_key)
+    if _needs_rehash(user["password_hash"]):
+        try:
+            new_hash = hash_password(password)
+            with _connection(conn) as db:
+                db.execute("UPDATE users SET password_hash = ? WHERE id = ?", (new_hash, user["id"]))
+                db.commit()
+            user["password_hash"] = new_hash
+            _count("rehashed")
+        except LoginThrottled:
+            pass  # upgraded on a quieter login
+    return user
+
+def auth_stats() -> dict:
+    """Hash pool and throttling counters for the metrics endpoint"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["account_throttle"] = _account_failures.stats()
+    stats["ip_throttle"] = _ip_failures.stats()
+    return stats
+
 def login_ui(conn=None):
-    if conn is None:
-        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    
     st.subheader("Login")
     username = st.text_input("Username/Email", key="login_username").strip().lower()
     password = st.text_input("Password", type="password", key="login_password")
 
     if st.button("Login"):
-        user = get_user_by_username(conn, username)
-        if user and check_password_hash(user["password_hash"], password):
+        try:
+            user = authenticate(username, password, client_ip(), conn)
+        except LoginThrottled as e:
+            st.error(str(e))
+            return False
+        if user:
             st.session_state.logged_in = True
             st.session_state.username = user["email"]
             st.session_state.user_display_name = user["display_name"]
@@ -61,14 +245,9 @@ def login_ui(conn=None):
         else:
             st.error("Invalid username or password.")
 
-    if conn:
-        conn.close()
     return st.session_state.get("logged_in", False)
 
 def register_ui(conn=None):
-    if conn is None:
-        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    
     st.subheader("Register")
     display_name = st.text_input("Full name")
     username = st.text_input("Username", key="reg_username").strip().lower()
@@ -88,14 +267,16 @@ def register_ui(conn=None):
             st.error("Name and username required")
             return
 
-        if create_user(conn, username, display_name, email, password):
+        try:
+            created = create_user(conn, username, display_name, email, password)
+        except LoginThrottled as e:
+            st.error(str(e))
+            return
+        if created:
             st.success("Account created! Please login.")
         else:
             st.error("Username/email exists")
 
-    if conn:
-        conn.close()
-
 def require_login():
     if "logged_in" not in st.session_state or not st.session_state.logged_in:
         st.warning("Please log in")
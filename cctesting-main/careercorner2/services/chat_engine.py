@@ -0,0 +1,196 @@
+# services/chat_engine.py
+# SESSION-SCOPED MULTI-TURN CHAT: STRUCTURED HISTORY, COMPACTION TO A TOKEN BUDGET, SQLITE PERSISTENCE
+
+import os
+from google.genai import types
+from utils.database import save_chat_session, load_chat_session, delete_chat_session
+
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000"))  # tokens of raw turns kept verbatim
+KEEP_RECENT_MESSAGES = int(os.getenv("CHAT_KEEP_RECENT_MESSAGES", "4"))   # never folded into the summary
+CHARS_PER_TOKEN = 4  # rough estimate, good enough for a budget check
+
+SUMMARY_INSTRUCTION = (
+    "You maintain the running memory of a career counselling chat. "
+    "Merge the existing summary and the new turns into one concise summary (max 150 words): "
+    "the user's situation, interests, concerns, anything they ruled out and what was already suggested. "
+    "Write plain prose, no headings."
+)
+
+
+def _text(content: types.Content) -> str:
+    return "".join(part.text or "" for part in content.parts or [])
+
+
+def estimate_tokens(history: list[types.Content]) -> int:
+    return sum(len(_text(c)) for c in history) // CHARS_PER_TOKEN
+
+
+class ChatEngine:
+    """
+    One dashboard chat: structured Content history plus a running summary of older turns.
+
+    Every turn sends the real multi-turn history instead of pasting it into the
+    system instruction. Once the verbatim turns exceed the token budget the oldest
+    ones are folded into the summary, so per-turn prompt size stays bounded.
+    The compacted state is saved to SQLite after each turn and restored on resume.
+    """
+
+    def __init__(
+        self,
+        gemini,
+        user_id: str,
+        chat_key: str,
+        feature: str = "chat",
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        keep_recent: int = KEEP_RECENT_MESSAGES,
+    ):
+        self.gemini = gemini  # LangfuseGeminiWrapper
+        self.user_id = user_id
+        self.chat_key = chat_key
+        self.feature = feature
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.history: list[types.Content] = []
+        self.summary = ""
+        self.turn = 0
+        self._reply_trace_id = None  # Langfuse trace of the streamed reply, handed out by finish_turn()
+
+    @classmethod
+    def resume(cls, gemini, user_id: str, chat_key: str, feature: str = "chat") -> "ChatEngine":
+        """Restoring the compacted history saved for this user and chat, if any"""
+        engine = cls(gemini, user_id, chat_key, feature=feature)
+        saved = load_chat_session(user_id, chat_key)
+        if saved:
+            engine.summary = saved["summary"]
+            engine.turn = saved["turn"]
+            engine.history = [
+                types.Content(role=m["role"], parts=[types.Part(text=m["text"])])
+                for m in saved["history"]
+            ]
+        return engine
+
+    def messages(self) -> list[dict]:
+        """Verbatim turns in the {"role", "content"} shape the chat pages render"""
+        return [
+            {"role": "assistant" if c.role == "model" else "user", "content": _text(c)}
+            for c in self.history
+        ]
+
+    def _system_instruction(self, base: str) -> str:
+        if not self.summary:
+            return base
+        return f"{base}\n\nSummary of the earlier conversation:\n{self.summary}"
+
+    def stream_reply(
+        self,
+        user_text: str,
+        system_instruction: str,
+        temperature: float = 0.4,
+        session_id: str = None,
+        metadata: dict = None,
+    ):
+        """
+        Streaming the model's reply to user_text (pass straight to st.write_stream).
+        Call finish_turn() once the stream is consumed: compaction is a second model
+        call and must not hold up the streamed turn.
+        """
+        self.turn += 1
+        self.history.append(types.Content(role="user", parts=[types.Part(text=user_text)]))
+        self._reply_trace_id = None
+        chunks = []
+        completed = False
+        try:
+            for text in self.gemini.generate_content_stream(
+                prompt=user_text,
+                contents=list(self.history),
+                system_instruction=self._system_instruction(system_instruction),
+                temperature=temperature,
+                user_id=self.user_id,
+                session_id=session_id,
+                metadata={
+                    "turn": self.turn,
+                    "history_messages": len(self.history),
+                    "history_tokens_est": estimate_tokens(self.history),
+                    "has_summary": bool(self.summary),
+                    **(metadata or {}),
+                },
+                feature=self.feature,
+                on_trace=self._reply_traced,
+            ):
+                chunks.append(text)
+                yield text
+            completed = True
+        finally:
+            if not completed:
+                # keep user/model turns alternating if the call failed or was abandoned
+                self.history.pop()
+                self.turn -= 1
+
+        # empty text parts are rejected by the API on the next turn
+        reply = "".join(chunks) or "(no reply)"
+        self.history.append(types.Content(role="model", parts=[types.Part(text=reply)]))
+
+    def _reply_traced(self, trace_id: str | None):
+        # the engine lives in one session, unlike the shared Gemini wrapper
+        self._reply_trace_id = trace_id
+
+    def finish_turn(self, session_id: str = None) -> str | None:
+        """Compacting and saving after a streamed reply, returns the reply's trace id (None when not exported)"""
+        # taken before compacting, whose own generation must not be scored as the reply
+        trace_id, self._reply_trace_id = self._reply_trace_id, None
+        self.compact(session_id)
+        self.save()
+        return trace_id
+
+    def compact(self, session_id: str = None):
+        """Folding the oldest turns into the summary once the verbatim history is over budget"""
+        if estimate_tokens(self.history) <= self.token_budget:
+            return
+        # cut on a user turn so the kept history still starts with the user
+        cut = max(0, len(self.history) - max(self.keep_recent, 2))
+        while cut > 0 and self.history[cut].role != "user":
+            cut -= 1
+        if cut == 0:
+            return
+
+        old, self.history = self.history[:cut], self.history[cut:]
+        transcript = "\n".join(
+            f"{'ASSISTANT' if c.role == 'model' else 'USER'}: {_text(c)}" for c in old
+        )
+        try:
+            self.summary = self.gemini.generate_content(
+                prompt=f"Existing summary:\n{self.summary or 'None'}\n\nNew turns:\n{transcript}",
+                system_instruction=SUMMARY_INSTRUCTION,
+                temperature=0.2,
+                user_id=self.user_id,
+                session_id=session_id,
+                feature="chat_compaction",
+            ).strip()
+        except Exception as e:
+            # old turns are dropped either way, the budget matters more than their detail
+            print(f"🔴 Chat compaction failed, keeping previous summary: {e}")
+
+    def save(self):
+        save_chat_session(
+            self.user_id,
+            self.chat_key,
+            self.summary,
+            [{"role": c.role, "text": _text(c)} for c in self.history],
+            self.turn,
+        )
+
+    def reset(self):
+        self.history = []
+        self.summary = ""
+        self.turn = 0
+        delete_chat_session(self.user_id, self.chat_key)
+
+
+def session_chat_engine(session_state, key: str, gemini, user_id: str, chat_key: str, feature: str) -> ChatEngine:
+    """ChatEngine kept in the Streamlit session, resumed from SQLite the first time"""
+    engine = session_state.get(key)
+    if engine is None or engine.user_id != user_id:
+        engine = ChatEngine.resume(gemini, user_id, chat_key, feature=feature)
+        session_state[key] = engine
+    return engine
@@ -0,0 +1,225 @@
+# services/context_cache.py
+# EXPLICIT GEMINI CONTEXT CACHING FOR CHAT SESSIONS (instructions + user data cached once per session)
+
+import atexit
+import hashlib
+import os
+import time
+import weakref
+from collections import deque
+from google.genai import errors, types
+from services.gemini_client import GEMINI_LIMITER, MAX_QUEUE_WAIT_S, gated_generate_content
+
+
+CACHE_ENABLED = os.getenv("GEMINI_CONTEXT_CACHE", "1") != "0"
+CACHE_TTL_S = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_S", "1800"))  # idle lifetime, extended while the chat is used
+
+# returned when a cache expired or was deleted server-side
+_STALE_CACHE_CODES = {400, 403, 404}
+
+# caches whose session state was garbage collected (session disconnected) while still live server-side;
+# filled from weakref finalizers, so only deque appends happen there
+_ORPHANED = deque()
+_OPEN_CACHES = weakref.WeakSet()
+
+
+def _orphan(client, handle: dict):
+    if handle["name"]:
+        _ORPHANED.append((client, handle["name"]))
+
+
+def delete_orphaned_caches() -> int:
+    """Deleting server-side caches left behind by sessions that went away, returns how many"""
+    deleted = 0
+    while _ORPHANED:
+        try:
+            client, name = _ORPHANED.popleft()
+        except IndexError:
+            break
+        try:
+            client.caches.delete(name=name)
+            deleted += 1
+            print(f"🟢 Orphaned context cache deleted: {name}")
+        except Exception as e:
+            print(f"🔴 Orphaned context cache delete failed for {name}: {e}")
+    return deleted
+
+
+def context_fingerprint(model: str, system_instruction: str) -> str:
+    return hashlib.sha256(f"{model}\n{system_instruction}".encode("utf-8")).hexdigest()
+
+
+class ChatContextCache:
+    """
+    One explicit context cache holding a chat's system instruction and tools.
+
+    Turns reference the cache by name instead of re-sending the context.
+    If it can't be created (e.g. the context is below the model's minimum
+    cacheable size) or has expired server-side, the context is sent inline.
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str,
+        system_instruction: str,
+        tools: list | None = None,
+        ttl_s: int = CACHE_TTL_S,
+        display_name: str = "chat_context",
+    ):
+        self.client = client
+        self.model = model
+        self.system_instruction = system_instruction
+        self.tools = tools
+        self.ttl_s = ttl_s
+        self.display_name = display_name
+        self.fingerprint = context_fingerprint(model, system_instruction)
+        # the live cache name sits in a dict the finalizer can read after this object is gone
+        self._handle = {"name": None}
+        self.expires_at = 0.0
+        self.disabled = not CACHE_ENABLED
+        # at exit _close_all_caches closes what is still open
+        weakref.finalize(self, _orphan, client, self._handle).atexit = False
+        _OPEN_CACHES.add(self)
+
+    @property
+    def name(self) -> str | None:
+        return self._handle["name"]
+
+    @name.setter
+    def name(self, value: str | None):
+        self._handle["name"] = value
+
+    def _create(self):
+        GEMINI_LIMITER.acquire(timeout=MAX_QUEUE_WAIT_S)
+        cache = self.client.caches.create(
+            model=self.model,
+            config=types.CreateCachedContentConfig(
+                display_name=self.display_name,
+                system_instruction=self.system_instruction,
+                tools=self.tools,
+                ttl=f"{self.ttl_s}s",
+            ),
+        )
+        self.name = cache.name
+        self.expires_at = time.monotonic() + self.ttl_s
+        print(f"🟢 Context cache created: {self.name}")
+
+    def _extend(self):
+        """Sliding expiry: pushing the TTL out once half of it has been used"""
+        GEMINI_LIMITER.acquire(timeout=MAX_QUEUE_WAIT_S)
+        self.client.caches.update(
+            name=self.name,
+            config=types.UpdateCachedContentConfig(ttl=f"{self.ttl_s}s"),
+        )
+        self.expires_at = time.monotonic() + self.ttl_s
+
+    def cache_name(self) -> str | None:
+        """Name of a live cache for this context, creating or extending it when needed"""
+        if self.disabled:
+            return None
+        try:
+            if self.name is None or time.monotonic() >= self.expires_at:
+                self.name = None
+                self._create()
+            elif self.expires_at - time.monotonic() < self.ttl_s / 2:
+                self._extend()
+        except errors.APIError as e:
+            print(f"🔴 Context cache unavailable, sending context inline: {e}")
+            self.name = None
+            if e.code == 400:
+                # too small to cache or unsupported for this model, don't retry every turn
+                self.disabled = True
+        except Exception as e:
+            print(f"🔴 Context cache unavailable, sending context inline: {e}")
+            self.name = None
+        return self.name
+
+    def _inline_config(self, **config_kwargs) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            system_instruction=self.system_instruction,
+            tools=self.tools,
+            **config_kwargs,
+        )
+
+    def config(self, **config_kwargs) -> types.GenerateContentConfig:
+        name = self.cache_name()
+        if name:
+            # system instruction and tools live in the cache and must not be repeated
+            return types.GenerateContentConfig(cached_content=name, **config_kwargs)
+        return self._inline_config(**config_kwargs)
+
+    def generate_content(self, contents, feature: str = "unlabelled", **config_kwargs):
+        """gated_generate_content against the cached context, falling back to inline once if the cache is gone"""
+        config = self.config(**config_kwargs)
+        try:
+            return gated_generate_content(
+                self.client,
+                model=self.model,
+                contents=contents,
+                config=config,
+                feature=feature,
+            )
+        except errors.APIError as e:
+            if not config.cached_content or e.code not in _STALE_CACHE_CODES:
+                raise
+            print(f"🔴 Context cache {config.cached_content} rejected ({e.code}), resending context inline")
+            self.name = None
+            return gated_generate_content(
+                self.client,
+                model=self.model,
+                contents=contents,
+                config=self._inline_config(**config_kwargs),
+                feature=feature,
+            )
+
+    def close(self):
+        """Deleting the server-side cache (chat restarted, context changed or chat left)"""
+        if not self.name:
+            return
+        name, self.name = self.name, None
+        try:
+            self.client.caches.delete(name=name)
+        except Exception as e:
+            print(f"🔴 Context cache delete failed for {name}: {e}")
+
+
+def session_context_cache(
+    session_state,
+    key: str,
+    client,
+    model: str,
+    system_instruction: str,
+    tools: list | None = None,
+) -> ChatContextCache:
+    """
+    Chat context cache stored in the session, reused while the context is unchanged.
+    Changing the selected CV/quiz/report changes the context and replaces the cache.
+    Caches of sessions that disconnected without closing theirs are deleted here too.
+    """
+    delete_orphaned_caches()
+    cache = session_state.get(key)
+    if cache is not None and cache.fingerprint == context_fingerprint(model, system_instruction):
+        return cache
+    if cache is not None:
+        cache.close()
+    cache = ChatContextCache(client, model, system_instruction, tools=tools, display_name=key)
+    session_state[key] = cache
+    return cache
+
+
+def close_session_cache(session_state, key: str):
+    cache = session_state.get(key)
+    if cache is not None:
+        cache.close()
+        del session_state[key]
+
+
+def _close_all_caches():
+    # sessions still open when the process exits can't close their own caches
+    for cache in list(_OPEN_CACHES):
+        cache.close()
+    delete_orphaned_caches()
+
+
+atexit.register(_close_all_caches)
@@ -0,0 +1,367 @@
+# services/fake_gemini.py
+# LOCAL STAND-IN FOR genai.Client (GEMINI_BACKEND=fake): CANNED SCHEMA-VALID RESPONSES WITH SAMPLED LATENCY, NO NETWORK
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+from google.genai import types
+
+
+# latency specs: "0", "fixed:MS", "uniform:LO,HI" or "lognormal:MEDIAN,P95" (milliseconds),
+# per-feature overrides after the default: "lognormal:800,3000;university_search=lognormal:6000,15000"
+FAKE_LATENCY = os.getenv("GEMINI_FAKE_LATENCY", "lognormal:800,3000")
+FAKE_TTFT = os.getenv("GEMINI_FAKE_TTFT", "lognormal:400,1200")  # streams: first chunk, the rest paced over FAKE_LATENCY
+FAKE_SEED = int(os.getenv("GEMINI_FAKE_SEED", "0"))
+FAKE_RESPONSES = os.getenv("GEMINI_FAKE_RESPONSES")  # optional JSON file {feature: text or JSON value} overriding the canned ones
+STREAM_CHUNKS = 6
+EMBEDDING_DIM = 768
+
+_QUESTIONS_SLIDER = {
+    "question": "How much do you enjoy working under pressure and tight deadlines?",
+    "aspect": "pressure",
+    "type": "slider",
+    "scale": {"0": "Very stressful", "50": "OK", "100": "I thrive on it"},
+}
+_QUESTIONS_CHOICE = {
+    "question": "What kind of tasks do you usually enjoy more?",
+    "aspect": "task_type",
+    "type": "multiple_choice",
+    "options": ["Working with people", "Analytical/technical tasks", "Creative work", "Organizing and planning"],
+}
+_INTERVIEW_QUESTIONS = {"questions": [
+    {"question": "Tell me about a project you are proud of.", "category": "Behavioral", "tips": "Use the STAR method."},
+    {"question": "How do you prioritise competing deadlines?", "category": "Situational", "tips": "Give a concrete example."},
+    {"question": "Why do you want this role?", "category": "Motivation", "tips": "Link your goals to the company."},
+]}
+
+# one entry per feature label (the `feature` or metadata "type" the pages send), JSON values are serialised
+CANNED_RESPONSES = {
+    "cv_extraction": "Sample value",
+    "cv_feedback": "## CV Feedback\n\n**Strengths:** clear structure.\n\n**Improve:** quantify your achievements.",
+    "cv_polish": {
+        "name": "Alex Sample",
+        "email": "alex@example.com",
+        "phone": "+351 900 000 000",
+        "location": "Lisbon, Portugal",
+        "summary": "Analytical graduate with hands-on project experience.",
+        "education": [{"degree": "BSc", "field": "Computer Science", "school": "Universidade de Lisboa", "years": "2019-2022"}],
+        "work_experience": [{"title": "Junior Analyst", "company": "Example Lda", "years": "2022-2024", "description": "Built weekly reporting."}],
+        "skills": ["Python", "SQL", "Communication"],
+        "achievements": ["Cut reporting time by 40%"],
+    },
+    "cover_letter": "Dear Hiring Manager,\n\nI am excited to apply for this role.\n\nKind regards,\nAlex Sample",
+    "career_growth_experience_questions": {"questions": [_QUESTIONS_SLIDER, _QUESTIONS_CHOICE]},
+    "career_growth_softskills_questions": {"questions": [
+        {**_QUESTIONS_SLIDER, "question": "How comfortable are you leading a meeting?", "aspect": "leadership"},
+        {**_QUESTIONS_CHOICE, "question": "How do you usually resolve conflicts?", "aspect": "conflict"},
+    ]},
+    "career_growth_report": "SECTOR: Technology\n\n## Career Profile\n\nYou enjoy analytical work in collaborative teams.",
+    "university_search": {"universities": [{
+        "name": "Universidade de Lisboa",
+        "program_name": "Informática",
+        "city": "Lisbon",
+        "country": "Portugal",
+        "program_duration": "3 years",
+        "language_of_instruction": "Portuguese",
+        "ranking": "Top 200",
+        "tuition_annual": "€697",
+        "admission_requirements": "Matemática A (635)",
+        "application_deadline": "July",
+        "website": "https://www.ulisboa.pt",
+    }]},
+    "grades_extraction": {
+        "student_type": "portuguese",
+        "current_year": "12th Grade (In Progress)",
+        "track": "Ciências e Tecnologias",
+        "grades": {
+            "10th": {"Português": 15, "Matemática A": 17, "Inglês": 16},
+            "11th": {"Português": 16, "Física e Química A": 18},
+            "exams": {"Matemática A (635)": 170},
+        },
+    },
+    "international_grades_overview": "## Grades Overview\n\nStrong results in mathematics and sciences.",
+    "degree_question": "Do you enjoy solving mathematical problems?",
+    "degree_report": "## Recommended Degrees\n\n### 1. Informática (85% fit)\nStrong match.\n\n### 2. Matemática Aplicada (70% fit)\nGood match.",
+    "degree_recommended_list": ["Informática", "Matemática Aplicada"],
+    "adaptive_career_question": "Would you rather build something with your hands or analyse data?",
+    "career_discovery_report": "## Your Career Sectors\n\n### 1. Technology (60%)\nAnalytical strengths.\n\n### 2. Business (40%)\nPeople skills.",
+    "interview_practice_questions": _INTERVIEW_QUESTIONS,
+    "interview_mock_questions": _INTERVIEW_QUESTIONS,
+    "interview_feedback": "## Interview Feedback\n\n**Score:** 7/10\n\nGood structure, add measurable results.",
+    "chat_compaction": "The user asked about career options in technology and received study suggestions.",
+}
+DEFAULT_RESPONSE = "This is a canned response from the local Gemini stand-in."
+
+
+def _load_responses() -> dict:
+    responses = dict(CANNED_RESPONSES)
+    if FAKE_RESPONSES:
+        with open(FAKE_RESPONSES, encoding="utf-8") as f:
+            responses.update(json.load(f))
+    return {k: v if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for k, v in responses.items()}
+
+
+def _parse_latency(spec: str):
+    """Latency spec to a sampler returning seconds"""
+    kind, _, args = spec.strip().partition(":")
+    values = [float(v) / 1000 for v in args.split(",") if v.strip()]
+    if kind in ("", "0", "off"):
+        return lambda rng: 0.0
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        median, p95 = values
+        sigma = math.log(p95 / median) / 1.645 if p95 > median else 0.0
+        return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Unknown latency spec: {spec!r}")
+
+
+def _parse_latencies(spec: str) -> dict:
+    """'default;feature=spec;...' to {feature or None: sampler}"""
+    samplers = {}
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        feature, sep, feature_spec = part.partition("=")
+        if sep:
+            samplers[feature.strip()] = _parse_latency(feature_spec)
+        else:
+            samplers[None] = _parse_latency(part)
+    samplers.setdefault(None, _parse_latency("0"))
+    return samplers
+
+
+def _current_feature() -> str:
+    # set by gated_generate_content / LangfuseChatWrapper, imported late to avoid a cycle
+    from services.gemini_client import current_feature
+    return current_feature()
+
+
+def _texts(value):
+    """Every text piece of a contents value (str, Part, Content or lists of them)"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _texts(item)
+    elif isinstance(value, types.Content):
+        yield from _texts(value.parts or [])
+    elif isinstance(value, types.Part):
+        if value.text:
+            yield value.text
+        elif value.function_response is not None:
+            yield json.dumps(value.function_response.response, default=str)
+
+
+def _tokens(text_chars: int) -> int:
+    return max(1, text_chars // 4)
+
+
+def _answers_tool_call(contents) -> bool:
+    """True when the last turn carries function results (the model now gives its final answer)"""
+    if not isinstance(contents, list) or not contents:
+        return False
+    last = contents[-1]
+    return isinstance(last, types.Content) and any(p.function_response is not None for p in last.parts or [])
+
+
+def _sample_args(schema) -> dict:
+    """Arguments for every required parameter of a declared function, typed from its schema"""
+    if schema is None or not schema.properties:
+        return {}
+    args = {}
+    for name in schema.required or []:
+        prop = schema.properties.get(name)
+        kind = str(getattr(prop.type, "value", prop.type) if prop is not None and prop.type else "STRING").upper()
+        if prop is not None and prop.enum:
+            args[name] = prop.enum[0]
+        elif kind == "INTEGER":
+            args[name] = 1
+        elif kind == "NUMBER":
+            args[name] = 1.0
+        elif kind == "BOOLEAN":
+            args[name] = True
+        elif kind == "ARRAY":
+            args[name] = ["Data Scientist"]
+        elif kind == "OBJECT":
+            args[name] = {}
+        elif name == "user_id":
+            args[name] = "fake-user"
+        else:
+            args[name] = "Data Scientist"
+    return args
+
+
+class _Backend:
+    """State shared by the fake models, chats and caches of one client"""
+
+    def __init__(self):
+        self.responses = _load_responses()
+        self.latency = _parse_latencies(FAKE_LATENCY)
+        self.ttft = _parse_latencies(FAKE_TTFT)
+        self._rng = random.Random(FAKE_SEED)
+        self._rng_lock = threading.Lock()
+        self.caches: dict[str, types.CreateCachedContentConfig] = {}
+        self.cache_ids = itertools.count(1)
+        self.calls = 0
+
+    def sample(self, samplers: dict, feature: str) -> float:
+        sampler = samplers.get(feature, samplers[None])
+        with self._rng_lock:
+            self.calls += 1
+            return sampler(self._rng)
+
+    def tools(self, config) -> list:
+        if config is None:
+            return []
+        if config.cached_content:
+            cached = self.caches.get(config.cached_content)
+            return (cached.tools or []) if cached else []
+        return config.tools or []
+
+    def system_chars(self, config) -> int:
+        if config is None:
+            return 0
+        if config.cached_content and config.cached_content in self.caches:
+            return len(str(self.caches[config.cached_content].system_instruction or ""))
+        return len(str(config.system_instruction or ""))
+
+    def reply_parts(self, feature: str, contents, config) -> list[types.Part]:
+        declarations = [d for tool in self.tools(config) for d in (getattr(tool, "function_declarations", None) or [])]
+        if declarations and not _answers_tool_call(contents):
+            # pick a tool from the request text, so reruns of the same message call the same one
+            prompt = "".join(_texts(contents))
+            declaration = declarations[int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % len(declarations)]
+            return [types.Part(function_call=types.FunctionCall(name=declaration.name, args=_sample_args(declaration.parameters)))]
+        return [types.Part(text=self.responses.get(feature, DEFAULT_RESPONSE))]
+
+    def response(self, parts: list[types.Part], prompt_chars: int, config, output_chars: int | None = None):
+        if output_chars is None:
+            output_chars = sum(len(p.text or "") for p in parts) or 40
+        prompt_tokens = _tokens(prompt_chars + self.system_chars(config))
+        cached_tokens = _tokens(self.system_chars(config)) if config is not None and config.cached_content else None
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(
+                content=types.Content(role="model", parts=parts),
+                finish_reason=types.FinishReason.STOP,
+            )],
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                cached_content_token_count=cached_tokens,
+                candidates_token_count=_tokens(output_chars),
+                total_token_count=prompt_tokens + _tokens(output_chars),
+            ),
+            model_version="fake",
+        )
+
+
+class _FakeModels:
+    def __init__(self, backend: _Backend):
+        self._backend = backend
+
+    def generate_content(self, model: str, contents, config=None):
+        feature = _current_feature()
+        parts = self._backend.reply_parts(feature, contents, config)
+        time.sleep(self._backend.sample(self._backend.latency, feature))
+        return self._backend.response(parts, sum(map(len, _texts(contents))), config)
+
+    def generate_content_stream(self, model: str, contents, config=None):
+        # feature is read now, the generator body runs on the consumer's first next()
+        feature = _current_feature()
+        return self._stream(feature, contents, config)
+
+    def _stream(self, feature: str, contents, config):
+        backend = self._backend
+        text = backend.responses.get(feature, DEFAULT_RESPONSE)
+        prompt_chars = sum(map(len, _texts(contents)))
+        ttft_s = backend.sample(backend.ttft, feature)
+        rest_s = max(0.0, backend.sample(backend.latency, feature) - ttft_s)
+        step = max(1, math.ceil(len(text) / STREAM_CHUNKS))
+        chunks = [text[i:i + step] for i in range(0, len(text), step)] or [""]
+
+        time.sleep(ttft_s)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(rest_s / max(1, len(chunks) - 1))
+            # usage arrives cumulatively, the last chunk carries the totals
+            yield backend.response([types.Part(text=chunk)], prompt_chars, config, output_chars=len("".join(chunks[:i + 1])))
+
+    def embed_content(self, model: str, contents, config=None):
+        texts = [contents] if isinstance(contents, str) else list(_texts(contents))
+        embeddings = []
+        for text in texts:
+            rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+            embeddings.append(types.ContentEmbedding(values=[rng.gauss(0.0, 1.0) for _ in range(EMBEDDING_DIM)]))
+        return types.EmbedContentResponse(embeddings=embeddings)
+
+
+class _FakeChat:
+    def __init__(self, models: _FakeModels, model: str, config=None, history=None):
+        self._models = models
+        self._model = model
+        self._config = config
+        self._history: list[types.Content] = list(history or [])
+
+    def send_message(self, message, config=None):
+        # like the SDK, the turn is only recorded once a response came back
+        user = types.Content(role="user", parts=[types.Part(text=m) for m in _texts(message)])
+        response = self._models.generate_content(self._model, [*self._history, user], config or self._config)
+        self._history += [user, response.candidates[0].content]
+        return response
+
+    def get_history(self, curated: bool = False) -> list[types.Content]:
+        return list(self._history)
+
+
+class _FakeChats:
+    def __init__(self, models: _FakeModels):
+        self._models = models
+
+    def create(self, model: str, config=None, history=None):
+        return _FakeChat(self._models, model, config, history)
+
+
+class _FakeCaches:
+    """Accepts every context (the real API rejects small ones), keeps tools and instructions by name"""
+
+    def __init__(self, backend: _Backend):
+        self._backend = backend
+
+    def create(self, model: str, config=None):
+        name = f"cachedContents/fake-{next(self._backend.cache_ids)}"
+        self._backend.caches[name] = config or types.CreateCachedContentConfig()
+        return types.CachedContent(name=name, model=model, display_name=config.display_name if config else None)
+
+    def update(self, name: str, config=None):
+        return types.CachedContent(name=name)
+
+    def delete(self, name: str, config=None):
+        self._backend.caches.pop(name, None)
+
+
+class FakeGeminiClient:
+    """
+    The parts of genai.Client the app uses (models, chats, caches, close) answered locally.
+
+    Responses are picked by the feature label of the call, tool-enabled requests get a
+    function call first and a text answer once the function results come back, and every
+    call sleeps for a latency sampled from GEMINI_FAKE_LATENCY (seeded by GEMINI_FAKE_SEED).
+    """
+
+    def __init__(self):
+        self._backend = _Backend()
+        self.models = _FakeModels(self._backend)
+        self.chats = _FakeChats(self.models)
+        self.caches = _FakeCaches(self._backend)
+
+    @property
+    def call_count(self) -> int:
+        return self._backend.calls
+
+    def close(self):
+        pass
@@ -0,0 +1,252 @@
+# services/gemini_client.py
+# PROCESS-WIDE GEMINI CLIENT REGISTRY (one pooled HTTP client per API key)
+
+import os
+import atexit
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+import httpx
+from google import genai
+from google.genai import errors, types
+from services.rate_limiter import TokenBucket, SingleFlight, RateLimitTimeout
+from services.retry import DEFAULT_RETRY_POLICY, RetryPolicy, call_with_retry
+from services.metrics import record_model_call
+
+
+# keep-alive pool shared by every page and tool in this process
+MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GEMINI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY_S = float(os.getenv("GEMINI_KEEPALIVE_EXPIRY_S", "60"))
+
+# quota shared by every session in this process (Gemini limits are per key, not per session)
+REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+BURST = int(os.getenv("GEMINI_BURST", "10"))
+MAX_QUEUE_WAIT_S = float(os.getenv("GEMINI_MAX_QUEUE_WAIT_S", "30"))
+
+# "gemini" (the API) or "fake" (services/fake_gemini.py: canned responses, sampled latency, no network)
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "gemini")
+
+_clients: dict[str | None, genai.Client] = {}
+_clients_lock = threading.Lock()
+
+GEMINI_LIMITER = TokenBucket(rate=REQUESTS_PER_MINUTE / 60.0, capacity=BURST)
+GEMINI_SINGLE_FLIGHT = SingleFlight()
+
+# feature label of the model call in progress on this thread (the fake backend answers by it)
+_current_feature: ContextVar[str] = ContextVar("gemini_feature", default="unlabelled")
+
+# errors raised by the model call itself (after retries), as opposed to tracing failures
+MODEL_ERRORS = (errors.APIError, httpx.TransportError, RateLimitTimeout)
+
+
+def _http_options() -> types.HttpOptions:
+    return types.HttpOptions(
+        client_args={
+            "limits": httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY_S,
+            )
+        }
+    )
+
+
+def get_genai_client(api_key: str | None = None) -> genai.Client:
+    """
+    Returning the shared genai.Client for this API key, creating it on first use.
+    Wrappers borrow from here so TLS handshakes and client setup happen once per process.
+    """
+    if api_key is None:
+        api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+
+    client = _clients.get(api_key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            if GEMINI_BACKEND == "fake":
+                from services.fake_gemini import FakeGeminiClient
+                client = FakeGeminiClient()
+                print("🟢 Gemini backend: local fake (GEMINI_BACKEND=fake)")
+            else:
+                client = genai.Client(api_key=api_key, http_options=_http_options())
+            _clients[api_key] = client
+    return client
+
+
+def close_genai_clients():
+    """Closing every pooled client (used on process shutdown)"""
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception as e:
+                print(f"Gemini client close failed: {e}")
+        _clients.clear()
+
+
+def current_feature() -> str:
+    return _current_feature.get()
+
+
+@contextmanager
+def model_feature(feature: str):
+    """Labelling the model calls made inside the block (gated calls do this themselves)"""
+    token = _current_feature.set(feature)
+    try:
+        yield
+    finally:
+        _current_feature.reset(token)
+
+
+def _fingerprint(value, digest):
+    """Feeding a request piece into the digest (bytes are hashed, not serialised)"""
+    if isinstance(value, str):
+        digest.update(value.encode("utf-8"))
+    elif isinstance(value, bytes):
+        digest.update(value)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _fingerprint(item, digest)
+            digest.update(b"\x1f")
+    elif isinstance(value, types.Part) and value.inline_data is not None:
+        digest.update((value.inline_data.mime_type or "").encode("utf-8"))
+        digest.update(value.inline_data.data or b"")
+    elif hasattr(value, "model_dump_json"):
+        digest.update(value.model_dump_json(exclude_none=True).encode("utf-8"))
+    else:
+        digest.update(repr(value).encode("utf-8"))
+
+
+def request_key(model: str, contents, config=None) -> str:
+    """Stable key for a generate_content request, used for single-flight coalescing"""
+    digest = hashlib.sha256()
+    _fingerprint([model, contents, config], digest)
+    return digest.hexdigest()
+
+
+def _with_timeout(config, timeout_s: float):
+    """Copying the request config with a per-attempt HTTP timeout (milliseconds in HttpOptions)"""
+    http_options = types.HttpOptions(timeout=int(timeout_s * 1000))
+    if config is None:
+        return types.GenerateContentConfig(http_options=http_options)
+    return config.model_copy(update={"http_options": http_options})
+
+
+def gated_generate_content(
+    client: genai.Client,
+    model: str,
+    contents,
+    config=None,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    feature: str = "unlabelled",
+):
+    """
+    Calling client.models.generate_content behind the process-wide rate limiter,
+    retrying transient errors with backoff. Concurrent identical requests
+    (same model, contents and config) share one in-flight call.
+    Wall time and usage_metadata are recorded under `feature` for the executed call.
+    """
+    def attempt(timeout_s: float):
+        GEMINI_LIMITER.acquire(timeout=MAX_QUEUE_WAIT_S)
+        with model_feature(feature):
+            return client.models.generate_content(
+                model=model, contents=contents, config=_with_timeout(config, timeout_s)
+            )
+
+    def execute():
+        started = time.perf_counter()
+        try:
+            response = call_with_retry(attempt, retry_policy)
+        except Exception:
+            record_model_call(feature, time.perf_counter() - started, error=True)
+            raise
+        record_model_call(feature, time.perf_counter() - started, response.usage_metadata)
+        return response
+
+    return GEMINI_SINGLE_FLIGHT.do(request_key(model, contents, config), execute)
+
+
+def gated_send_message(
+    chat,
+    message,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    feature: str = "chat",
+):
+    """
+    chat.send_message behind the same rate limiter and retry policy as gated_generate_content.
+    Retrying is safe because a chat only records the turn once a response came back;
+    never coalesced, each chat has its own history.
+    """
+    def attempt(timeout_s: float):
+        GEMINI_LIMITER.acquire(timeout=MAX_QUEUE_WAIT_S)
+        with model_feature(feature):
+            return chat.send_message(message, config=_with_timeout(None, timeout_s))
+
+    started = time.perf_counter()
+    try:
+        response = call_with_retry(attempt, retry_policy)
+    except Exception:
+        record_model_call(feature, time.perf_counter() - started, error=True)
+        raise
+    record_model_call(feature, time.perf_counter() - started, response.usage_metadata)
+    return response
+
+
+def gated_generate_content_stream(
+    client: genai.Client,
+    model: str,
+    contents,
+    config=None,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    feature: str = "unlabelled",
+):
+    """
+    Streaming variant: rate limited, and retried only until the first chunk arrives
+    (a stream can't be shared between callers or replayed once text was shown).
+    Records time-to-first-chunk alongside wall time and usage.
+    """
+    def open_stream(timeout_s: float):
+        GEMINI_LIMITER.acquire(timeout=MAX_QUEUE_WAIT_S)
+        with model_feature(feature):
+            stream = client.models.generate_content_stream(
+                model=model, contents=contents, config=_with_timeout(config, timeout_s)
+            )
+            return next(stream, None), stream
+
+    started = time.perf_counter()
+    ttft_s = None
+    usage = None
+    failed = True
+    try:
+        first, stream = call_with_retry(open_stream, retry_policy)
+        ttft_s = time.perf_counter() - started
+        if first is not None:
+            usage = first.usage_metadata or usage
+            yield first
+        for chunk in stream:
+            usage = chunk.usage_metadata or usage
+            yield chunk
+        failed = False
+    except GeneratorExit:
+        # consumer stopped reading, not a model failure
+        failed = False
+        raise
+    finally:
+        record_model_call(feature, time.perf_counter() - started, usage, ttft_s=ttft_s, error=failed)
+
+
+def get_gate_stats() -> dict:
+    """Queue depth, wait times and coalescing counts for sizing the quota"""
+    return {
+        "limiter": GEMINI_LIMITER.stats(),
+        "single_flight": GEMINI_SINGLE_FLIGHT.stats(),
+    }
+
+
+atexit.register(close_genai_clients)
@@ -1,10 +1,18 @@
 import os
 from langfuse import Langfuse
-from google import genai
 from google.genai import types
 import streamlit as st
 import uuid
-import traceback
+import time
+from datetime import datetime, timezone
+from services.gemini_client import (
+    get_genai_client,
+    gated_generate_content,
+    gated_generate_content_stream,
+    gated_send_message,
+)
+from services.trace_exporter import InMemorySink, LangfuseSink, start_exporter
+from services.trace_policy import TRACE_POLICY
 
 
 try:
@@ -21,18 +29,88 @@ except Exception as e:
     print(f"🔴 Langfuse initialization failed: {e}")
     LANGFUSE_ENABLED = False
 
+# traces are exported by a background thread, the request path only enqueues a dict
+if os.getenv("LANGFUSE_SINK") == "memory":
+    TRACE_SINK = InMemorySink()
+    LANGFUSE_ENABLED = True
+elif LANGFUSE_ENABLED:
+    TRACE_SINK = LangfuseSink(langfuse)
+else:
+    TRACE_SINK = None
+
+TRACE_EXPORTER = start_exporter(TRACE_SINK) if TRACE_SINK else None
+
+
+def _new_trace_id() -> str | None:
+    return Langfuse.create_trace_id() if LANGFUSE_ENABLED else None
+
+
+def _export_generation(
+    trace_id: str | None,
+    name: str,
+    model: str,
+    input,
+    output,
+    metadata: dict,
+    usage_metadata,
+    latency_s: float,
+    user_id: str = None,
+    session_id: str = None,
+    error: Exception = None,
+    completion_start_time: datetime = None,
+    trace_name: str = None,
+    trace_io: bool = True,
+) -> bool:
+    """
+    Queueing one finished generation for export, never raises on the request path.
+    Applies TRACE_POLICY sampling (errors always kept) and payload truncation,
+    returns whether the generation was exported.
+    """
+    if not trace_id or TRACE_EXPORTER is None:
+        return False
+    if not (error or TRACE_POLICY.sampled(metadata.get("feature"), trace_id)):
+        return False
+    try:
+        return TRACE_EXPORTER.submit({
+            "kind": "generation",
+            "trace_id": trace_id,
+            "name": name,
+            "model": model,
+            "input": TRACE_POLICY.compact(input),
+            "output": TRACE_POLICY.compact(output),
+            "metadata": {
+                **TRACE_POLICY.compact(metadata),
+                "latency_s": round(latency_s, 3),
+                "sample_rate": TRACE_POLICY.sample_rate(metadata.get("feature")),
+            },
+            "usage_details": _usage_details(usage_metadata),
+            "completion_start_time": completion_start_time,
+            "level": "ERROR" if error else None,
+            "status_message": str(error) if error else None,
+            "trace_name": trace_name,
+            "user_id": user_id,
+            "session_id": session_id,
+            "trace_input": TRACE_POLICY.preview(input) if trace_io else None,
+            "trace_output": TRACE_POLICY.preview(output) if trace_io else None,
+        })
+    except Exception as e:
+        print(f"🔴 Langfuse error: {e}")
+        return False
+
 
 class LangfuseGeminiWrapper:
-    """Wrapper for Google Gemini API calls with Langfuse tracing (v3 API)"""
+    """
+    Wrapper for Google Gemini API calls with Langfuse tracing (v3 API)
+
+    Instances are shared across sessions, so nothing per call is kept on them:
+    callers that need the trace id (feedback, scores) pass `on_trace`, called
+    with the trace id once the generation is exported (None when it wasn't).
+    """
     
     def __init__(self, api_key: str | None = None, model: str = "gemini-2.5-flash"):
-        # fall back to env vars if api_key not passed
-        if api_key is None:
-            api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
-
-        self.client = genai.Client(api_key=api_key)
+        # borrowing the process-wide pooled client (falls back to env vars if api_key not passed)
+        self.client = get_genai_client(api_key)
         self.model = model
-        self.last_trace_id = None
     
     def generate_content(
         self, 
@@ -41,73 +119,140 @@ class LangfuseGeminiWrapper:
         temperature: float = 0.3,
         user_id: str = None,
         session_id: str = None,
-        metadata: dict = None
+        metadata: dict = None,
+        feature: str = None,
+        on_trace=None,
     ):
-        """Generating content with Langfuse tracing (v3 API)"""
-        
-        if LANGFUSE_ENABLED:
-            try:
-                print(f"🔵 Creating generation with v3 API")
-                # v3 uses start_generation() with context manager
-                with langfuse.start_as_current_observation(
-                    as_type="generation",
-                    name="gemini_generate_content",
-                    model=self.model,
-                    input=prompt,
-                    metadata={
-                        "temperature": temperature,
-                        "system_instruction": system_instruction,
-                        **(metadata or {})
-                    }
-                ) as generation:
-                    
-                    config = types.GenerateContentConfig(
-                        system_instruction=system_instruction,
-                        temperature=temperature,
-                    )
-                    
-                    response = self.client.models.generate_content(
-                        model=self.model,
-                        contents=prompt,
-                        config=config,
-                    )
-                    
-                    output_text = response.text
-                    
-                    # Update with output
-                    generation.update(output=output_text)
-                    
-                    # Update trace-level attributes
-                    langfuse.update_current_trace(
-                        user_id=user_id,
-                        session_id=session_id,
-                        input=prompt,
-                        output=output_text
-                    )
-                    
-                    self.last_trace_id = langfuse.get_current_trace_id()
-                    print(f"🟢 Generation logged with trace ID: {self.last_trace_id}")
-                    
-                    return output_text
-                    
-            except Exception as e:
-                print(f"🔴 Langfuse error: {e}")
-                traceback.print_exc()
-                # Fallback: run without tracing
+        """Generating content with Langfuse tracing, the generation is exported in the background"""
         
-        # Fallback if Langfuse disabled or error
+        feature = _feature_label(feature, metadata)
         config = types.GenerateContentConfig(
             system_instruction=system_instruction,
             temperature=temperature,
         )
         
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=prompt,
-            config=config,
+        trace_id = _new_trace_id()
+        started = time.perf_counter()
+        response = None
+        output_text = None
+        error = None
+        try:
+            response = gated_generate_content(
+                self.client,
+                model=self.model,
+                contents=prompt,
+                config=config,
+                feature=feature,
+            )
+            output_text = response.text
+            return output_text
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            exported = _export_generation(
+                trace_id,
+                name="gemini_generate_content",
+                model=self.model,
+                input=prompt,
+                output=output_text,
+                metadata={
+                    "temperature": temperature,
+                    "system_instruction": system_instruction,
+                    "feature": feature,
+                    **(metadata or {})
+                },
+                usage_metadata=response.usage_metadata if response else None,
+                latency_s=time.perf_counter() - started,
+                user_id=user_id,
+                session_id=session_id,
+                error=error,
+            )
+            if on_trace is not None:
+                on_trace(trace_id if exported else None)
+    
+    def generate_content_stream(
+        self,
+        prompt: str,
+        system_instruction: str = None,
+        temperature: float = 0.3,
+        user_id: str = None,
+        session_id: str = None,
+        metadata: dict = None,
+        feature: str = None,
+        contents: list = None,
+        on_trace=None,
+    ):
+        """Streaming content with Langfuse tracing, yields text chunks as they arrive.
+
+        Meant to be passed straight to st.write_stream. The assembled output, token
+        usage and time-to-first-token are recorded once the stream is exhausted.
+        Multi-turn callers pass the structured history as `contents`; `prompt` is
+        then only the latest user message, used for tracing.
+        """
+        
+        feature = _feature_label(feature, metadata)
+        config = types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            temperature=temperature,
         )
         
-        return response.text
+        trace_id = _new_trace_id()
+        started = time.perf_counter()
+        completion_start_time = None
+        # local: wrappers are shared by every session, concurrent streams must not see each other's value
+        ttft_s = None
+        chunks = []
+        usage = None
+        error = None
+        
+        try:
+            stream = gated_generate_content_stream(
+                self.client,
+                model=self.model,
+                contents=contents if contents is not None else prompt,
+                config=config,
+                feature=feature,
+            )
+            for chunk in stream:
+                if chunk.usage_metadata:
+                    usage = chunk.usage_metadata
+                text = chunk.text
+                if not text:
+                    continue
+                if completion_start_time is None:
+                    completion_start_time = datetime.now(timezone.utc)
+                    ttft_s = time.perf_counter() - started
+                chunks.append(text)
+                yield text
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # runs on exhaustion, on error and when the consumer stops early
+            exported = _export_generation(
+                trace_id,
+                name="gemini_generate_content_stream",
+                model=self.model,
+                input=prompt,
+                output="".join(chunks),
+                metadata={
+                    "temperature": temperature,
+                    "system_instruction": system_instruction,
+                    "stream": True,
+                    "feature": feature,
+                    "time_to_first_token_s": ttft_s,
+                    **(metadata or {})
+                },
+                usage_metadata=usage,
+                latency_s=time.perf_counter() - started,
+                user_id=user_id,
+                session_id=session_id,
+                error=error,
+                completion_start_time=completion_start_time,
+            )
+            if on_trace is not None:
+                on_trace(trace_id if exported else None)
     
     def generate_content_multimodal(
         self, 
@@ -118,123 +263,120 @@ class LangfuseGeminiWrapper:
         temperature: float = 0.3,
         user_id: str = None,
         session_id: str = None,
-        metadata: dict = None
+        metadata: dict = None,
+        feature: str = None,
+        on_trace=None,
     ):
         """Generate content with multimodal input (file + text) with Langfuse tracing"""
         
-        if LANGFUSE_ENABLED:
-            try:
-                print(f"🔵 Creating multimodal generation with v3 API")
-                
-                with langfuse.start_as_current_observation(
-                    as_type="generation",
-                    name="gemini_generate_content_multimodal",
-                    model=self.model,
-                    input={"prompt": prompt, "mime_type": mime_type},
-                    metadata={
-                        "temperature": temperature,
-                        "system_instruction": system_instruction,
-                        "mime_type": mime_type,
-                        **(metadata or {})
-                    }
-                ) as generation:
-                    
-                    config = types.GenerateContentConfig(
-                        system_instruction=system_instruction,
-                        temperature=temperature,
-                    )
-                    
-                    contents = [
-                        types.Part.from_bytes(data=file_data, mime_type=mime_type),
-                        prompt
-                    ]
-                    
-                    response = self.client.models.generate_content(
-                        model=self.model,
-                        contents=contents,
-                        config=config,
-                    )
-                    
-                    output_text = response.text
-                    
-                    generation.update(output=output_text)
-                    
-                    langfuse.update_current_trace(
-                        user_id=user_id,
-                        session_id=session_id,
-                        input={"prompt": prompt, "mime_type": mime_type},
-                        output=output_text
-                    )
-                    
-                    self.last_trace_id = langfuse.get_current_trace_id()
-                    print(f"🟢 Multimodal generation logged with trace ID: {self.last_trace_id}")
-                    
-                    return output_text
-                    
-            except Exception as e:
-                print(f"🔴 Langfuse error: {e}")
-                traceback.print_exc()
-        
-        # Fallback if Langfuse disabled or error
+        feature = _feature_label(feature, metadata)
         config = types.GenerateContentConfig(
             system_instruction=system_instruction,
             temperature=temperature,
         )
-        
         contents = [
             types.Part.from_bytes(data=file_data, mime_type=mime_type),
             prompt
         ]
         
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=contents,
-            config=config,
-        )
-        
-        return response.text
+        trace_id = _new_trace_id()
+        started = time.perf_counter()
+        response = None
+        output_text = None
+        error = None
+        try:
+            response = gated_generate_content(
+                self.client,
+                model=self.model,
+                contents=contents,
+                config=config,
+                feature=feature,
+            )
+            output_text = response.text
+            return output_text
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            exported = _export_generation(
+                trace_id,
+                name="gemini_generate_content_multimodal",
+                model=self.model,
+                input={"prompt": prompt, "mime_type": mime_type},
+                output=output_text,
+                metadata={
+                    "temperature": temperature,
+                    "system_instruction": system_instruction,
+                    "mime_type": mime_type,
+                    "feature": feature,
+                    **(metadata or {})
+                },
+                usage_metadata=response.usage_metadata if response else None,
+                latency_s=time.perf_counter() - started,
+                user_id=user_id,
+                session_id=session_id,
+                error=error,
+            )
+            if on_trace is not None:
+                on_trace(trace_id if exported else None)
+
+
+def _feature_label(feature: str | None, metadata: dict | None) -> str:
+    """Feature label for accounting: explicit label, else the metadata type the pages already send"""
+    if feature:
+        return feature
+    metadata = metadata or {}
+    return metadata.get("type") or metadata.get("conversation_type") or "unlabelled"
+
+
+def _usage_details(usage_metadata) -> dict | None:
+    """Mapping Gemini usage_metadata onto Langfuse usage_details"""
+    if usage_metadata is None:
+        return None
+    details = {
+        "input": usage_metadata.prompt_token_count,
+        "output": usage_metadata.candidates_token_count,
+        "input_cached": usage_metadata.cached_content_token_count,
+        "total": usage_metadata.total_token_count,
+    }
+    return {k: v for k, v in details.items() if v is not None}
 
 
 class LangfuseChatWrapper:
     """
-    Wrapper for Google Gemini Chat API with Langfuse tracing
+    Wrapper for Google Gemini Chat API with Langfuse tracing (v3 API)
     """
     
     def __init__(self, api_key: str, model: str = "gemini-2.5-flash"):
-        self.client = genai.Client(api_key=api_key)
+        self.client = get_genai_client(api_key)
         self.model = model
         self.chat = None
-        self.trace = None
         self.message_count = 0
         self.trace_id = None
+        self.user_id = None
+        self.session_id = None
+        self.feature = "chat"
     
-    def create_chat(self, system_instruction: str = None, user_id: str = None, session_id: str = None):
-        """Creating a new chat session with tracing"""
+    def create_chat(
+        self,
+        system_instruction: str = None,
+        user_id: str = None,
+        session_id: str = None,
+        feature: str = "chat"
+    ):
+        """Creating a new chat session, every message is traced under one Langfuse trace"""
         
-        # Create a trace for the entire chat session if langfuse enabled
-        if LANGFUSE_ENABLED:
-            try:
-                self.trace = langfuse.trace(
-                    name="gemini_chat_session",
-                    user_id=user_id,
-                    session_id=session_id or str(uuid.uuid4()),
-                    metadata={
-                        "system_instruction": system_instruction,
-                        "model": self.model
-                    }
-                )
-                self.trace_id = self.trace.id
-            except AttributeError:
-                # old version fallback
-                self.trace_id = str(uuid.uuid4())
-            except Exception as e:
-                print(f"Langfuse trace creation failed: {e}")
+        self.user_id = user_id
+        self.session_id = session_id or str(uuid.uuid4())
+        self.feature = feature
+        self.message_count = 0
+        self.trace_id = _new_trace_id()
         
         # creating chat
         self.chat = self.client.chats.create(model=self.model)
         
         if system_instruction:
-            self.chat.send_message(system_instruction)
+            self.send_message(system_instruction, metadata={"system_instruction": True})
         
         return self.chat
     
@@ -244,53 +386,48 @@ class LangfuseChatWrapper:
         user_id: str = None,
         metadata: dict = None
     ):
-        """Send a message in the chat with tracing"""
+        """Send a message in the chat with tracing, token usage and latency accounting"""
         
         if not self.chat:
             raise ValueError("Chat not initialized. Call create_chat() first.")
         
         self.message_count += 1
         
-        # log to langfuse if enabled
-        generation = None
-        if LANGFUSE_ENABLED and self.trace:
-            try:
-                generation = self.trace.generation(
-                    name=f"chat_message_{self.message_count}",
-                    model=self.model,
-                    input=message,
-                    metadata=metadata or {}
-                )
-            except Exception as e:
-                print(f"Langfuse generation failed: {e}")
-        
+        started = time.perf_counter()
+        response = None
+        output_text = None
+        error = None
         try:
-            response = self.chat.send_message(message)
+            # rate limited, retried and recorded under the feature like every other call
+            response = gated_send_message(self.chat, message, feature=self.feature)
             output_text = response.text
-            
-            if generation:
-                try:
-                    generation.end(
-                        output=output_text,
-                        level="DEFAULT",
-                        status_message="Success"
-                    )
-                except Exception as e:
-                    print(f"Langfuse update failed: {e}")
-            
             return output_text
-            
         except Exception as e:
-            if generation:
-                try:
-                    generation.end(level="ERROR", status_message=str(e))
-                except:
-                    pass
-            raise e
+            error = e
+            raise
+        finally:
+            latency_s = time.perf_counter() - started
+            _export_generation(
+                self.trace_id,
+                name=f"chat_message_{self.message_count}",
+                model=self.model,
+                input=message,
+                output=output_text,
+                metadata={"feature": self.feature, **(metadata or {})},
+                usage_metadata=response.usage_metadata if response else None,
+                latency_s=latency_s,
+                user_id=user_id or self.user_id,
+                session_id=self.session_id,
+                error=error,
+                trace_name="gemini_chat_session",
+                trace_io=False,
+            )
     
     def get_trace_id(self):
-        """Get the current trace ID"""
-        return self.trace_id
+        """Get the current trace ID (None when this session is not sampled)"""
+        if TRACE_POLICY.sampled(self.feature, self.trace_id):
+            return self.trace_id
+        return None
 
 
 def log_user_feedback(trace_id: str, score: float, comment: str = None):
@@ -301,12 +438,13 @@ def log_user_feedback(trace_id: str, score: float, comment: str = None):
         return
     
     try:
-        langfuse.score(
-            trace_id=trace_id,
-            name="user_feedback",
-            value=score,
-            comment=comment
-        )
+        TRACE_EXPORTER.submit({
+            "kind": "score",
+            "trace_id": trace_id,
+            "name": "user_feedback",
+            "value": score,
+            "comment": comment,
+        })
     except Exception as e:
         print(f"Error logging feedback: {e}")
 
@@ -329,10 +467,7 @@ def get_session_id():
     return st.session_state.langfuse_session_id
 
 
-def flush_langfuse():
-    """Ensuring all traces are sent to Langfuse before app closes"""
-    if LANGFUSE_ENABLED:
-        try:
-            langfuse.flush()
-        except Exception as e:
-            print(f"Langfuse flush failed: {e}")
+def flush_langfuse(timeout: float = 5.0):
+    """Ensuring all queued traces are sent to Langfuse (also runs automatically at exit)"""
+    if TRACE_EXPORTER is not None:
+        TRACE_EXPORTER.flush(timeout)
@@ -0,0 +1,284 @@
+# services/metrics.py
+# PER-FEATURE TOKEN AND LATENCY ACCOUNTING WITH A PROMETHEUS-STYLE /metrics ENDPOINT
+
+import os
+import threading
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services.rate_limiter import percentile
+
+
+WINDOW_SIZE = int(os.getenv("METRICS_WINDOW_SIZE", "500"))  # rolling samples kept per feature
+
+
+class _FeatureWindow:
+    """Rolling samples plus lifetime counters for one feature label"""
+
+    def __init__(self):
+        self.latency_s = deque(maxlen=WINDOW_SIZE)
+        self.ttft_s = deque(maxlen=WINDOW_SIZE)
+        self.prompt_tokens = deque(maxlen=WINDOW_SIZE)
+        self.output_tokens = deque(maxlen=WINDOW_SIZE)
+        self.calls = 0
+        self.errors = 0
+        self.totals = {"prompt": 0, "output": 0, "cached": 0, "total": 0}
+        # lifetime sums and counts behind the summaries' _sum/_count series
+        self.latency_sum_s = 0.0
+        self.ttft_sum_s = 0.0
+        self.ttft_calls = 0
+        self.usage_calls = 0
+
+
+_features: dict[str, _FeatureWindow] = defaultdict(_FeatureWindow)
+_reruns: dict[str, deque] = defaultdict(lambda: deque(maxlen=WINDOW_SIZE))  # script run wall time per scope
+_rerun_counts: dict[str, int] = defaultdict(int)
+_rerun_sums_s: dict[str, float] = defaultdict(float)
+_lock = threading.Lock()
+
+
+def _token_counts(usage_metadata) -> dict:
+    if usage_metadata is None:
+        return {}
+    counts = {
+        "prompt": usage_metadata.prompt_token_count,
+        "output": usage_metadata.candidates_token_count,
+        "cached": usage_metadata.cached_content_token_count,
+        "total": usage_metadata.total_token_count,
+    }
+    return {k: v for k, v in counts.items() if v is not None}
+
+
+def record_model_call(
+    feature: str,
+    latency_s: float,
+    usage_metadata=None,
+    ttft_s: float | None = None,
+    error: bool = False,
+):
+    """Recording one model call (wall time, optional TTFT and usage_metadata) under its feature label"""
+    tokens = _token_counts(usage_metadata)
+    with _lock:
+        window = _features[feature or "unlabelled"]
+        window.calls += 1
+        if error:
+            window.errors += 1
+        window.latency_s.append(latency_s)
+        window.latency_sum_s += latency_s
+        if ttft_s is not None:
+            window.ttft_s.append(ttft_s)
+            window.ttft_sum_s += ttft_s
+            window.ttft_calls += 1
+        if tokens:
+            window.usage_calls += 1
+            window.prompt_tokens.append(tokens.get("prompt", 0))
+            window.output_tokens.append(tokens.get("output", 0))
+            for kind, value in tokens.items():
+                window.totals[kind] += value
+
+
+def feature_stats() -> dict:
+    """Snapshot of rolling p50/p95 latency and token usage per feature"""
+    with _lock:
+        snapshot = {}
+        for feature, w in _features.items():
+            snapshot[feature] = {
+                "calls": w.calls,
+                "errors": w.errors,
+                "latency_p50_s": percentile(w.latency_s, 50),
+                "latency_p95_s": percentile(w.latency_s, 95),
+                "latency_sum_s": w.latency_sum_s,
+                "ttft_p50_s": percentile(w.ttft_s, 50) if w.ttft_s else None,
+                "ttft_p95_s": percentile(w.ttft_s, 95) if w.ttft_s else None,
+                "ttft_sum_s": w.ttft_sum_s,
+                "ttft_calls": w.ttft_calls,
+                "usage_calls": w.usage_calls,
+                "prompt_tokens_p50": percentile(w.prompt_tokens, 50),
+                "prompt_tokens_p95": percentile(w.prompt_tokens, 95),
+                "output_tokens_p50": percentile(w.output_tokens, 50),
+                "output_tokens_p95": percentile(w.output_tokens, 95),
+                "tokens_total": dict(w.totals),
+            }
+        return snapshot
+
+
+def record_rerun(scope: str, duration_s: float):
+    """Recording one Streamlit script run: "app" for a full rerun, the fragment name for a fragment rerun"""
+    with _lock:
+        _reruns[scope].append(duration_s)
+        _rerun_counts[scope] += 1
+        _rerun_sums_s[scope] += duration_s
+
+
+def rerun_stats() -> dict:
+    """Snapshot of rolling p50/p95 run time per rerun scope"""
+    with _lock:
+        return {
+            scope: {
+                "runs": _rerun_counts[scope],
+                "sum_s": _rerun_sums_s[scope],
+                "p50_ms": percentile(durations, 50) * 1000,
+                "p95_ms": percentile(durations, 95) * 1000,
+            }
+            for scope, durations in _reruns.items()
+        }
+
+
+def reset_metrics():
+    with _lock:
+        _features.clear()
+        _reruns.clear()
+        _rerun_counts.clear()
+        _rerun_sums_s.clear()
+
+
+def render_prometheus() -> str:
+    """Rendering feature, gate and login metrics in the Prometheus text exposition format"""
+    # imported here to avoid a cycle (gemini_client records into this module)
+    from services.gemini_client import get_gate_stats
+    from services.authentication import auth_stats
+
+    lines = [
+        "# HELP careercorner_model_latency_seconds Rolling model call wall time per feature",
+        "# TYPE careercorner_model_latency_seconds summary",
+    ]
+    stats = feature_stats()
+    for feature, s in sorted(stats.items()):
+        label = f'feature="{feature}"'
+        lines.append(f'careercorner_model_latency_seconds{{{label},quantile="0.5"}} {s["latency_p50_s"]:.4f}')
+        lines.append(f'careercorner_model_latency_seconds{{{label},quantile="0.95"}} {s["latency_p95_s"]:.4f}')
+        lines.append(f"careercorner_model_latency_seconds_sum{{{label}}} {s['latency_sum_s']:.4f}")
+        lines.append(f"careercorner_model_latency_seconds_count{{{label}}} {s['calls']}")
+
+    lines += [
+        "# HELP careercorner_model_ttft_seconds Rolling time to first token for streamed calls",
+        "# TYPE careercorner_model_ttft_seconds summary",
+    ]
+    for feature, s in sorted(stats.items()):
+        if s["ttft_p50_s"] is None:
+            continue
+        label = f'feature="{feature}"'
+        lines.append(f'careercorner_model_ttft_seconds{{{label},quantile="0.5"}} {s["ttft_p50_s"]:.4f}')
+        lines.append(f'careercorner_model_ttft_seconds{{{label},quantile="0.95"}} {s["ttft_p95_s"]:.4f}')
+        lines.append(f"careercorner_model_ttft_seconds_sum{{{label}}} {s['ttft_sum_s']:.4f}")
+        lines.append(f"careercorner_model_ttft_seconds_count{{{label}}} {s['ttft_calls']}")
+
+    lines += [
+        "# HELP careercorner_model_call_tokens Rolling tokens per call per feature",
+        "# TYPE careercorner_model_call_tokens summary",
+    ]
+    for feature, s in sorted(stats.items()):
+        for kind in ("prompt", "output"):
+            label = f'feature="{feature}",kind="{kind}"'
+            lines.append(f'careercorner_model_call_tokens{{{label},quantile="0.5"}} {s[f"{kind}_tokens_p50"]}')
+            lines.append(f'careercorner_model_call_tokens{{{label},quantile="0.95"}} {s[f"{kind}_tokens_p95"]}')
+            lines.append(f"careercorner_model_call_tokens_sum{{{label}}} {s['tokens_total'][kind]}")
+            lines.append(f"careercorner_model_call_tokens_count{{{label}}} {s['usage_calls']}")
+
+    lines += [
+        "# HELP careercorner_model_tokens_total Tokens spent per feature since process start",
+        "# TYPE careercorner_model_tokens_total counter",
+    ]
+    for feature, s in sorted(stats.items()):
+        for kind, value in sorted(s["tokens_total"].items()):
+            lines.append(f'careercorner_model_tokens_total{{feature="{feature}",kind="{kind}"}} {value}')
+
+    lines += [
+        "# HELP careercorner_model_errors_total Failed model calls per feature",
+        "# TYPE careercorner_model_errors_total counter",
+    ]
+    for feature, s in sorted(stats.items()):
+        lines.append(f'careercorner_model_errors_total{{feature="{feature}"}} {s["errors"]}')
+
+    lines += [
+        "# HELP careercorner_rerun_seconds Rolling Streamlit script run time per scope (app or fragment)",
+        "# TYPE careercorner_rerun_seconds summary",
+    ]
+    for scope, s in sorted(rerun_stats().items()):
+        label = f'scope="{scope}"'
+        lines.append(f'careercorner_rerun_seconds{{{label},quantile="0.5"}} {s["p50_ms"] / 1000:.4f}')
+        lines.append(f'careercorner_rerun_seconds{{{label},quantile="0.95"}} {s["p95_ms"] / 1000:.4f}')
+        lines.append(f"careercorner_rerun_seconds_sum{{{label}}} {s['sum_s']:.4f}")
+        lines.append(f"careercorner_rerun_seconds_count{{{label}}} {s['runs']}")
+
+    gate = get_gate_stats()
+    limiter, flight = gate["limiter"], gate["single_flight"]
+    lines += [
+        "# TYPE careercorner_gemini_queue_depth gauge",
+        f"careercorner_gemini_queue_depth {limiter['queue_depth']}",
+        "# TYPE careercorner_gemini_queue_depth_max gauge",
+        f"careercorner_gemini_queue_depth_max {limiter['max_queue_depth']}",
+        "# TYPE careercorner_gemini_queue_wait_ms summary",
+        f'careercorner_gemini_queue_wait_ms{{quantile="0.5"}} {limiter["wait_ms_p50"]}',
+        f'careercorner_gemini_queue_wait_ms{{quantile="0.95"}} {limiter["wait_ms_p95"]}',
+        f"careercorner_gemini_queue_wait_ms_sum {limiter['wait_ms_total']}",
+        f"careercorner_gemini_queue_wait_ms_count {limiter['acquired']}",
+        "# TYPE careercorner_gemini_queue_timeouts_total counter",
+        f"careercorner_gemini_queue_timeouts_total {limiter['timeouts']}",
+        "# TYPE careercorner_gemini_coalesced_total counter",
+        f"careercorner_gemini_coalesced_total {flight['coalesced']}",
+    ]
+
+    auth = auth_stats()
+    lines += [
+        "# TYPE careercorner_auth_hash_pending gauge",
+        f"careercorner_auth_hash_pending {auth['hash_pending']}",
+        "# TYPE careercorner_auth_hashes_total counter",
+        f"careercorner_auth_hashes_total {auth['hashes']}",
+        "# TYPE careercorner_auth_busy_rejections_total counter",
+        f"careercorner_auth_busy_rejections_total {auth['busy_rejections']}",
+        "# TYPE careercorner_auth_pool_timeouts_total counter",
+        f"careercorner_auth_pool_timeouts_total {auth['pool_timeouts']}",
+        "# TYPE careercorner_auth_throttled_total counter",
+        f'careercorner_auth_throttled_total{{key="account"}} {auth["account_throttle"]["refused"]}',
+        f'careercorner_auth_throttled_total{{key="ip"}} {auth["ip_throttle"]["refused"]}',
+        "# TYPE careercorner_auth_blocked_keys gauge",
+        f'careercorner_auth_blocked_keys{{key="account"}} {auth["account_throttle"]["blocked_keys"]}',
+        f'careercorner_auth_blocked_keys{{key="ip"}} {auth["ip_throttle"]["blocked_keys"]}',
+    ]
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep scrapes out of the app logs
+
+
+_server = None
+_server_attempted = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int | None = None):
+    """
+    Serving /metrics on localhost in a daemon thread, once per process.
+    No-op unless a port is passed or METRICS_PORT is set.
+    """
+    global _server, _server_attempted
+    if port is None:
+        port = int(os.getenv("METRICS_PORT", "0") or 0)
+    if not port:
+        return None
+
+    with _server_lock:
+        if not _server_attempted:
+            _server_attempted = True
+            try:
+                _server = ThreadingHTTPServer((os.getenv("METRICS_HOST", "127.0.0.1"), port), _MetricsHandler)
+            except OSError as e:
+                print(f"🔴 Metrics endpoint not started on port {port}: {e}")
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics-endpoint", daemon=True).start()
+            print(f"🟢 Metrics endpoint on http://127.0.0.1:{port}/metrics")
+    return _server
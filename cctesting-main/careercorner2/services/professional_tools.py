@@ -4,9 +4,10 @@
 import json
 from typing import Optional, List, Dict, Any
 from google.genai import types
-from utils.database import load_reports
+from services.user_context import professional_context
+from services.role_catalog import ROLE_CATALOG
+from services.readiness import READINESS_ENGINE
 from langfuse import observe
-import time
 
 
 # ============================================================================
@@ -94,6 +95,25 @@ calculate_career_readiness_tool = types.FunctionDeclaration(
     }
 )
 
+rank_career_readiness_tool = types.FunctionDeclaration(
+    name="rank_career_readiness",
+    description="Rank the roles the user is most ready for, scoring their CV and career quiz against every role in the career catalog. Use when they ask which roles suit them, what they are most ready for, or have no target role yet.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "user_id": {
+                "type": "string",
+                "description": "The user's ID"
+            },
+            "top_n": {
+                "type": "integer",
+                "description": "How many roles to return (default 5)"
+            }
+        },
+        "required": ["user_id"]
+    }
+)
+
 
 # ============================================================================
 # FUNCTION IMPLEMENTATIONS (What actually executes with Langfuse monitoring)
@@ -101,379 +121,307 @@ calculate_career_readiness_tool = types.FunctionDeclaration(
 
 
 @observe(name="analyze_skill_gaps")
-def analyze_skill_gaps(user_id: str, target_role: str, max_retries: int = 3) -> Dict[str, Any]:
-    """Analyze skill gaps with retry logic and Langfuse monitoring"""
-
-    for attempt in range(max_retries):
-        try:
-            # Get CV data
-            cv_reports = load_reports(user_id, "professional_cv")
-
-            if not cv_reports:
-                return {
-                    "success": True,
-                    "has_data": False,
-                    "message": "No CV found. Complete CV Analysis to analyze skill gaps!"
-                }
-
-            latest_cv = cv_reports[0]
-            cv_content = latest_cv.get('content', '')
-
-            # Common skill requirements for different roles
-            role_skills = {
-                "data scientist": ["Python", "Machine Learning", "SQL", "Statistics", "Data Visualization", "Deep Learning"],
-                "software engineer": ["Programming", "Algorithms", "System Design", "Git", "Testing", "Databases"],
-                "product manager": ["Product Strategy", "Roadmapping", "Stakeholder Management", "Analytics", "UX/UI", "Agile"],
-                "marketing manager": ["Digital Marketing", "SEO/SEM", "Content Strategy", "Analytics", "Social Media", "Campaign Management"],
-                "data analyst": ["SQL", "Excel", "Data Visualization", "Statistics", "Python/R", "Business Intelligence"],
-                "ux designer": ["User Research", "Wireframing", "Prototyping", "Figma/Sketch", "Usability Testing", "Information Architecture"]
-            }
-
-            # Find matching role skills
-            target_lower = target_role.lower()
-            required_skills = []
-            for role, skills in role_skills.items():
-                if role in target_lower:
-                    required_skills = skills
-                    break
+def analyze_skill_gaps(user_id: str, target_role: str) -> Dict[str, Any]:
+    """Analyze skill gaps with Langfuse monitoring"""
 
-            if not required_skills:
-                required_skills = ["Domain Knowledge", "Communication", "Problem Solving", "Technical Skills", "Leadership"]
-
-            # Simple gap analysis (check if skills mentioned in CV)
-            cv_lower = cv_content.lower()
-            missing_skills = [skill for skill in required_skills if skill.lower() not in cv_lower]
-            existing_skills = [skill for skill in required_skills if skill.lower() in cv_lower]
+    try:
+        # Get CV data
+        cv_reports = professional_context(user_id).reports("professional_cv")
 
+        if not cv_reports:
             return {
                 "success": True,
-                "has_data": True,
-                "target_role": target_role,
-                "required_skills": required_skills,
-                "existing_skills": existing_skills,
-                "missing_skills": missing_skills,
-                "gap_percentage": round((len(missing_skills) / len(required_skills)) * 100, 1) if required_skills else 0,
-                "recommendations": [
-                    f"Focus on learning: {', '.join(missing_skills[:3])}" if missing_skills else "You have most required skills!",
-                    "Consider online courses (Coursera, Udemy, edX)",
-                    "Build projects to demonstrate skills",
-                    "Update your CV with specific examples"
-                ],
-                "message": f"Skill gap analysis for {target_role} complete"
+                "has_data": False,
+                "message": "No CV found. Complete CV Analysis to analyze skill gaps!"
             }
 
-        except Exception as e:
-            if attempt < max_retries - 1:
-                time.sleep(0.5)
-                continue
+        latest_cv = cv_reports[0]
+        cv_content = latest_cv.get('content', '')
 
-            return {
-                "success": False,
-                "error": f"Failed to analyze skill gaps: {str(e)}"
-            }
+        # Find matching role skills
+        role = ROLE_CATALOG.get(target_role)
+        required_skills = role["skills"] if role else []
 
-    return {"success": False, "error": "Max retries reached"}
+        if not required_skills:
+            required_skills = ["Domain Knowledge", "Communication", "Problem Solving", "Technical Skills", "Leadership"]
 
+        # Gap analysis (skills and their synonyms mentioned in the CV, on word boundaries)
+        existing_skills, missing_skills = ROLE_CATALOG.match_skills(required_skills, cv_content)
 
-@observe(name="get_career_roadmap")
-def get_career_roadmap(user_id: str, target_role: str, timeframe: str = "1 year", max_retries: int = 3) -> Dict[str, Any]:
-    """Generate career roadmap with retry logic and Langfuse monitoring"""
-
-    for attempt in range(max_retries):
-        try:
-            cv_reports = load_reports(user_id, "professional_cv")
-            quiz_reports = load_reports(user_id, "professional_career_quiz")
-
-            has_cv = len(cv_reports) > 0 if cv_reports else False
-            has_quiz = len(quiz_reports) > 0 if quiz_reports else False
-
-            # Generate roadmap phases
-            if "6 month" in timeframe.lower():
-                phases = [
-                    {"phase": "Month 1-2", "focus": "Skill Assessment & Learning Plan", "actions": ["Identify skill gaps", "Enroll in 1-2 key courses", "Start building portfolio"]},
-                    {"phase": "Month 3-4", "focus": "Skill Development", "actions": ["Complete courses", "Build 2-3 projects", "Network on LinkedIn"]},
-                    {"phase": "Month 5-6", "focus": "Job Search & Application", "actions": ["Update CV", "Apply to positions", "Practice interviews"]}
-                ]
-            elif "2 year" in timeframe.lower():
-                phases = [
-                    {"phase": "Months 1-6", "focus": "Foundation Building", "actions": ["Complete certifications", "Build strong portfolio", "Gain experience"]},
-                    {"phase": "Months 7-12", "focus": "Intermediate Growth", "actions": ["Take on complex projects", "Develop leadership skills", "Expand network"]},
-                    {"phase": "Months 13-18", "focus": "Advanced Development", "actions": ["Specialize in niche area", "Mentor others", "Build personal brand"]},
-                    {"phase": "Months 19-24", "focus": "Transition & Positioning", "actions": ["Target dream companies", "Negotiate offers", "Make strategic move"]}
-                ]
-            else:  # Default 1 year
-                phases = [
-                    {"phase": "Month 1-3", "focus": "Skill Assessment & Learning", "actions": ["Complete skill gap analysis", "Enroll in key courses", "Start portfolio projects"]},
-                    {"phase": "Month 4-6", "focus": "Building Experience", "actions": ["Complete 3-5 projects", "Contribute to open source", "Network actively"]},
-                    {"phase": "Month 7-9", "focus": "Career Positioning", "actions": ["Update CV and LinkedIn", "Build personal brand", "Start applications"]},
-                    {"phase": "Month 10-12", "focus": "Job Search & Transition", "actions": ["Apply strategically", "Interview preparation", "Negotiate and transition"]}
-                ]
+        return {
+            "success": True,
+            "has_data": True,
+            "target_role": target_role,
+            "required_skills": required_skills,
+            "existing_skills": existing_skills,
+            "missing_skills": missing_skills,
+            "gap_percentage": round((len(missing_skills) / len(required_skills)) * 100, 1) if required_skills else 0,
+            "recommendations": [
+                f"Focus on learning: {', '.join(missing_skills[:3])}" if missing_skills else "You have most required skills!",
+                "Consider online courses (Coursera, Udemy, edX)",
+                "Build projects to demonstrate skills",
+                "Update your CV with specific examples"
+            ],
+            "message": f"Skill gap analysis for {target_role} complete"
+        }
 
-            return {
-                "success": True,
-                "target_role": target_role,
-                "timeframe": timeframe,
-                "has_cv": has_cv,
-                "has_quiz": has_quiz,
-                "roadmap_phases": phases,
-                "key_milestones": [
-                    f"Learn core {target_role} skills",
-                    "Build portfolio demonstrating expertise",
-                    "Expand professional network",
-                    f"Land position in {target_role}"
-                ],
-                "message": f"Career roadmap to {target_role} in {timeframe}"
-            }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to analyze skill gaps: {str(e)}"
+        }
 
-        except Exception as e:
-            if attempt < max_retries - 1:
-                time.sleep(0.5)
-                continue
 
-            return {
-                "success": False,
-                "error": f"Failed to generate roadmap: {str(e)}"
-            }
+@observe(name="get_career_roadmap")
+def get_career_roadmap(user_id: str, target_role: str, timeframe: str = "1 year") -> Dict[str, Any]:
+    """Generate career roadmap with Langfuse monitoring"""
 
-    return {"success": False, "error": "Max retries reached"}
+    try:
+        context = professional_context(user_id)
+        cv_reports = context.reports("professional_cv")
+        quiz_reports = context.reports("professional_career_quiz")
+        role = ROLE_CATALOG.get(target_role)
+
+        has_cv = len(cv_reports) > 0 if cv_reports else False
+        has_quiz = len(quiz_reports) > 0 if quiz_reports else False
+
+        # Generate roadmap phases
+        if "6 month" in timeframe.lower():
+            phases = [
+                {"phase": "Month 1-2", "focus": "Skill Assessment & Learning Plan", "actions": ["Identify skill gaps", "Enroll in 1-2 key courses", "Start building portfolio"]},
+                {"phase": "Month 3-4", "focus": "Skill Development", "actions": ["Complete courses", "Build 2-3 projects", "Network on LinkedIn"]},
+                {"phase": "Month 5-6", "focus": "Job Search & Application", "actions": ["Update CV", "Apply to positions", "Practice interviews"]}
+            ]
+        elif "2 year" in timeframe.lower():
+            phases = [
+                {"phase": "Months 1-6", "focus": "Foundation Building", "actions": ["Complete certifications", "Build strong portfolio", "Gain experience"]},
+                {"phase": "Months 7-12", "focus": "Intermediate Growth", "actions": ["Take on complex projects", "Develop leadership skills", "Expand network"]},
+                {"phase": "Months 13-18", "focus": "Advanced Development", "actions": ["Specialize in niche area", "Mentor others", "Build personal brand"]},
+                {"phase": "Months 19-24", "focus": "Transition & Positioning", "actions": ["Target dream companies", "Negotiate offers", "Make strategic move"]}
+            ]
+        else:  # Default 1 year
+            phases = [
+                {"phase": "Month 1-3", "focus": "Skill Assessment & Learning", "actions": ["Complete skill gap analysis", "Enroll in key courses", "Start portfolio projects"]},
+                {"phase": "Month 4-6", "focus": "Building Experience", "actions": ["Complete 3-5 projects", "Contribute to open source", "Network actively"]},
+                {"phase": "Month 7-9", "focus": "Career Positioning", "actions": ["Update CV and LinkedIn", "Build personal brand", "Start applications"]},
+                {"phase": "Month 10-12", "focus": "Job Search & Transition", "actions": ["Apply strategically", "Interview preparation", "Negotiate and transition"]}
+            ]
+
+        return {
+            "success": True,
+            "target_role": target_role,
+            "timeframe": timeframe,
+            "has_cv": has_cv,
+            "has_quiz": has_quiz,
+            "roadmap_phases": phases,
+            "seniority_ladder": role["ladder"] if role else [],
+            "key_milestones": [
+                f"Learn core {target_role} skills",
+                "Build portfolio demonstrating expertise",
+                "Expand professional network",
+                f"Land position in {target_role}"
+            ],
+            "message": f"Career roadmap to {target_role} in {timeframe}"
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to generate roadmap: {str(e)}"
+        }
 
 
 @observe(name="compare_career_paths")
-def compare_career_paths(user_id: str, career_options: List[str], max_retries: int = 3) -> Dict[str, Any]:
-    """Compare multiple career paths with retry logic and Langfuse monitoring"""
+def compare_career_paths(user_id: str, career_options: List[str]) -> Dict[str, Any]:
+    """Compare multiple career paths with Langfuse monitoring"""
     
-    for attempt in range(max_retries):
-        try:
-            cv_reports = load_reports(user_id, "professional_cv")
-            quiz_reports = load_reports(user_id, "professional_career_quiz")
-            
-            if not cv_reports:
-                return {
-                    "success": True,
-                    "has_data": False,
-                    "message": "No CV found. Complete CV Analysis to compare career paths!"
-                }
-            
-            # Get CV content
-            cv_content = cv_reports[0].get('content', '').lower()
-            
-            # Role skill requirements
-            role_requirements = {
-                "data scientist": {
-                    "skills": ["Python", "Machine Learning", "Statistics", "SQL", "Data Visualization"],
-                    "personality": ["analytical", "detail-oriented", "problem-solver"],
-                    "growth": "High (15-20% annually)",
-                    "difficulty": "High"
-                },
-                "software engineer": {
-                    "skills": ["Programming", "Algorithms", "System Design", "Git", "Testing"],
-                    "personality": ["logical", "collaborative", "innovative"],
-                    "growth": "High (12-18% annually)",
-                    "difficulty": "Medium-High"
-                },
-                "product manager": {
-                    "skills": ["Product Strategy", "Stakeholder Management", "Analytics", "UX/UI", "Agile"],
-                    "personality": ["leadership", "communication", "strategic"],
-                    "growth": "Medium-High (10-15% annually)",
-                    "difficulty": "Medium"
-                },
-                "data analyst": {
-                    "skills": ["SQL", "Excel", "Data Visualization", "Statistics", "Python/R"],
-                    "personality": ["analytical", "detail-oriented", "communicative"],
-                    "growth": "Medium (8-12% annually)",
-                    "difficulty": "Medium"
-                },
-                "ml engineer": {
-                    "skills": ["Python", "Deep Learning", "MLOps", "Cloud Services", "Model Deployment"],
-                    "personality": ["technical", "innovative", "problem-solver"],
-                    "growth": "Very High (18-25% annually)",
-                    "difficulty": "Very High"
-                },
-                "ux designer": {
-                    "skills": ["User Research", "Wireframing", "Prototyping", "Figma", "Usability Testing"],
-                    "personality": ["creative", "empathetic", "detail-oriented"],
-                    "growth": "Medium (8-12% annually)",
-                    "difficulty": "Medium"
-                }
-            }
-            
-            comparisons = []
-            
-            for career in career_options:
-                career_lower = career.lower()
-                
-                # Find matching role
-                requirements = None
-                for role_key, role_data in role_requirements.items():
-                    if role_key in career_lower:
-                        requirements = role_data
-                        break
-                
-                if not requirements:
-                    requirements = {
-                        "skills": ["Domain Knowledge", "Communication", "Problem Solving"],
-                        "personality": ["adaptable", "motivated"],
-                        "growth": "Varies",
-                        "difficulty": "Medium"
-                    }
-                
-                # Calculate skill match
-                skills_present = sum(1 for skill in requirements["skills"] if skill.lower() in cv_content)
-                skill_match = round((skills_present / len(requirements["skills"])) * 100)
-                
-                # Overall fit score (simple calculation)
-                fit_score = min(100, skill_match + 10)  # Add 10 points for having any CV
-                
-                comparisons.append({
-                    "career": career,
-                    "fit_score": fit_score,
-                    "skill_match": f"{skills_present}/{len(requirements['skills'])} skills",
-                    "required_skills": requirements["skills"],
-                    "personality_fit": requirements["personality"],
-                    "market_growth": requirements["growth"],
-                    "difficulty": requirements["difficulty"],
-                    "pros": [
-                        f"Strong market growth: {requirements['growth']}" if "High" in requirements['growth'] else f"Stable market: {requirements['growth']}",
-                        f"You have {skills_present} relevant skills already",
-                        "Clear career progression path"
-                    ],
-                    "cons": [
-                        f"Difficulty level: {requirements['difficulty']}",
-                        f"Need to learn: {len(requirements['skills']) - skills_present} more skills",
-                        "May require additional certifications"
-                    ]
-                })
-            
-            # Sort by fit score
-            comparisons.sort(key=lambda x: x["fit_score"], reverse=True)
-            
+    try:
+        context = professional_context(user_id)
+        cv_reports = context.reports("professional_cv")
+        quiz_reports = context.reports("professional_career_quiz")
+        
+        if not cv_reports:
             return {
                 "success": True,
-                "has_data": True,
-                "career_options": career_options,
-                "comparisons": comparisons,
-                "recommendation": comparisons[0]["career"],
-                "message": f"Compared {len(career_options)} career paths"
+                "has_data": False,
+                "message": "No CV found. Complete CV Analysis to compare career paths!"
+            }
+        
+        cv_content = cv_reports[0].get('content', '')
+        
+        comparisons = []
+        
+        for career in career_options:
+            # Find matching role (roles without market data keep the generic outlook)
+            requirements = {
+                "skills": ["Domain Knowledge", "Communication", "Problem Solving"],
+                "personality": ["adaptable", "motivated"],
+                "growth": "Varies",
+                "difficulty": "Medium",
+                **(ROLE_CATALOG.get(career) or {}),
             }
             
-        except Exception as e:
-            if attempt < max_retries - 1:
-                time.sleep(0.5)
-                continue
+            # Calculate skill match
+            skills_present = len(ROLE_CATALOG.match_skills(requirements["skills"], cv_content)[0])
+            skill_match = round((skills_present / len(requirements["skills"])) * 100)
             
-            return {
-                "success": False,
-                "error": f"Failed to compare careers: {str(e)}"
-            }
-    
-    return {"success": False, "error": "Max retries reached"}
+            # Overall fit score (simple calculation)
+            fit_score = min(100, skill_match + 10)  # Add 10 points for having any CV
+            
+            comparisons.append({
+                "career": career,
+                "fit_score": fit_score,
+                "skill_match": f"{skills_present}/{len(requirements['skills'])} skills",
+                "required_skills": requirements["skills"],
+                "personality_fit": requirements["personality"],
+                "market_growth": requirements["growth"],
+                "difficulty": requirements["difficulty"],
+                "seniority_ladder": requirements.get("ladder", []),
+                "pros": [
+                    f"Strong market growth: {requirements['growth']}" if "High" in requirements['growth'] else f"Stable market: {requirements['growth']}",
+                    f"You have {skills_present} relevant skills already",
+                    "Clear career progression path"
+                ],
+                "cons": [
+                    f"Difficulty level: {requirements['difficulty']}",
+                    f"Need to learn: {len(requirements['skills']) - skills_present} more skills",
+                    "May require additional certifications"
+                ]
+            })
+        
+        # Sort by fit score
+        comparisons.sort(key=lambda x: x["fit_score"], reverse=True)
+        
+        return {
+            "success": True,
+            "has_data": True,
+            "career_options": career_options,
+            "comparisons": comparisons,
+            "recommendation": comparisons[0]["career"],
+            "message": f"Compared {len(career_options)} career paths"
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to compare careers: {str(e)}"
+        }
 
 
 @observe(name="calculate_career_readiness")
-def calculate_career_readiness(user_id: str, target_role: str, max_retries: int = 3) -> Dict[str, Any]:
-    """Calculate career readiness score with retry logic and Langfuse monitoring"""
+def calculate_career_readiness(user_id: str, target_role: str) -> Dict[str, Any]:
+    """Calculate career readiness score with Langfuse monitoring"""
     
-    for attempt in range(max_retries):
-        try:
-            cv_reports = load_reports(user_id, "professional_cv")
-            quiz_reports = load_reports(user_id, "professional_career_quiz")
-            
-            if not cv_reports:
-                return {
-                    "success": True,
-                    "has_data": False,
-                    "message": "No CV found. Complete CV Analysis to calculate readiness!"
-                }
-            
-            cv_content = cv_reports[0].get('content', '').lower()
-            
-            # Role requirements (same as above)
-            role_skills = {
-                "data scientist": ["Python", "Machine Learning", "SQL", "Statistics", "Data Visualization", "Deep Learning"],
-                "software engineer": ["Programming", "Algorithms", "System Design", "Git", "Testing", "Databases"],
-                "product manager": ["Product Strategy", "Roadmapping", "Stakeholder Management", "Analytics", "UX/UI", "Agile"],
-                "data analyst": ["SQL", "Excel", "Data Visualization", "Statistics", "Python/R", "Business Intelligence"],
-                "ml engineer": ["Python", "Deep Learning", "MLOps", "Cloud Services", "Model Deployment", "TensorFlow/PyTorch"]
-            }
-            
-            # Find matching role
-            target_lower = target_role.lower()
-            required_skills = []
-            for role, skills in role_skills.items():
-                if role in target_lower:
-                    required_skills = skills
-                    break
-            
-            if not required_skills:
-                required_skills = ["Domain Knowledge", "Communication", "Problem Solving", "Technical Skills", "Leadership", "Adaptability"]
-            
-            # Calculate scores
-            skills_present = [skill for skill in required_skills if skill.lower() in cv_content]
-            skills_missing = [skill for skill in required_skills if skill.lower() not in cv_content]
-            
-            skill_score = round((len(skills_present) / len(required_skills)) * 70)  # 70% weight on skills
-            
-            # Experience bonus (simple heuristic)
-            experience_score = 0
-            if "years" in cv_content or "experience" in cv_content:
-                experience_score = 20
-            elif cv_content.strip():
-                experience_score = 10
-            
-            # Quiz bonus
-            quiz_score = 10 if quiz_reports else 0
-            
-            # Total readiness
-            total_score = min(100, skill_score + experience_score + quiz_score)
-            
-            # Readiness level
-            if total_score >= 80:
-                readiness_level = "Highly Ready"
-                recommendation = f"You're well-prepared for {target_role}! Start applying now."
-            elif total_score >= 60:
-                readiness_level = "Moderately Ready"
-                recommendation = f"You're on the right track. Focus on {skills_missing[0] if skills_missing else 'advanced skills'} to boost readiness."
-            elif total_score >= 40:
-                readiness_level = "Developing"
-                recommendation = f"Build experience with: {', '.join(skills_missing[:3])}. Consider projects or courses."
-            else:
-                readiness_level = "Early Stage"
-                recommendation = f"Significant preparation needed. Start with fundamentals: {', '.join(skills_missing[:2])}."
-            
+    try:
+        context = professional_context(user_id)
+        cv_reports = context.reports("professional_cv")
+        quiz_reports = context.reports("professional_career_quiz")
+        
+        if not cv_reports:
             return {
                 "success": True,
-                "has_data": True,
-                "target_role": target_role,
-                "readiness_score": total_score,
-                "readiness_level": readiness_level,
-                "breakdown": {
-                    "skills": skill_score,
-                    "experience": experience_score,
-                    "personality_fit": quiz_score
-                },
-                "skills_present": skills_present,
-                "skills_missing": skills_missing,
-                "recommendation": recommendation,
-                "next_steps": [
-                    f"Learn: {skills_missing[0]}" if skills_missing else "Refine existing skills",
-                    "Build 2-3 portfolio projects" if total_score < 70 else "Polish your portfolio",
-                    "Network with professionals in the field",
-                    "Apply to entry-level positions" if total_score >= 60 else "Gain more foundational experience"
-                ],
-                "message": f"Readiness score: {total_score}% for {target_role}"
+                "has_data": False,
+                "message": "No CV found. Complete CV Analysis to calculate readiness!"
             }
-            
-        except Exception as e:
-            if attempt < max_retries - 1:
-                time.sleep(0.5)
-                continue
-            
+        
+        cv_content = cv_reports[0].get('content', '')
+        quiz_content = quiz_reports[0].get('content', '') if quiz_reports else None
+        
+        # Find matching role
+        role = ROLE_CATALOG.get(target_role)
+        required_skills = role["skills"] if role else []
+        
+        if not required_skills:
+            required_skills = ["Domain Knowledge", "Communication", "Problem Solving", "Technical Skills", "Leadership", "Adaptability"]
+        
+        # Skills (70%), experience (20%) and personality fit from the quiz (10%)
+        readiness = READINESS_ENGINE.score(
+            required_skills, cv_content, quiz_content, traits=role["personality"] if role else None
+        )
+        skills_present = readiness["skills_present"]
+        skills_missing = readiness["skills_missing"]
+        total_score = readiness["readiness_score"]
+        
+        # Readiness level
+        if total_score >= 80:
+            readiness_level = "Highly Ready"
+            recommendation = f"You're well-prepared for {target_role}! Start applying now."
+        elif total_score >= 60:
+            readiness_level = "Moderately Ready"
+            recommendation = f"You're on the right track. Focus on {skills_missing[0] if skills_missing else 'advanced skills'} to boost readiness."
+        elif total_score >= 40:
+            readiness_level = "Developing"
+            recommendation = f"Build experience with: {', '.join(skills_missing[:3])}. Consider projects or courses."
+        else:
+            readiness_level = "Early Stage"
+            recommendation = f"Significant preparation needed. Start with fundamentals: {', '.join(skills_missing[:2])}."
+        
+        return {
+            "success": True,
+            "has_data": True,
+            "target_role": target_role,
+            "readiness_score": total_score,
+            "readiness_level": readiness_level,
+            "breakdown": readiness["breakdown"],
+            "skills_present": skills_present,
+            "skills_missing": skills_missing,
+            "recommendation": recommendation,
+            "next_steps": [
+                f"Learn: {skills_missing[0]}" if skills_missing else "Refine existing skills",
+                "Build 2-3 portfolio projects" if total_score < 70 else "Polish your portfolio",
+                "Network with professionals in the field",
+                "Apply to entry-level positions" if total_score >= 60 else "Gain more foundational experience"
+            ],
+            "message": f"Readiness score: {total_score}% for {target_role}"
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to calculate readiness: {str(e)}"
+        }
+
+
+@observe(name="rank_career_readiness")
+def rank_career_readiness(user_id: str, top_n: int = 5) -> Dict[str, Any]:
+    """Rank catalog roles by readiness with Langfuse monitoring"""
+
+    try:
+        context = professional_context(user_id)
+        cv_reports = context.reports("professional_cv")
+        quiz_reports = context.reports("professional_career_quiz")
+
+        if not cv_reports:
             return {
-                "success": False,
-                "error": f"Failed to calculate readiness: {str(e)}"
+                "success": True,
+                "has_data": False,
+                "message": "No CV found. Complete CV Analysis to see which roles you're ready for!"
             }
-    
-    return {"success": False, "error": "Max retries reached"}
+
+        top_n = max(1, min(int(top_n), 15))
+        ranked = READINESS_ENGINE.rank(
+            cv_reports[0].get('content', ''),
+            quiz_reports[0].get('content', '') if quiz_reports else None,
+            top_n=top_n,
+        )
+        for entry in ranked:
+            entry["seniority_ladder"] = ROLE_CATALOG.roles[entry["role"]]["ladder"]
+            entry["family"] = ROLE_CATALOG.roles[entry["role"]]["family"]
+
+        return {
+            "success": True,
+            "has_data": True,
+            "has_quiz": bool(quiz_reports),
+            "ranked_roles": ranked,
+            "roles_scored": len(ROLE_CATALOG.roles),
+            "message": f"Top {len(ranked)} roles by readiness" + (f": {ranked[0]['role']} ({ranked[0]['readiness_score']}%)" if ranked else "")
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to rank career readiness: {str(e)}"
+        }
 
 
 # ============================================================================
@@ -484,7 +432,8 @@ FUNCTION_HANDLERS = {
     "analyze_skill_gaps": analyze_skill_gaps,
     "get_career_roadmap": get_career_roadmap,
     "compare_career_paths": compare_career_paths,
-    "calculate_career_readiness": calculate_career_readiness
+    "calculate_career_readiness": calculate_career_readiness,
+    "rank_career_readiness": rank_career_readiness
 }
 
 
@@ -519,5 +468,6 @@ PROFESSIONAL_TOOLS = types.Tool(function_declarations=[
     analyze_skill_gaps_tool,
     get_career_roadmap_tool,
     compare_career_paths_tool,
-    calculate_career_readiness_tool
+    calculate_career_readiness_tool,
+    rank_career_readiness_tool
 ])
@@ -0,0 +1,230 @@
+# services/rate_limiter.py
+# PROCESS-LEVEL TOKEN BUCKET, SINGLE-FLIGHT COALESCING AND LOGIN FAILURE WINDOWS (thread-safe, one per worker)
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when a caller waited longer than its budget for a token"""
+
+
+def percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens/second up to `capacity`.
+    Tracks queue depth and wait times so the quota can be sized from real traffic.
+    """
+
+    def __init__(self, rate: float, capacity: int, sample_size: int = 500):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+        # metrics
+        self._waiting = 0
+        self._max_waiting = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._waits_ms = deque(maxlen=sample_size)
+        self._wait_ms_total = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float | None = None) -> float:
+        """Blocking until a token is available, returns seconds waited"""
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+
+        with self._cond:
+            self._waiting += 1
+            self._max_waiting = max(self._max_waiting, self._waiting)
+            try:
+                while True:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+
+                    sleep_for = (1 - self._tokens) / self.rate
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise RateLimitTimeout(
+                                f"No rate limit token within {timeout:.1f}s "
+                                f"({self._waiting} requests queued)"
+                            )
+                        sleep_for = min(sleep_for, remaining)
+                    self._cond.wait(sleep_for)
+            finally:
+                self._waiting -= 1
+
+            waited = time.monotonic() - started
+            self._acquired += 1
+            self._waits_ms.append(waited * 1000)
+            self._wait_ms_total += waited * 1000
+            return waited
+
+    def stats(self) -> dict:
+        with self._cond:
+            waits = list(self._waits_ms)
+            return {
+                "rate_per_s": self.rate,
+                "capacity": self.capacity,
+                "queue_depth": self._waiting,
+                "max_queue_depth": self._max_waiting,
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "wait_ms_p50": round(percentile(waits, 50), 2),
+                "wait_ms_p95": round(percentile(waits, 95), 2),
+                "wait_ms_max": round(max(waits), 2) if waits else 0.0,
+                "wait_ms_total": round(self._wait_ms_total, 2),
+            }
+
+
+class _InFlight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Coalescing concurrent calls with the same key into one execution.
+    Followers block on the leader's call and share its result (or exception);
+    if the leader was interrupted (st.stop, rerun) they run the call again.
+    Nothing is cached once the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _InFlight] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _InFlight()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                if not isinstance(call.error, Exception):
+                    # the leader's script was stopped or rerun, the request itself didn't fail
+                    return self.do(key, fn)
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            # also StopException/RerunException/KeyboardInterrupt, or followers would return None
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+            }
+
+
+class FailureWindow:
+    """
+    Failed attempts per key (account, client IP) within a sliding window.
+    A key at `limit` failures is refused until its oldest failure leaves the window.
+    At most `max_keys` keys are tracked, the least recently failed are dropped first.
+    """
+
+    def __init__(self, limit: int, window_s: float, max_keys: int = 10000):
+        self.limit = limit
+        self.window_s = window_s
+        self.max_keys = max_keys
+        self._failures: OrderedDict[str, deque] = OrderedDict()
+        self._lock = threading.Lock()
+        self._refused = 0
+
+    def _recent(self, key: str, now: float) -> deque | None:
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and failures[0] <= now - self.window_s:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def retry_after(self, key: str) -> float:
+        """Seconds until `key` may try again, 0 when it isn't blocked"""
+        now = time.monotonic()
+        with self._lock:
+            failures = self._recent(key, now)
+            if failures is None or len(failures) < self.limit:
+                return 0.0
+            self._refused += 1
+            return failures[-self.limit] + self.window_s - now
+
+    def record_failure(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            failures = self._recent(key, now)
+            if failures is None:
+                failures = self._failures[key] = deque(maxlen=self.limit)
+            failures.append(now)
+            self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+
+    def reset(self, key: str):
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            blocked = sum(
+                1 for key in list(self._failures)
+                if (f := self._recent(key, now)) is not None and len(f) >= self.limit
+            )
+            return {
+                "limit": self.limit,
+                "window_s": self.window_s,
+                "tracked_keys": len(self._failures),
+                "blocked_keys": blocked,
+                "refused": self._refused,
+            }
@@ -0,0 +1,156 @@
+# services/readiness.py
+# VECTORIZED CAREER READINESS: CV AND QUIZ SCORED AGAINST EVERY CATALOG ROLE IN ONE MATRIX PRODUCT
+
+import re
+import threading
+import numpy as np
+from services.role_catalog import ROLE_CATALOG
+from services.skill_taxonomy import compile_phrases, normalize_phrase
+
+
+# score = skills (share of the role's skills found in the CV) + experience + personality fit (quiz traits)
+SKILLS_WEIGHT = 70
+EXPERIENCE_WEIGHT = 20
+PERSONALITY_WEIGHT = 10
+
+_YEARS = re.compile(r"(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+
+
+def experience_points(cv_text: str) -> int:
+    """10 for any CV, +2 per stated year of experience (full marks from 5 years)"""
+    if not cv_text or not cv_text.strip():
+        return 0
+    years = max((int(y) for y in _YEARS.findall(cv_text)), default=0)
+    if years:
+        return min(EXPERIENCE_WEIGHT, 10 + 2 * years)
+    # experience mentioned without a number of years
+    return 15 if "experience" in cv_text.lower() else 10
+
+
+def _combine(skill_fraction: np.ndarray, trait_fraction: np.ndarray, experience: int, has_quiz: bool) -> dict:
+    """Weighted components for every role at once (arrays of shape [roles])"""
+    skills = np.rint(skill_fraction * SKILLS_WEIGHT).astype(int)
+    if has_quiz:
+        # half the points for having taken the quiz, half for the role's traits showing up in it
+        personality = np.rint(PERSONALITY_WEIGHT * (0.5 + 0.5 * trait_fraction)).astype(int)
+    else:
+        personality = np.zeros_like(skills)
+    total = np.minimum(100, skills + experience + personality)
+    return {"skills": skills, "personality_fit": personality, "total": total}
+
+
+def _membership(rows: list[list[str]], index: dict[str, int]) -> np.ndarray:
+    """Row-normalised [rows x index] matrix: 1/len(row) for each item of the row"""
+    matrix = np.zeros((len(rows), len(index)), dtype=np.float32)
+    for r, items in enumerate(rows):
+        cols = [index[i] for i in items if i in index]
+        if cols:
+            matrix[r, cols] = 1.0 / len(items)
+    return matrix
+
+
+class ReadinessEngine:
+    """
+    Catalog roles as row-normalised skill and trait matrices.
+
+    A CV becomes one binary skill vector (skills found by the taxonomy scan) and
+    a quiz one binary trait vector; a single matrix-vector product per component
+    then scores every role, so ranking hundreds of roles costs about as much as one.
+    Built on first use from the role catalog.
+    """
+
+    def __init__(self, catalog=ROLE_CATALOG):
+        self.catalog = catalog
+        self._lock = threading.Lock()
+        self._built = False
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            roles = self.catalog.roles
+            self.role_names = list(roles)
+            skills = sorted({s for r in roles.values() for s in r["skills"]})
+            traits = sorted({normalize_phrase(t) for r in roles.values() for t in r["personality"]})
+            self.skill_index = {s: i for i, s in enumerate(skills)}
+            self.trait_index = {t: i for i, t in enumerate(traits)}
+            self.skill_matrix = _membership([roles[n]["skills"] for n in self.role_names], self.skill_index)
+            self.trait_matrix = _membership(
+                [[normalize_phrase(t) for t in roles[n]["personality"]] for n in self.role_names], self.trait_index
+            )
+            self._trait_regex = compile_phrases(traits)
+            self._built = True
+
+    def _skill_vector(self, cv_text: str) -> tuple[np.ndarray, frozenset]:
+        found = self.catalog.taxonomy.skills_in(cv_text or "")
+        vector = np.zeros(len(self.skill_index), dtype=np.float32)
+        vector[[self.skill_index[s] for s in found if s in self.skill_index]] = 1.0
+        return vector, found
+
+    def _trait_vector(self, quiz_text: str) -> np.ndarray:
+        vector = np.zeros(len(self.trait_index), dtype=np.float32)
+        hits = {normalize_phrase(m.group()) for m in self._trait_regex.finditer(quiz_text or "")}
+        vector[[self.trait_index[t] for t in hits]] = 1.0
+        return vector
+
+    def rank(self, cv_text: str, quiz_text: str | None = None, top_n: int = 5) -> list[dict]:
+        """Catalog roles ordered by readiness (best first), with the score breakdown of the top_n"""
+        self._ensure_built()
+        cv_vector, found = self._skill_vector(cv_text)
+        has_quiz = quiz_text is not None
+        trait_fraction = self.trait_matrix @ self._trait_vector(quiz_text) if has_quiz else np.zeros(len(self.role_names))
+        experience = experience_points(cv_text)
+        scores = _combine(self.skill_matrix @ cv_vector, trait_fraction, experience, has_quiz)
+
+        order = np.argsort(-scores["total"], kind="stable")[:top_n]
+        ranked = []
+        for i in order:
+            role = self.role_names[i]
+            required = self.catalog.roles[role]["skills"]
+            ranked.append({
+                "role": role,
+                "readiness_score": int(scores["total"][i]),
+                "breakdown": {
+                    "skills": int(scores["skills"][i]),
+                    "experience": experience,
+                    "personality_fit": int(scores["personality_fit"][i]),
+                },
+                "skills_present": [s for s in required if s in found],
+                "skills_missing": [s for s in required if s not in found],
+            })
+        return ranked
+
+    def score(
+        self,
+        required_skills: list[str],
+        cv_text: str,
+        quiz_text: str | None = None,
+        traits: list[str] | None = None,
+    ) -> dict:
+        """Same formula as rank() for one role given by its skill and trait lists (also roles outside the catalog)"""
+        present, missing = self.catalog.match_skills(required_skills, cv_text or "")
+        traits = [normalize_phrase(t) for t in traits or []]
+        has_quiz = quiz_text is not None
+        trait_hits = {normalize_phrase(m.group()) for m in compile_phrases(traits).finditer(quiz_text or "")} if traits else set()
+        experience = experience_points(cv_text)
+        scores = _combine(
+            np.array([len(present) / len(required_skills) if required_skills else 0.0]),
+            np.array([len(trait_hits) / len(traits) if traits else 0.0]),
+            experience,
+            has_quiz,
+        )
+        return {
+            "readiness_score": int(scores["total"][0]),
+            "breakdown": {
+                "skills": int(scores["skills"][0]),
+                "experience": experience,
+                "personality_fit": int(scores["personality_fit"][0]),
+            },
+            "skills_present": present,
+            "skills_missing": missing,
+        }
+
+
+READINESS_ENGINE = ReadinessEngine()
@@ -0,0 +1,235 @@
+# services/report_index.py
+# PER-USER ON-DISK VECTOR INDEX OVER CHUNKED REPORT CONTENTS (retrieval for the support chats)
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+import numpy as np
+
+
+INDEX_DIR = Path(os.getenv("REPORT_INDEX_DIR", Path(tempfile.gettempdir()) / "career_corner_index"))
+EMBEDDER = os.getenv("REPORT_INDEX_EMBEDDER", "hash")  # "hash" (local, no API calls) or "gemini"
+CHUNK_CHARS = int(os.getenv("REPORT_INDEX_CHUNK_CHARS", "800"))
+CHUNK_OVERLAP_CHARS = int(os.getenv("REPORT_INDEX_CHUNK_OVERLAP_CHARS", "120"))
+TOP_K = int(os.getenv("REPORT_INDEX_TOP_K", "4"))
+RETRIEVAL_ENABLED = os.getenv("REPORT_RETRIEVAL", "1") != "0"
+RETRIEVAL_MIN_CHARS = int(os.getenv("REPORT_RETRIEVAL_MIN_CHARS", "6000"))  # shorter contexts are sent whole
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP_CHARS) -> list[str]:
+    """Splitting on paragraph boundaries into ~size character chunks, long paragraphs with overlap"""
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text or ""):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) + 2 > size:
+            chunks.append(current)
+            current = ""
+        while len(paragraph) > size:
+            chunks.append(paragraph[:size])
+            paragraph = paragraph[size - overlap:]
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class HashingEmbedder:
+    """
+    Local bag-of-words embedding: word unigrams and bigrams hashed into `dim`
+    signed buckets, sublinear term frequency, L2-normalised. Deterministic across
+    processes (blake2b, not hash()) so vectors saved to disk stay comparable.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hash-v1-{dim}"
+
+    def _bucket(self, token: str) -> tuple[int, float]:
+        digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+        return digest % self.dim, 1.0 if (digest >> 63) & 1 else -1.0
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _TOKEN.findall(text.lower())
+            counts: dict[str, int] = {}
+            for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                col, sign = self._bucket(token)
+                vectors[row, col] += sign * (1.0 + np.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class GeminiEmbedder:
+    """Gemini text embeddings through the shared client and rate limiter"""
+
+    def __init__(self, model: str = "text-embedding-004"):
+        self.model = model
+        self.name = f"gemini-{model}"
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        from services.gemini_client import GEMINI_LIMITER, MAX_QUEUE_WAIT_S, get_genai_client
+
+        GEMINI_LIMITER.acquire(timeout=MAX_QUEUE_WAIT_S)
+        result = get_genai_client().models.embed_content(model=self.model, contents=texts)
+        vectors = np.array([e.values for e in result.embeddings], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _default_embedder():
+    return GeminiEmbedder() if EMBEDDER == "gemini" else HashingEmbedder()
+
+
+class ReportIndex:
+    """
+    One directory per user holding chunk metadata (chunks.json) and a float32
+    matrix of their embeddings (vectors.npy), rows in the same order.
+
+    Reports are added and removed incrementally as they are saved and deleted;
+    sync() repairs an index that missed changes (e.g. reports saved before the
+    index existed). Changing the embedder rebuilds an index on its next sync.
+    """
+
+    def __init__(self, root: Path = INDEX_DIR, embedder=None):
+        self.root = Path(root)
+        self.embedder = embedder or _default_embedder()
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, user_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(user_id, threading.Lock())
+
+    def _dir(self, user_id: str) -> Path:
+        # user ids are free text, never use them as a path
+        return self.root / hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:32]
+
+    def _load(self, user_id: str) -> tuple[list[dict], np.ndarray]:
+        directory = self._dir(user_id)
+        try:
+            meta = json.loads((directory / "chunks.json").read_text(encoding="utf-8"))
+            vectors = np.load(directory / "vectors.npy")
+            if meta.get("embedder") == self.embedder.name and len(meta["chunks"]) == len(vectors):
+                return meta["chunks"], vectors
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"🔴 Report index for {user_id} unreadable, rebuilding: {e}")
+        return [], np.zeros((0, 0), dtype=np.float32)
+
+    def _save(self, user_id: str, chunks: list[dict], vectors: np.ndarray):
+        directory = self._dir(user_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        # write to temp files and rename, readers never see half an index
+        with open(directory / "vectors.tmp.npy", "wb") as f:
+            np.save(f, vectors)
+        (directory / "chunks.tmp.json").write_text(
+            json.dumps({"embedder": self.embedder.name, "chunks": chunks}), encoding="utf-8"
+        )
+        os.replace(directory / "vectors.tmp.npy", directory / "vectors.npy")
+        os.replace(directory / "chunks.tmp.json", directory / "chunks.json")
+
+    def _embed_report(self, report_id: int, report_type: str, title: str, content: str) -> tuple[list[dict], np.ndarray]:
+        texts = chunk_text(content)
+        chunks = [
+            {"report_id": report_id, "report_type": report_type, "title": title, "chunk": i, "text": text}
+            for i, text in enumerate(texts)
+        ]
+        return chunks, self.embedder([f"{title}\n{text}" for text in texts]) if texts else None
+
+    def add_report(self, user_id: str, report_id: int, report_type: str, title: str, content: str):
+        new_chunks, new_vectors = self._embed_report(report_id, report_type, title, content)
+        with self._lock(user_id):
+            chunks, vectors = self._load(user_id)
+            keep = [i for i, c in enumerate(chunks) if c["report_id"] != report_id]
+            chunks, vectors = [chunks[i] for i in keep], vectors[keep]
+            if new_chunks:
+                chunks += new_chunks
+                vectors = np.vstack([vectors, new_vectors]) if len(vectors) else new_vectors
+            self._save(user_id, chunks, vectors)
+
+    def remove_report(self, user_id: str, report_id: int):
+        with self._lock(user_id):
+            chunks, vectors = self._load(user_id)
+            keep = [i for i, c in enumerate(chunks) if c["report_id"] != report_id]
+            if len(keep) != len(chunks):
+                self._save(user_id, [chunks[i] for i in keep], vectors[keep])
+
+    def sync(self, user_id: str, reports_by_type: dict[str, list[dict]]):
+        """Indexing reports missing from the index and dropping ones that no longer exist"""
+        with self._lock(user_id):
+            chunks, _ = self._load(user_id)
+        indexed = {(c["report_type"], c["report_id"]) for c in chunks}
+        current = {(t, r["id"]) for t, reports in reports_by_type.items() for r in reports}
+        for report_type, reports in reports_by_type.items():
+            for report in reports:
+                if (report_type, report["id"]) not in indexed and (report.get("content") or "").strip():
+                    self.add_report(user_id, report["id"], report_type, report.get("title", ""), report["content"])
+        for report_type, report_id in indexed - current:
+            if report_type in reports_by_type:
+                self.remove_report(user_id, report_id)
+
+    def search(self, user_id: str, query: str, k: int = TOP_K, report_ids=None) -> list[dict]:
+        """Top-k chunks by cosine similarity, optionally limited to some reports"""
+        with self._lock(user_id):
+            chunks, vectors = self._load(user_id)
+        rows = [i for i, c in enumerate(chunks) if report_ids is None or c["report_id"] in report_ids]
+        if not rows:
+            return []
+        scores = vectors[rows] @ self.embedder([query])[0]
+        # stable: with no word overlap at all the leading chunks (summaries, headers) come first
+        best = np.argsort(-scores, kind="stable")[:k]
+        return [{**chunks[rows[i]], "score": float(scores[i])} for i in best]
+
+
+def use_retrieval(*reports) -> bool:
+    """Whether the selected reports are long enough to retrieve excerpts instead of pasting them whole"""
+    return RETRIEVAL_ENABLED and sum(len((r or {}).get("content") or "") for r in reports) > RETRIEVAL_MIN_CHARS
+
+
+def format_excerpts(hits: list[dict]) -> str:
+    """Retrieved chunks as a prompt block, grouped under their report titles"""
+    if not hits:
+        return "No relevant excerpts found in their reports."
+    return "\n\n".join(f"[{h['report_type']}: {h['title']}]\n{h['text']}" for h in hits)
+
+
+REPORT_INDEX = ReportIndex()
+
+
+def retrieve_excerpts(user_id: str, query: str, reports_by_type: dict, selected_reports: list, k: int = TOP_K) -> str:
+    """Top-k chunks of the selected reports for one chat turn (whole reports if the index fails)"""
+    selected = [r for r in selected_reports if r]
+    try:
+        REPORT_INDEX.sync(user_id, reports_by_type)
+        return format_excerpts(REPORT_INDEX.search(user_id, query, k=k, report_ids={r["id"] for r in selected}))
+    except Exception as e:
+        print(f"🔴 Report retrieval failed, sending whole reports: {e}")
+        return "\n\n".join(f"[{r.get('title', 'Untitled')}]\n{r.get('content', '')}" for r in selected)
+
+
+def index_report(user_id: str, report_id: int, report_type: str, title: str, content: str):
+    """Called by save_report; an indexing failure never fails the save"""
+    try:
+        REPORT_INDEX.add_report(user_id, report_id, report_type, title, content)
+    except Exception as e:
+        print(f"🔴 Report index update failed for report {report_id}: {e}")
+
+
+def unindex_report(user_id: str, report_id: int):
+    """Called by delete_report"""
+    try:
+        REPORT_INDEX.remove_report(user_id, report_id)
+    except Exception as e:
+        print(f"🔴 Report index removal failed for report {report_id}: {e}")
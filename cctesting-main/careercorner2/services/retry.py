@@ -0,0 +1,77 @@
+# services/retry.py
+# CENTRAL RETRY POLICY FOR TRANSIENT MODEL ERRORS (429 / 5xx / timeouts)
+
+import os
+import random
+import time
+import httpx
+from google.genai import errors
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, bounded by a total deadline.
+    `timeout_s` caps each attempt; the last attempt gets whatever budget is left.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay_s: float = 0.5,
+        max_delay_s: float = 8.0,
+        deadline_s: float = 90.0,
+        timeout_s: float = 60.0,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.deadline_s = deadline_s
+        self.timeout_s = timeout_s
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform(0, min(max_delay, base * 2^attempt))"""
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * (2 ** attempt)))
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy(
+    max_attempts=int(os.getenv("GEMINI_RETRY_MAX_ATTEMPTS", "4")),
+    base_delay_s=float(os.getenv("GEMINI_RETRY_BASE_DELAY_S", "0.5")),
+    max_delay_s=float(os.getenv("GEMINI_RETRY_MAX_DELAY_S", "8")),
+    deadline_s=float(os.getenv("GEMINI_RETRY_DEADLINE_S", "90")),
+    timeout_s=float(os.getenv("GEMINI_CALL_TIMEOUT_S", "60")),
+)
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_transient(error: Exception) -> bool:
+    """Rate limits, server errors and network timeouts are worth retrying; bad requests are not"""
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError, TimeoutError, ConnectionError))
+
+
+def call_with_retry(fn, policy: RetryPolicy = DEFAULT_RETRY_POLICY):
+    """
+    Calling fn(timeout_s) until it succeeds, a non-transient error occurs,
+    attempts run out or the deadline budget is spent. fn receives the per-attempt timeout.
+    """
+    started = time.monotonic()
+    attempt = 0
+
+    while True:
+        remaining = policy.deadline_s - (time.monotonic() - started)
+        try:
+            return fn(max(1.0, min(policy.timeout_s, remaining)))
+        except Exception as e:
+            attempt += 1
+            if not is_transient(e) or attempt >= policy.max_attempts:
+                raise
+
+            delay = policy.backoff(attempt - 1)
+            remaining = policy.deadline_s - (time.monotonic() - started)
+            if delay >= remaining:
+                raise
+
+            print(f"⟳ Transient Gemini error ({e}), retry {attempt}/{policy.max_attempts - 1} in {delay:.2f}s")
+            time.sleep(delay)
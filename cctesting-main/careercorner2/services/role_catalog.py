@@ -0,0 +1,95 @@
+# services/role_catalog.py
+# OFFLINE ROLE CATALOG (skills, market outlook, seniority ladders) LOADED LAZILY FROM data/role_catalog.csv
+
+import csv
+import difflib
+import threading
+from pathlib import Path
+from services.skill_taxonomy import SKILL_SYNONYMS, SkillTaxonomy, normalize_phrase
+
+
+CATALOG_PATH = Path(__file__).parent.parent / "data" / "role_catalog.csv"
+FUZZY_CUTOFF = 0.85  # difflib ratio a misspelt role needs to count as a match
+
+_LIST_FIELDS = ("aliases", "skills", "personality", "ladder")
+
+
+def _load_roles(path: Path) -> dict[str, dict]:
+    """Parsing the catalog CSV ("|" separates list items) into {role: {field: value}}"""
+    roles = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            role = normalize_phrase(row["role"])
+            roles[role] = {
+                **{k: v for k, v in row.items() if k != "role"},
+                **{k: [item.strip() for item in row[k].split("|") if item.strip()] for k in _LIST_FIELDS},
+            }
+    return roles
+
+
+class RoleCatalog:
+    """
+    Role lookup for the professional tools.
+
+    The CSV is read and compiled on first use, not at import, so pages that never
+    call a tool don't pay for it. Roles resolve by alias first (regex scan, exact
+    words) and by fuzzy match on the words of the query second ("Data Scienist").
+    """
+
+    def __init__(self, path: Path = CATALOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._roles: dict[str, dict] | None = None
+        self._taxonomy: SkillTaxonomy | None = None
+        self._aliases: dict[str, str] = {}
+
+    def _ensure_loaded(self):
+        if self._taxonomy is not None:
+            return
+        with self._lock:
+            if self._taxonomy is not None:
+                return
+            roles = _load_roles(self.path)
+            self._aliases = {normalize_phrase(a): role for role, data in roles.items() for a in [role, *data["aliases"]]}
+            self._roles = roles
+            self._taxonomy = SkillTaxonomy(roles, SKILL_SYNONYMS)
+            print(f"🟢 Role catalog loaded: {len(roles)} roles, {len(self._aliases)} aliases")
+
+    @property
+    def taxonomy(self) -> SkillTaxonomy:
+        self._ensure_loaded()
+        return self._taxonomy
+
+    @property
+    def roles(self) -> dict[str, dict]:
+        self._ensure_loaded()
+        return self._roles
+
+    def _fuzzy_resolve(self, text: str) -> str | None:
+        words = normalize_phrase(text).split()
+        best, best_ratio = None, FUZZY_CUTOFF
+        # compare every 1-4 word window of the query against the aliases
+        for size in range(min(4, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                window = " ".join(words[start:start + size])
+                for alias in difflib.get_close_matches(window, self._aliases, n=1, cutoff=best_ratio):
+                    ratio = difflib.SequenceMatcher(None, window, alias).ratio()
+                    if ratio > best_ratio or best is None:
+                        best, best_ratio = self._aliases[alias], ratio
+        return best
+
+    def resolve(self, text: str) -> str | None:
+        """Canonical role name for a free-text role, or None if the catalog doesn't know it"""
+        if not text:
+            return None
+        return self.taxonomy.resolve_role(text) or self._fuzzy_resolve(text)
+
+    def get(self, text: str) -> dict | None:
+        role = self.resolve(text)
+        return {"role": role, **self.roles[role]} if role else None
+
+    def match_skills(self, required: list[str], cv_text: str) -> tuple[list[str], list[str]]:
+        return self.taxonomy.match(required, cv_text)
+
+
+ROLE_CATALOG = RoleCatalog()
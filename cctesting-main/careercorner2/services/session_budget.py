@@ -0,0 +1,232 @@
+# services/session_budget.py
+# PER-SESSION MEMORY BUDGET FOR ST.SESSION_STATE: SIZE TRACKING, TRIMMING, EVICTION AND SQLITE OFFLOAD
+
+import os
+import sys
+import threading
+import time
+from typing import NamedTuple
+import streamlit as st
+from utils.database import save_session_value, pop_session_value
+
+try:
+    import resource  # not available on Windows, the panel then leaves out RSS
+except ImportError:
+    resource = None
+
+
+SESSION_BUDGET_BYTES = int(os.getenv("SESSION_BUDGET_BYTES", str(2 * 1024 * 1024)))  # per session, shared objects excluded
+SESSION_COLD_RUNS = int(os.getenv("SESSION_COLD_RUNS", "10"))  # reruns without a change before an entry may be evicted
+SESSION_DEBUG_PANEL = os.getenv("SESSION_DEBUG_PANEL", "0") == "1"
+SESSION_IDLE_S = 3600  # sessions not seen for this long leave the worker-wide table
+
+_META_KEY = "_session_budget"
+
+
+class Policy(NamedTuple):
+    """
+    How one session_state key is kept within the budget:
+      shared  - object cached once per process (st.cache_resource), not counted
+      trim    - list capped to its `keep` most recent items (plus `head` leading ones)
+      drop    - deleted when cold, the pages that use it reload it from the database
+      offload - moved to SQLite when cold, restored by the page that owns it
+    A trimmed list can also be evicted when cold with `cold="drop"` or `cold="offload"`.
+    """
+    kind: str
+    keep: int = 0
+    head: int = 0
+    cold: str | None = None
+
+
+KEY_POLICIES = {
+    "universities_df": Policy("shared"),
+    "last_trace_ids": Policy("trim", keep=50),
+    "professional_trace_ids": Policy("trim", keep=50),
+    # rebuilt from the persisted chat engine (chat_sessions table) when missing
+    "student_chat_history": Policy("trim", keep=40, cold="drop"),
+    "professional_chat_history": Policy("trim", keep=40, cold="drop"),
+    # first message is the greeting; only kept in session state, so offloaded rather than dropped
+    "resources_chat_history": Policy("trim", keep=40, head=1, cold="offload"),
+    "student_resources_chat_history": Policy("trim", keep=40, head=1),
+    "university_results": Policy("offload"),
+    "intl_university_results": Policy("offload"),
+}
+
+
+def approx_size(value, _depth: int = 0) -> int:
+    """Rough deep size in bytes: DataFrames by their own accounting, containers recursively"""
+    if hasattr(value, "memory_usage") and hasattr(value, "columns"):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (str, bytes, bytearray)):
+        return sys.getsizeof(value)
+    size = sys.getsizeof(value)
+    if _depth >= 6:
+        return size
+    if isinstance(value, dict):
+        return size + sum(approx_size(k, _depth + 1) + approx_size(v, _depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(approx_size(v, _depth + 1) for v in value)
+    if hasattr(value, "__dict__"):
+        # objects kept in state (chat engines): their own data, not the clients they reference
+        return size + sum(
+            approx_size(v, _depth + 1) if isinstance(v, (str, bytes, dict, list, tuple)) else sys.getsizeof(v)
+            for v in vars(value).values()
+        )
+    return size
+
+
+def _policy(key: str) -> str:
+    return KEY_POLICIES[key].kind if key in KEY_POLICIES else "keep"
+
+
+def _eviction(key: str) -> str | None:
+    # "drop" or "offload" when the entry may leave session state once cold
+    policy = KEY_POLICIES.get(key)
+    if policy is None:
+        return None
+    if policy.kind in ("drop", "offload"):
+        return policy.kind
+    return policy.cold
+
+
+def _fingerprint(value) -> tuple:
+    # replacing or growing an entry counts as a change, reads can't be observed
+    try:
+        return id(value), len(value)
+    except TypeError:
+        return id(value), None
+
+
+class _WorkerSessions:
+    """Latest totals of every session on this worker, for the debug panel"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: dict[str, dict] = {}
+
+    def update(self, session_id: str, total: int, keys: int, offloaded: int):
+        now = time.time()
+        with self._lock:
+            self._sessions[session_id] = {"bytes": total, "keys": keys, "offloaded": offloaded, "seen": now}
+            for sid in [s for s, info in self._sessions.items() if now - info["seen"] > SESSION_IDLE_S]:
+                del self._sessions[sid]
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {sid: dict(info) for sid, info in self._sessions.items()}
+
+
+WORKER_SESSIONS = _WorkerSessions()
+
+
+def _meta(session_state) -> dict:
+    if _META_KEY not in session_state:
+        session_state[_META_KEY] = {"run": 0, "entries": {}, "offloaded": {}, "evicted": []}
+    return session_state[_META_KEY]
+
+
+def enforce_session_budget(session_state, session_id: str, budget: int = SESSION_BUDGET_BYTES) -> dict:
+    """
+    Called once at the end of every rerun.
+
+    Trims capped lists, re-measures entries that changed since the last run and,
+    while the session is over budget, evicts cold drop/offload entries largest
+    first. Returns the per-key report shown by the debug panel.
+    """
+    meta = _meta(session_state)
+    meta["run"] += 1
+    entries = meta["entries"]
+
+    for key, policy in KEY_POLICIES.items():
+        if policy.kind == "trim" and isinstance(session_state.get(key), list):
+            items = session_state[key]
+            if len(items) > policy.head + policy.keep:
+                session_state[key] = items[:policy.head] + items[-policy.keep:]
+
+    for key in list(session_state.keys()):
+        if key == _META_KEY:
+            continue
+        value = session_state[key]
+        fingerprint = _fingerprint(value)
+        entry = entries.get(key)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            entries[key] = {"fingerprint": fingerprint, "bytes": approx_size(value), "changed_run": meta["run"]}
+    for key in [k for k in entries if k not in session_state]:
+        del entries[key]
+
+    total = sum(e["bytes"] for k, e in entries.items() if _policy(k) != "shared")
+    if total > budget:
+        cold = sorted(
+            (k for k, e in entries.items()
+             if _eviction(k)
+             and meta["run"] - e["changed_run"] >= SESSION_COLD_RUNS),
+            key=lambda k: -entries[k]["bytes"],
+        )
+        for key in cold:
+            if total <= budget:
+                break
+            if _eviction(key) == "offload":
+                if not save_session_value(session_id, key, session_state[key]):
+                    continue
+                meta["offloaded"][key] = entries[key]["bytes"]
+            total -= entries[key]["bytes"]
+            meta["evicted"] = (meta["evicted"] + [key])[-20:]
+            del session_state[key]
+            del entries[key]
+            print(f"🟢 Session {session_id[:8]}: evicted {key} ({_eviction(key)})")
+
+    WORKER_SESSIONS.update(session_id, total, len(entries), len(meta["offloaded"]))
+    return {
+        "total": total,
+        "budget": budget,
+        "keys": {
+            k: {"bytes": e["bytes"], "policy": _policy(k), "idle_runs": meta["run"] - e["changed_run"]}
+            for k, e in entries.items()
+        },
+        "offloaded": dict(meta["offloaded"]),
+        "evicted": list(meta["evicted"]),
+    }
+
+
+def restore_offloaded(session_state, session_id: str, *keys: str):
+    """Bringing offloaded entries back before a page reads them (no-op for keys still in memory)"""
+    meta = _meta(session_state)
+    for key in keys:
+        if key in meta["offloaded"] and key not in session_state:
+            value = pop_session_value(session_id, key)
+            if value is not None:
+                session_state[key] = value
+            del meta["offloaded"][key]
+
+
+def _rss_bytes() -> int | None:
+    # peak RSS of the worker process (kilobytes on Linux, bytes on macOS)
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def render_session_memory_panel(report: dict):
+    """Sidebar expander with this session's entries and the worker-wide totals (SESSION_DEBUG_PANEL=1)"""
+    if not SESSION_DEBUG_PANEL:
+        return
+    with st.sidebar.expander("Session memory"):
+        st.caption(f"This session: {report['total'] / 1024:.0f} KB of {report['budget'] / 1024:.0f} KB")
+        rows = sorted(report["keys"].items(), key=lambda kv: -kv[1]["bytes"])
+        st.dataframe(
+            [{"key": k, "KB": round(v["bytes"] / 1024, 1), "policy": v["policy"], "idle reruns": v["idle_runs"]} for k, v in rows],
+            hide_index=True,
+        )
+        if report["offloaded"]:
+            st.caption("Offloaded to SQLite: " + ", ".join(report["offloaded"]))
+        if report["evicted"]:
+            st.caption("Recently evicted: " + ", ".join(report["evicted"]))
+
+        sessions = WORKER_SESSIONS.snapshot()
+        rss = _rss_bytes()
+        st.caption(
+            f"Worker: {len(sessions)} active sessions, "
+            f"{sum(s['bytes'] for s in sessions.values()) / 1024 / 1024:.1f} MB session state"
+            + (f", peak RSS {rss / 1024 / 1024:.0f} MB" if rss else "")
+        )
@@ -0,0 +1,185 @@
+# services/skill_taxonomy.py
+# ROLE ALIASES AND SKILL SYNONYMS COMPILED INTO WORD-BOUNDARY REGEXES FOR FAST, ACCURATE CV MATCHING
+
+import re
+from functools import lru_cache
+
+
+# canonical skill -> phrases that count as evidence in a CV (the skill name itself is always included)
+SKILL_SYNONYMS = {
+    "Python": ["python"],
+    # R-specific evidence only, a bare "python" already counts towards "Python"
+    "Python/R": ["r programming", "rstudio", "tidyverse", "ggplot2", "dplyr", "r shiny"],
+    "Machine Learning": ["machine learning", "ml", "scikit-learn", "sklearn"],
+    "Deep Learning": ["deep learning", "neural networks", "neural network"],
+    "TensorFlow/PyTorch": ["tensorflow", "pytorch", "keras"],
+    "SQL": ["sql", "postgresql", "mysql", "t-sql", "pl/sql"],
+    "Databases": ["database", "databases", "postgresql", "mysql", "mongodb", "sqlite"],
+    "Statistics": ["statistics", "statistical", "hypothesis testing", "regression analysis"],
+    "Data Visualization": ["data visualization", "data visualisation", "tableau", "power bi", "matplotlib", "dashboards"],
+    "Business Intelligence": ["business intelligence", "power bi", "looker", "bi reporting"],
+    "Excel": ["excel", "spreadsheets", "vba"],
+    "MLOps": ["mlops", "mlflow", "kubeflow"],
+    "Cloud Services": ["cloud services", "aws", "azure", "gcp", "google cloud"],
+    "Model Deployment": ["model deployment", "model serving", "deployed models"],
+    "Programming": ["programming", "software development", "coding"],
+    "Algorithms": ["algorithms", "data structures"],
+    "System Design": ["system design", "software architecture", "distributed systems"],
+    "Git": ["git", "github", "gitlab", "version control"],
+    "Testing": ["testing", "unit tests", "unit testing", "tdd", "pytest", "qa"],
+    "Product Strategy": ["product strategy", "product vision"],
+    "Roadmapping": ["roadmapping", "roadmap", "roadmaps", "product roadmap"],
+    "Stakeholder Management": ["stakeholder management", "stakeholders"],
+    "Analytics": ["analytics", "google analytics", "data analysis"],
+    "UX/UI": ["ux", "ui", "user experience", "user interface"],
+    "Agile": ["agile", "scrum", "kanban"],
+    "User Research": ["user research", "user interviews"],
+    "Wireframing": ["wireframing", "wireframes"],
+    "Prototyping": ["prototyping", "prototypes"],
+    "Figma/Sketch": ["figma", "sketch", "adobe xd"],
+    "Usability Testing": ["usability testing", "user testing"],
+    "Information Architecture": ["information architecture"],
+    "Digital Marketing": ["digital marketing", "online marketing"],
+    "SEO/SEM": ["seo", "sem", "search engine optimization", "google ads"],
+    "Content Strategy": ["content strategy", "content marketing"],
+    "Social Media": ["social media"],
+    "Campaign Management": ["campaign management", "campaigns"],
+    "Communication": ["communication", "presentations", "public speaking"],
+    "Problem Solving": ["problem solving", "problem-solving"],
+    "Leadership": ["leadership", "team lead", "led a team", "managed a team"],
+    "Data Pipelines": ["data pipelines", "etl", "elt", "airflow", "dbt"],
+    "Spark": ["spark", "pyspark", "databricks", "hadoop"],
+    "Data Modeling": ["data modeling", "data modelling", "data warehouse", "dimensional modeling"],
+    "APIs": ["api", "apis", "rest api", "restful", "graphql", "fastapi", "flask", "django"],
+    "JavaScript": ["javascript", "typescript", "node.js"],
+    "HTML/CSS": ["html", "css", "sass", "tailwind"],
+    "React": ["react", "react.js", "next.js", "vue", "angular"],
+    "Mobile Development": ["ios", "android", "swift", "kotlin", "flutter", "react native"],
+    "CI/CD": ["ci/cd", "continuous integration", "github actions", "jenkins", "gitlab ci"],
+    "Containers": ["docker", "kubernetes", "containers", "helm"],
+    "Linux": ["linux", "unix", "bash"],
+    "Infrastructure as Code": ["infrastructure as code", "terraform", "ansible", "cloudformation"],
+    "Monitoring": ["monitoring", "observability", "prometheus", "grafana"],
+    "Networking": ["networking", "tcp/ip", "dns", "firewalls"],
+    "Security": ["security", "cybersecurity", "siem", "owasp"],
+    "Incident Response": ["incident response", "incident management", "on-call"],
+    "Risk Assessment": ["risk assessment", "risk management", "risk analysis"],
+    "Scripting": ["scripting", "bash", "powershell", "shell scripts", "perl"],
+    "Test Automation": ["test automation", "selenium", "cypress", "playwright"],
+    "Hiring": ["hiring", "recruiting", "interviewing"],
+    "Project Planning": ["project planning", "project management", "gantt", "prince2", "pmp"],
+    "Budgeting": ["budgeting", "budget management", "budgets"],
+    "Interviewing": ["interviewing", "interviews"],
+    "Adobe Creative Suite": ["adobe creative suite", "photoshop", "illustrator", "indesign"],
+    "Typography": ["typography"],
+    "Branding": ["branding", "brand identity"],
+    "Layout Design": ["layout design", "layouts", "print design"],
+    "Copywriting": ["copywriting", "copywriter"],
+    "Editing": ["editing", "proofreading"],
+    "Negotiation": ["negotiation", "negotiating"],
+    "CRM": ["crm", "salesforce", "hubspot"],
+    "Prospecting": ["prospecting", "lead generation", "cold calling"],
+    "Relationship Building": ["relationship building", "relationship management", "client relationships"],
+    "Requirements Gathering": ["requirements gathering", "requirements analysis", "user stories"],
+    "Process Modeling": ["process modeling", "process modelling", "bpmn", "process mapping"],
+    "Financial Modeling": ["financial modeling", "financial modelling", "valuation", "dcf"],
+    "Accounting": ["accounting", "bookkeeping", "ifrs", "gaap"],
+    "Forecasting": ["forecasting", "forecasts"],
+    "Taxation": ["taxation", "tax"],
+    "Auditing": ["auditing", "audit", "audits"],
+    "Financial Reporting": ["financial reporting", "financial statements"],
+    "ERP Systems": ["erp", "sap", "oracle financials"],
+    "Recruiting": ["recruiting", "recruitment", "talent acquisition"],
+    "Employee Relations": ["employee relations", "employee engagement"],
+    "Labour Law": ["labour law", "labor law", "employment law"],
+    "HR Systems": ["hr systems", "hris", "workday"],
+    "Onboarding": ["onboarding"],
+    "Sourcing": ["sourcing", "linkedin recruiter"],
+    "Process Improvement": ["process improvement", "lean manufacturing", "six sigma", "kaizen"],
+    "Supply Chain": ["supply chain", "logistics", "procurement", "inventory management"],
+    "Lesson Planning": ["lesson planning", "lesson plans"],
+    "Classroom Management": ["classroom management"],
+    "Assessment": ["assessment", "grading"],
+    "Curriculum Design": ["curriculum design", "curriculum development"],
+    "Patient Care": ["patient care", "patients"],
+    "Clinical Assessment": ["clinical assessment", "triage"],
+    "Medication Administration": ["medication administration", "medication"],
+    "Record Keeping": ["record keeping", "documentation", "medical records"],
+    "Teamwork": ["teamwork", "team player", "collaboration"],
+}
+
+
+def normalize_phrase(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex for a character trie, so shared prefixes are only tested once per position"""
+    end = "" in node
+    branches = []
+    for char, child in sorted((k, v) for k, v in node.items() if k):
+        head = r"\s+" if char == " " else re.escape(char)
+        branches.append(head + _trie_pattern(child))
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if end:
+        # greedy optional tail, the longest phrase at a position is tried first
+        body = body + "?" if len(branches) == 1 and len(body) == 1 else "(?:" + body + ")?"
+    return body
+
+
+def compile_phrases(phrases) -> re.Pattern:
+    """
+    One case-insensitive regex matching any phrase on word boundaries
+    ("git" must not match "digital", "ml" must not match "html").
+    """
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in normalize_phrase(phrase):
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return re.compile(r"(?<!\w)(?:" + _trie_pattern(trie) + r")(?!\w)", re.IGNORECASE)
+
+
+class SkillTaxonomy:
+    """
+    Roles and skills compiled into one alternation regex each.
+
+    Detecting every known skill in a CV is a single left-to-right scan,
+    independent of how many roles share a skill.
+    """
+
+    def __init__(self, roles: dict, synonyms: dict):
+        self.roles = roles
+        self._alias_to_role = {normalize_phrase(a): role for role, data in roles.items() for a in [role, *data["aliases"]]}
+        self._role_regex = compile_phrases(self._alias_to_role)
+
+        skills = set(synonyms) | {s for data in roles.values() for s in data["skills"]}
+        self._phrase_to_skills: dict[str, set[str]] = {}
+        for skill in skills:
+            for phrase in [skill, *synonyms.get(skill, [])]:
+                self._phrase_to_skills.setdefault(normalize_phrase(phrase), set()).add(skill)
+        self._skill_regex = compile_phrases(self._phrase_to_skills)
+        # a CV is scanned once, however many tools and career options ask about it
+        self.skills_in = lru_cache(maxsize=64)(self._scan)
+
+    def resolve_role(self, text: str) -> str | None:
+        """Canonical role whose alias appears first in text (e.g. "Senior ML Engineer" -> "ml engineer")"""
+        match = self._role_regex.search(text or "")
+        return self._alias_to_role[normalize_phrase(match.group())] if match else None
+
+    def _scan(self, text: str) -> frozenset[str]:
+        """Every canonical skill with evidence in text"""
+        found = set()
+        for match in self._skill_regex.finditer(text or ""):
+            found |= self._phrase_to_skills[normalize_phrase(match.group())]
+        return frozenset(found)
+
+    def match(self, required: list[str], text: str) -> tuple[list[str], list[str]]:
+        """(present, missing) for the required skills, in their original order"""
+        found = self.skills_in(text or "")
+        present = [s for s in required if s in found]
+        missing = [s for s in required if s not in found]
+        return present, missing
@@ -4,10 +4,9 @@ import json
 from typing import Optional, List, Dict, Any
 from google.genai import types
 import pandas as pd
-from utils.database import get_saved_universities, load_reports
+from services.user_context import student_context
 from pages.university_finder import normalize_text
 from langfuse import observe
-import time
 from streamlit import session_state
 
 
@@ -94,258 +93,231 @@ get_student_data_tool = types.FunctionDeclaration(
 # ============================================================================
 
 @observe(name="search_saved_universities")
-def search_saved_universities(degree_name: str, country: str = "All", max_retries: int = 3) -> Dict[str, Any]:
-    """Search user's saved universities with retry logic and Langfuse monitoring"""
-
-    for attempt in range(max_retries):
-        try:
-            user_id = session_state.get("username", "demo_user")
-
-            saved_unis = get_saved_universities(user_id)
-
-            if not saved_unis:
-                return {
-                    "success": True,
-                    "universities": [],
-                    "message": "No saved universities found. Visit University Finder to save some!"
-                }
-
-            # Filter by country
-            if country == "Portugal":
-                saved_unis = [u for u in saved_unis if u.get('type') != 'International']
-            elif country == "International":
-                saved_unis = [u for u in saved_unis if u.get('type') == 'International']
-
-            # Search by degree name
-            normalized_search = normalize_text(degree_name)
-            matching_unis = []
-
-            for uni in saved_unis:
-                program_normalized = normalize_text(uni.get('program_name', ''))
-                if normalized_search in program_normalized:
-                    matching_unis.append({
-                        "university": uni.get('name', 'Unknown'),
-                        "program": uni.get('program_name', 'Unknown'),
-                        "location": uni.get('location', 'Unknown'),
-                        "type": uni.get('type', 'Unknown'),
-                        "grade_required": uni.get('average_grade_required', 'N/A'),
-                        "duration": uni.get('duration', 'N/A')
-                    })
+def search_saved_universities(degree_name: str, country: str = "All") -> Dict[str, Any]:
+    """Search user's saved universities with Langfuse monitoring"""
 
+    try:
+        user_id = session_state.get("username", "demo_user")
+
+        saved_unis = student_context(user_id).saved_universities
+
+        if not saved_unis:
             return {
                 "success": True,
-                "universities": matching_unis,
-                "total_saved": len(saved_unis),
-                "matching_count": len(matching_unis)
+                "universities": [],
+                "message": "No saved universities found. Visit University Finder to save some!"
             }
 
-        except Exception as e:
-            if attempt < max_retries - 1:
-                time.sleep(0.5)
-                continue
+        # Filter by country
+        if country == "Portugal":
+            saved_unis = [u for u in saved_unis if u.get('type') != 'International']
+        elif country == "International":
+            saved_unis = [u for u in saved_unis if u.get('type') == 'International']
+
+        # Search by degree name
+        normalized_search = normalize_text(degree_name)
+        matching_unis = []
+
+        for uni in saved_unis:
+            program_normalized = normalize_text(uni.get('program_name', ''))
+            if normalized_search in program_normalized:
+                matching_unis.append({
+                    "university": uni.get('name', 'Unknown'),
+                    "program": uni.get('program_name', 'Unknown'),
+                    "location": uni.get('location', 'Unknown'),
+                    "type": uni.get('type', 'Unknown'),
+                    "grade_required": uni.get('average_grade_required', 'N/A'),
+                    "duration": uni.get('duration', 'N/A')
+                })
 
-            return {
-                "success": False,
-                "error": f"Failed to search universities: {str(e)}",
-                "universities": []
-            }
+        return {
+            "success": True,
+            "universities": matching_unis,
+            "total_saved": len(saved_unis),
+            "matching_count": len(matching_unis)
+        }
 
-    return {"success": False, "error": "Max retries reached", "universities": []}
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to search universities: {str(e)}",
+            "universities": []
+        }
 
 
 @observe(name="calculate_admission_grade")
-def calculate_admission_grade(user_id: str, max_retries: int = 3) -> Dict[str, Any]:
-    """Calculate student's admission average with retry logic and Langfuse monitoring"""
+def calculate_admission_grade(user_id: str) -> Dict[str, Any]:
+    """Calculate student's admission average with Langfuse monitoring"""
 
-    for attempt in range(max_retries):
-        try:
-            grades_reports = load_reports(user_id, "grades")
+    try:
+        grades_reports = student_context(user_id).reports("grades")
 
-            if not grades_reports:
-                return {
-                    "success": True,
-                    "has_grades": False,
-                    "message": "No grades found. Complete Grades Analysis first!"
-                }
+        if not grades_reports:
+            return {
+                "success": True,
+                "has_grades": False,
+                "message": "No grades found. Complete Grades Analysis first!"
+            }
 
-            latest_report = grades_reports[0]
-            report_data = json.loads(latest_report['content'])
+        latest_report = grades_reports[0]
+        report_data = json.loads(latest_report['content'])
 
-            # CHECK FOR INTERNATIONAL STUDENTS
-            student_type = report_data.get("student_type", "portuguese")
+        # CHECK FOR INTERNATIONAL STUDENTS
+        student_type = report_data.get("student_type", "portuguese")
+        
+        if student_type == "international":
+            # International students don't have CIF
+            grades_data = report_data.get("grades_data", {})
+            subjects = grades_data.get("subjects", [])
             
-            if student_type == "international":
-                # International students don't have CIF
-                grades_data = report_data.get("grades_data", {})
-                subjects = grades_data.get("subjects", [])
-                
-                return {
-                    "success": True,
-                    "has_grades": True,
-                    "student_type": "international",
-                    "total_subjects": len(subjects),
-                    "country": grades_data.get("country", "Unknown"),
-                    "grade_scale": grades_data.get("grade_scale", "Unknown"),
-                    "subjects": subjects[:10],  # Show first 10
-                    "message": f"International student with {len(subjects)} subjects recorded from {grades_data.get('country', 'Unknown')}"
-                }
-
-            # Portuguese students - calculate CIF
-            final_cif = None
-            if "final_cif" in report_data:
-                final_cif = report_data["final_cif"]
-
-            if final_cif:
-                cif_20 = final_cif / 10.0 if final_cif > 20 else final_cif
-
-                return {
-                    "success": True,
-                    "has_grades": True,
-                    "student_type": "portuguese",
-                    "cif_200_scale": final_cif,
-                    "cif_20_scale": round(cif_20, 2),
-                    "weights_used": report_data.get("weights_used", {}),
-                    "message": f"Portuguese student - Admission average: {cif_20:.2f}/20 (CIF: {final_cif:.1f}/200)"
-                }
-            else:
-                return {
-                    "success": True,
-                    "has_grades": True,
-                    "student_type": "portuguese",
-                    "message": "Portuguese grades available but CIF not calculated yet"
-                }
-
-        except Exception as e:
-            if attempt < max_retries - 1:
-                time.sleep(0.5)
-                continue
-
             return {
-                "success": False,
-                "error": f"Failed to calculate grade: {str(e)}"
+                "success": True,
+                "has_grades": True,
+                "student_type": "international",
+                "total_subjects": len(subjects),
+                "country": grades_data.get("country", "Unknown"),
+                "grade_scale": grades_data.get("grade_scale", "Unknown"),
+                "subjects": subjects[:10],  # Show first 10
+                "message": f"International student with {len(subjects)} subjects recorded from {grades_data.get('country', 'Unknown')}"
             }
 
-    return {"success": False, "error": "Max retries reached"}
+        # Portuguese students - calculate CIF
+        final_cif = None
+        if "final_cif" in report_data:
+            final_cif = report_data["final_cif"]
 
-@observe(name="search_dges_database")
-def search_dges_database(degree_name: str, location: str = "All of Portugal", 
-                         max_results: int = 10, max_retries: int = 3) -> Dict[str, Any]:
-    """Search DGES database with retry logic and Langfuse monitoring"""
-
-    for attempt in range(max_retries):
-        try:
-
-            if "universities_df" not in session_state or session_state["universities_df"].empty:
-                return {
-                    "success": False,
-                    "error": "DGES database not loaded",
-                    "universities": []
-                }
-
-            df = session_state["universities_df"].copy()
-
-            normalized_degree = normalize_text(degree_name)
-            df["course_name_normalized"] = df["course_name"].apply(normalize_text)
-            mask = df["course_name_normalized"].str.contains(normalized_degree, case=False, na=False)
-
-            if location != "All of Portugal":
-                mask &= df["region"].eq(location)
-
-            results = df[mask].head(max_results)
-
-            if results.empty:
-                return {
-                    "success": True,
-                    "universities": [],
-                    "message": f"No universities found for '{degree_name}' in {location}"
-                }
-
-            universities = []
-            for _, row in results.iterrows():
-                universities.append({
-                    "university": row["institution_name"],
-                    "program": row["course_name"],
-                    "location": row["region"],
-                    "type": row["type"],
-                    "last_grade": f"{row['last_grade']:.1f}/20" if pd.notna(row.get('last_grade')) else "N/A",
-                    "vacancies": int(row["vacancies"]) if pd.notna(row.get("vacancies")) else "N/A"
-                })
+        if final_cif:
+            cif_20 = final_cif / 10.0 if final_cif > 20 else final_cif
 
             return {
                 "success": True,
-                "universities": universities,
-                "total_found": len(results)
+                "has_grades": True,
+                "student_type": "portuguese",
+                "cif_200_scale": final_cif,
+                "cif_20_scale": round(cif_20, 2),
+                "weights_used": report_data.get("weights_used", {}),
+                "message": f"Portuguese student - Admission average: {cif_20:.2f}/20 (CIF: {final_cif:.1f}/200)"
+            }
+        else:
+            return {
+                "success": True,
+                "has_grades": True,
+                "student_type": "portuguese",
+                "message": "Portuguese grades available but CIF not calculated yet"
             }
 
-        except Exception as e:
-            if attempt < max_retries - 1:
-                time.sleep(0.5)
-                continue
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to calculate grade: {str(e)}"
+        }
 
+@observe(name="search_dges_database")
+def search_dges_database(degree_name: str, location: str = "All of Portugal", 
+                         max_results: int = 10) -> Dict[str, Any]:
+    """Search DGES database with Langfuse monitoring"""
+
+    try:
+
+        if "universities_df" not in session_state or session_state["universities_df"].empty:
             return {
                 "success": False,
-                "error": f"Database search failed: {str(e)}",
+                "error": "DGES database not loaded",
                 "universities": []
             }
 
-    return {"success": False, "error": "Max retries reached", "universities": []}
+        df = session_state["universities_df"].copy()
 
+        normalized_degree = normalize_text(degree_name)
+        df["course_name_normalized"] = df["course_name"].apply(normalize_text)
+        mask = df["course_name_normalized"].str.contains(normalized_degree, case=False, na=False)
 
-@observe(name="get_student_profile")
-def get_student_profile(user_id: str, max_retries: int = 3) -> Dict[str, Any]:
-    """Get complete student profile with retry logic and Langfuse monitoring"""
-
-    for attempt in range(max_retries):
-        try:
-            profile = {
-                "user_id": user_id,
-                "has_grades": False,
-                "has_degree_reports": False,
-                "has_saved_universities": False,
-                "admission_average": None,
-                "saved_universities_count": 0,
-                "degree_reports_count": 0
-            }
+        if location != "All of Portugal":
+            mask &= df["region"].eq(location)
 
-            grades_reports = load_reports(user_id, "grades")
-            if grades_reports:
-                profile["has_grades"] = True
-                profile["grade_reports_count"] = len(grades_reports)
-
-                try:
-                    latest = json.loads(grades_reports[0]['content'])
-                    if "final_cif" in latest:
-                        cif = latest["final_cif"]
-                        profile["admission_average"] = cif / 10.0 if cif > 20 else cif
-                except:
-                    pass
-
-            degree_reports = load_reports(user_id, "degree")
-            if degree_reports:
-                profile["has_degree_reports"] = True
-                profile["degree_reports_count"] = len(degree_reports)
-
-            saved_unis = get_saved_universities(user_id)
-            if saved_unis:
-                profile["has_saved_universities"] = True
-                profile["saved_universities_count"] = len(saved_unis)
+        results = df[mask].head(max_results)
 
+        if results.empty:
             return {
                 "success": True,
-                "profile": profile
+                "universities": [],
+                "message": f"No universities found for '{degree_name}' in {location}"
             }
 
-        except Exception as e:
-            if attempt < max_retries - 1:
-                time.sleep(0.5)
-                continue
+        universities = []
+        for _, row in results.iterrows():
+            universities.append({
+                "university": row["institution_name"],
+                "program": row["course_name"],
+                "location": row["region"],
+                "type": row["type"],
+                "last_grade": f"{row['last_grade']:.1f}/20" if pd.notna(row.get('last_grade')) else "N/A",
+                "vacancies": int(row["vacancies"]) if pd.notna(row.get("vacancies")) else "N/A"
+            })
 
-            return {
-                "success": False,
-                "error": f"Failed to load profile: {str(e)}"
-            }
+        return {
+            "success": True,
+            "universities": universities,
+            "total_found": len(results)
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Database search failed: {str(e)}",
+            "universities": []
+        }
+
+
+@observe(name="get_student_profile")
+def get_student_profile(user_id: str) -> Dict[str, Any]:
+    """Get complete student profile with Langfuse monitoring"""
+
+    try:
+        profile = {
+            "user_id": user_id,
+            "has_grades": False,
+            "has_degree_reports": False,
+            "has_saved_universities": False,
+            "admission_average": None,
+            "saved_universities_count": 0,
+            "degree_reports_count": 0
+        }
 
-    return {"success": False, "error": "Max retries reached"}
+        context = student_context(user_id)
+        grades_reports = context.reports("grades")
+        if grades_reports:
+            profile["has_grades"] = True
+            profile["grade_reports_count"] = len(grades_reports)
+
+            try:
+                latest = json.loads(grades_reports[0]['content'])
+                if "final_cif" in latest:
+                    cif = latest["final_cif"]
+                    profile["admission_average"] = cif / 10.0 if cif > 20 else cif
+            except:
+                pass
+
+        degree_reports = context.reports("degree")
+        if degree_reports:
+            profile["has_degree_reports"] = True
+            profile["degree_reports_count"] = len(degree_reports)
+
+        saved_unis = context.saved_universities
+        if saved_unis:
+            profile["has_saved_universities"] = True
+            profile["saved_universities_count"] = len(saved_unis)
+
+        return {
+            "success": True,
+            "profile": profile
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to load profile: {str(e)}"
+        }
 
 
 # ============================================================================
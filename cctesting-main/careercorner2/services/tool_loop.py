@@ -0,0 +1,153 @@
+# services/tool_loop.py
+# FUNCTION-CALLING ORCHESTRATION: CONCURRENT TOOL CALLS, MULTIPLE ROUNDS, PER-TURN MEMOIZATION
+
+import contextvars
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from google.genai import types
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+
+MAX_TOOL_STEPS = int(os.getenv("TOOL_LOOP_MAX_STEPS", "4"))      # model rounds that may request tools per turn
+MAX_TOOL_WORKERS = int(os.getenv("TOOL_LOOP_MAX_WORKERS", "4"))  # tool calls run concurrently within a round
+
+
+class TurnMemo:
+    """
+    Results computed once per chat turn, keyed by any hashable.
+    Concurrent callers asking for the same key wait for the first one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: dict = {}
+        self.hits = 0
+
+    def get_or_call(self, key, fn):
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._results[key] = future
+            else:
+                self.hits += 1
+        if owner:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                # resolved whatever ended fn (st.stop, KeyboardInterrupt too), or waiters block forever
+                future.set_exception(e)
+                if not isinstance(e, Exception):
+                    # an interrupted call is not a result, later callers compute it again
+                    with self._lock:
+                        self._results.pop(key, None)
+                    raise
+        return future.result()
+
+    def seed(self, key, value):
+        """Pre-filling a result the caller already has (e.g. data loaded to render the page)"""
+        future = Future()
+        future.set_result(value)
+        with self._lock:
+            self._results[key] = future
+
+
+_current_memo: contextvars.ContextVar[TurnMemo | None] = contextvars.ContextVar("tool_turn_memo", default=None)
+
+
+def turn_memo(key, fn):
+    """Memoizing fn() for the rest of the current tool turn (plain call outside a turn)"""
+    memo = _current_memo.get()
+    if memo is None:
+        return fn()
+    return memo.get_or_call(key, fn)
+
+
+def _function_calls(response) -> list:
+    if not response.candidates or not response.candidates[0].content:
+        return []
+    parts = response.candidates[0].content.parts or []
+    return [p.function_call for p in parts if p.function_call and p.function_call.name]
+
+
+def _call_key(call) -> tuple:
+    return ("tool", call.name, json.dumps(dict(call.args or {}), sort_keys=True, default=str))
+
+
+def _execute_round(calls: list, execute_function_call, memo: TurnMemo) -> list:
+    """Running one round of tool calls, concurrently when there is more than one"""
+    def run(call):
+        args = dict(call.args or {})
+        return memo.get_or_call(_call_key(call), lambda: execute_function_call(call.name, args))
+
+    if len(calls) == 1:
+        return [run(calls[0])]
+
+    script_ctx = get_script_run_ctx()
+
+    def run_in_worker(call, context):
+        # tools may read st.session_state, which needs the session's script context
+        add_script_run_ctx(threading.current_thread(), script_ctx)
+        return context.run(run, call)
+
+    with ThreadPoolExecutor(max_workers=min(len(calls), MAX_TOOL_WORKERS), thread_name_prefix="tool-call") as pool:
+        futures = [pool.submit(run_in_worker, call, contextvars.copy_context()) for call in calls]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"success": False, "error": f"Function execution failed: {e}"})
+        return results
+
+
+def run_tool_loop(
+    generate,
+    contents: list,
+    execute_function_call,
+    max_steps: int = MAX_TOOL_STEPS,
+    on_tool_call=None,
+    memo_seed: dict | None = None,
+):
+    """
+    Driving a function-calling turn to its final answer.
+
+    generate(contents) returns a model response. While the model asks for tools
+    (up to max_steps rounds) the calls of a round run concurrently, their results
+    are appended to contents and the model is called again. Identical tool calls
+    and anything wrapped in turn_memo() run once per turn. on_tool_call(name) is
+    called on the caller's thread, e.g. to show a caption. memo_seed pre-fills the
+    turn memo, e.g. {user_context.memo_key: user_context}.
+    Returns the last response (still holding function calls if the budget ran out).
+    """
+    memo = TurnMemo()
+    for key, value in (memo_seed or {}).items():
+        memo.seed(key, value)
+    token = _current_memo.set(memo)
+    try:
+        response = generate(contents)
+        for step in range(max_steps):
+            calls = _function_calls(response)
+            if not calls:
+                break
+            if on_tool_call:
+                for call in calls:
+                    on_tool_call(call.name)
+
+            results = _execute_round(calls, execute_function_call, memo)
+
+            contents.append(response.candidates[0].content)
+            contents.append(types.Content(role="user", parts=[
+                types.Part.from_function_response(name=call.name, response={"result": result})
+                for call, result in zip(calls, results)
+            ]))
+            response = generate(contents)
+        else:
+            if _function_calls(response):
+                print(f"🔴 Tool loop stopped after {max_steps} rounds with calls still pending")
+        return response
+    finally:
+        _current_memo.reset(token)
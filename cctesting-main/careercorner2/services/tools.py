@@ -3,18 +3,19 @@
 import streamlit as st
 import os
 from dotenv import load_dotenv
-from google import genai
 from google.genai import types
+from services.gemini_client import get_genai_client, gated_generate_content
 
 load_dotenv()
 
-# Raw client for built-in tools
-client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+# Raw client for built-in tools (shared pooled client)
+client = get_genai_client(os.getenv("GOOGLE_API_KEY"))
 
 def get_study_resources_web(subject: str) -> dict:
     """Web search for study resources using Google Search built-in tool"""
     try:
-        response = client.models.generate_content(
+        response = gated_generate_content(
+            client,
             model="gemini-2.5-flash",
             contents=f"""Find the best free study resources for {subject}. 
 
@@ -28,7 +29,8 @@ Provide DIRECT LINKS to:
 Format as a markdown list with clickable links. Include at least 8-10 specific resources with URLs.""",
             config=types.GenerateContentConfig(
                 tools=[types.Tool(google_search=types.GoogleSearch())]
-            )
+            ),
+            feature="study_resources",
         )
 
         # Extract sources
@@ -45,7 +47,8 @@ Format as a markdown list with clickable links. Include at least 8-10 specific r
 def get_career_options(course_name: str) -> dict:
     """Get career paths using Google Search"""
     try:
-        response = client.models.generate_content(
+        response = gated_generate_content(
+            client,
             model="gemini-2.5-flash",
             contents=f"""What are the top career options and job positions for someone with a degree in {course_name}? 
 
@@ -59,7 +62,8 @@ Provide:
 Use clean markdown formatting with headers and bullet points. Do NOT use code blocks or syntax highlighting.""",
             config=types.GenerateContentConfig(
                 tools=[types.Tool(google_search=types.GoogleSearch())]
-            )
+            ),
+            feature="career_options",
         )
 
         sources = []
@@ -75,7 +79,8 @@ Use clean markdown formatting with headers and bullet points. Do NOT use code bl
 def get_wage_info(job_title: str, country: str = "Portugal") -> dict:
     """Get salary information using Google Search"""
     try:
-        response = client.models.generate_content(
+        response = gated_generate_content(
+            client,
             model="gemini-2.5-flash",
             contents=f"""What is the typical salary range for {job_title} in {country}? 
 
@@ -87,7 +92,8 @@ Provide a clear, well-formatted response with:
 Use clean markdown with headers and bullet points. Write numbers as plain text (e.g., "$85,000" not in code blocks).""",
             config=types.GenerateContentConfig(
                 tools=[types.Tool(google_search=types.GoogleSearch())]
-            )
+            ),
+            feature="wage_info",
         )
 
         sources = []
@@ -103,7 +109,8 @@ Use clean markdown with headers and bullet points. Write numbers as plain text (
 def get_job_search_results(role: str, location: str = "Portugal") -> dict:
     """Job search using Google Search built-in tool"""
     try:
-        response = client.models.generate_content(
+        response = gated_generate_content(
+            client,
             model="gemini-2.5-flash",
             contents=f"""Find current job opportunities for {role} in {location}.
 
@@ -116,7 +123,8 @@ Provide DIRECT LINKS to:
 Include at least 10 direct job links with company names and position titles. Format as a markdown list with clickable URLs.""",
             config=types.GenerateContentConfig(
                 tools=[types.Tool(google_search=types.GoogleSearch())]
-            )
+            ),
+            feature="job_search",
         )
 
         sources = []
@@ -132,7 +140,8 @@ Include at least 10 direct job links with company names and position titles. For
 def get_course_recommendations(skill: str) -> dict:
     """Course search using Google Search"""
     try:
-        response = client.models.generate_content(
+        response = gated_generate_content(
+            client,
             model="gemini-2.5-flash",
             contents=f"""Find the best online courses to learn {skill}. 
 
@@ -148,7 +157,8 @@ Provide DIRECT LINKS to courses from:
 Include both free and paid options. Format as markdown with clickable course links.""",
             config=types.GenerateContentConfig(
                 tools=[types.Tool(google_search=types.GoogleSearch())]
-            )
+            ),
+            feature="course_recommendations",
         )
 
         sources = []
@@ -166,7 +176,8 @@ def get_linkedin_profile_optimization(current_headline: str, current_about: str,
                                       target_role: str, industry: str, skills: str) -> dict:
     """LinkedIn profile optimization using Google Search"""
     try:
-        response = client.models.generate_content(
+        response = gated_generate_content(
+            client,
             model="gemini-2.5-flash",
             contents=f"""Optimize this LinkedIn profile for a {target_role} in {industry}.
 
@@ -185,7 +196,8 @@ Provide:
 Research best practices for {target_role} LinkedIn profiles. Use clean markdown formatting. Do NOT use code blocks.""",
             config=types.GenerateContentConfig(
                 tools=[types.Tool(google_search=types.GoogleSearch())]
-            )
+            ),
+            feature="linkedin_optimization",
         )
 
         sources = []
@@ -201,7 +213,8 @@ Research best practices for {target_role} LinkedIn profiles. Use clean markdown
 def get_company_research(company_name: str) -> dict:
     """Company research using Google Search"""
     try:
-        response = client.models.generate_content(
+        response = gated_generate_content(
+            client,
             model="gemini-2.5-flash",
             contents=f"""Research {company_name} and provide a comprehensive company profile.
 
@@ -248,7 +261,8 @@ FORMATTING RULES:
             config=types.GenerateContentConfig(
                 tools=[types.Tool(google_search=types.GoogleSearch())],
                 temperature=0.3  # Lower temperature for more consistent formatting
-            )
+            ),
+            feature="company_research",
         )
 
         sources = []
@@ -271,7 +285,8 @@ def fetch_job_description_from_url(url: str) -> dict:
         if not clean_url.startswith(('http://', 'https://')):
             clean_url = 'https://' + clean_url
         
-        response = client.models.generate_content(
+        response = gated_generate_content(
+            client,
             model="gemini-2.5-flash",
             contents=f"""Analyze this URL and determine if it contains a job posting or job description.
             
@@ -285,7 +300,8 @@ def fetch_job_description_from_url(url: str) -> dict:
             Be strict - only return job content if this is clearly a job listing or career opportunity.""",
             config=types.GenerateContentConfig(
                 tools=[types.Tool(url_context=types.UrlContext(url=clean_url))]
-            )
+            ),
+            feature="job_description_fetch",
         )
         
         # Check if it's not a job posting
@@ -312,7 +328,8 @@ def get_city_guide(city_name: str, country: str = "") -> dict:
     try:
         location = f"{city_name}, {country}" if country else city_name
         
-        response = client.models.generate_content(
+        response = gated_generate_content(
+            client,
             model="gemini-2.5-flash",
             contents=f"""Create a comprehensive student guide for {location}.
 
@@ -376,7 +393,8 @@ Structure your response exactly like this:
             config=types.GenerateContentConfig(
                 tools=[types.Tool(google_search=types.GoogleSearch())],
                 temperature=0.4
-            )
+            ),
+            feature="city_guide",
         )
 
         sources = []
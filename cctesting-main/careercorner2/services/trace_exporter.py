@@ -0,0 +1,224 @@
+# services/trace_exporter.py
+# BOUNDED BACKGROUND QUEUE FOR LANGFUSE EXPORT (request path only enqueues a dict)
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+
+QUEUE_SIZE = int(os.getenv("LANGFUSE_QUEUE_SIZE", "1000"))
+BATCH_SIZE = int(os.getenv("LANGFUSE_BATCH_SIZE", "50"))
+FLUSH_INTERVAL_S = float(os.getenv("LANGFUSE_FLUSH_INTERVAL_S", "1.0"))
+SHUTDOWN_TIMEOUT_S = float(os.getenv("LANGFUSE_SHUTDOWN_TIMEOUT_S", "5"))
+
+
+class LangfuseSink:
+    """
+    Writing finished records to Langfuse (v3 API) from the exporter thread.
+    Records are plain dicts with kind "generation" or "score".
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def export(self, batch: list[dict]):
+        for record in batch:
+            if record["kind"] == "score":
+                self.client.create_score(
+                    trace_id=record["trace_id"],
+                    name=record["name"],
+                    value=record["value"],
+                    comment=record.get("comment"),
+                )
+                continue
+
+            generation = self.client.start_generation(
+                trace_context={"trace_id": record["trace_id"]},
+                name=record["name"],
+                model=record.get("model"),
+                input=record.get("input"),
+                metadata=record.get("metadata"),
+            )
+            generation.update(
+                output=record.get("output"),
+                usage_details=record.get("usage_details"),
+                completion_start_time=record.get("completion_start_time"),
+                level=record.get("level"),
+                status_message=record.get("status_message"),
+            )
+            generation.update_trace(
+                name=record.get("trace_name"),
+                user_id=record.get("user_id"),
+                session_id=record.get("session_id"),
+                input=record.get("trace_input"),
+                output=record.get("trace_output"),
+            )
+            generation.end()
+
+    def flush(self):
+        self.client.flush()
+
+
+class InMemorySink:
+    """
+    Fake Langfuse sink for tests and local runs (LANGFUSE_SINK=memory).
+    Keeps every exported record; `delay_s` simulates a slow network per batch.
+    """
+
+    def __init__(self, delay_s: float = 0.0, fail: bool = False):
+        self.delay_s = delay_s
+        self.fail = fail
+        self.records: list[dict] = []
+        self.batches = 0
+        self.flushes = 0
+        self._lock = threading.Lock()
+
+    def export(self, batch: list[dict]):
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        if self.fail:
+            raise ConnectionError("InMemorySink configured to fail")
+        with self._lock:
+            self.records.extend(batch)
+            self.batches += 1
+
+    def flush(self):
+        with self._lock:
+            self.flushes += 1
+
+
+class TraceExporter:
+    """
+    Handing trace records to a sink from one daemon thread, in batches.
+
+    submit() never blocks: when the queue is full the new record is dropped
+    and counted. Pending records are flushed when the process exits.
+    """
+
+    def __init__(
+        self,
+        sink,
+        max_queue: int = QUEUE_SIZE,
+        batch_size: int = BATCH_SIZE,
+        flush_interval_s: float = FLUSH_INTERVAL_S,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+        # pending = queued + being exported, so flush() can wait for the sink too
+        self._pending = 0
+        self._idle = threading.Condition()
+
+        # metrics
+        self._submitted = 0
+        self._exported = 0
+        self._dropped = 0
+        self._failed = 0
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="langfuse-exporter", daemon=True)
+                self._worker.start()
+
+    def submit(self, record: dict) -> bool:
+        """Queueing one record, returns False if it was dropped"""
+        if self._stopping.is_set():
+            return False
+        self._ensure_worker()
+        with self._idle:
+            self._pending += 1
+            self._submitted += 1
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._idle:
+                self._pending -= 1
+                self._submitted -= 1
+                self._dropped += 1
+                dropped = self._dropped
+                self._idle.notify_all()
+            if dropped == 1 or dropped % 100 == 0:
+                print(f"🔴 Langfuse export queue full, {dropped} trace records dropped so far")
+            return False
+        return True
+
+    def _next_batch(self) -> list[dict]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval_s)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self.sink.export(batch)
+                exported, failed = len(batch), 0
+            except Exception as e:
+                exported, failed = 0, len(batch)
+                print(f"🔴 Langfuse export failed for {len(batch)} records: {e}")
+            with self._idle:
+                self._exported += exported
+                self._failed += failed
+                self._pending -= len(batch)
+                self._idle.notify_all()
+
+    def flush(self, timeout: float = SHUTDOWN_TIMEOUT_S) -> bool:
+        """Waiting until everything queued so far reached the sink, returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._pending > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        try:
+            self.sink.flush()
+        except Exception as e:
+            print(f"🔴 Langfuse flush failed: {e}")
+        return True
+
+    def shutdown(self, timeout: float = SHUTDOWN_TIMEOUT_S):
+        """Flushing pending records and stopping the worker (registered with atexit)"""
+        if self._stopping.is_set():
+            return
+        flushed = self.flush(timeout)
+        self._stopping.set()
+        if not flushed:
+            print(f"🔴 Langfuse exporter stopped with {self._pending} records unsent")
+
+    def stats(self) -> dict:
+        with self._idle:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "pending": self._pending,
+                "submitted": self._submitted,
+                "exported": self._exported,
+                "dropped": self._dropped,
+                "failed": self._failed,
+            }
+
+
+def start_exporter(sink) -> TraceExporter:
+    """Creating an exporter that flushes on process exit"""
+    exporter = TraceExporter(sink)
+    atexit.register(exporter.shutdown)
+    return exporter
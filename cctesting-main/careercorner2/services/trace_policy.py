@@ -0,0 +1,88 @@
+# services/trace_policy.py
+# PER-FEATURE TRACE SAMPLING AND PAYLOAD TRUNCATION (bounds Langfuse bandwidth and queue memory)
+
+import hashlib
+import os
+
+
+# expensive multimodal extractions send the whole file prompt once per field
+DEFAULT_SAMPLE_RATES = {
+    "cv_extraction": 0.2,
+    "grades_extraction": 0.2,
+}
+
+MAX_PAYLOAD_CHARS = int(os.getenv("TRACE_MAX_PAYLOAD_CHARS", "4000"))
+TRACE_PREVIEW_CHARS = int(os.getenv("TRACE_PREVIEW_CHARS", "300"))
+
+
+def _parse_rates(raw: str) -> dict[str, float]:
+    """Parsing "feature=rate,feature=rate" (e.g. "cv_extraction=0.1,cv_feedback=1")"""
+    rates = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        feature, rate = item.split("=", 1)
+        try:
+            rates[feature.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            print(f"🔴 Ignoring invalid trace sample rate: {item!r}")
+    return rates
+
+
+class TracePolicy:
+    """
+    Deciding which traces are exported and how much of each payload is kept.
+
+    Sampling is keyed on the trace id, so every message of a chat session
+    gets the same decision. Failed calls are always exported.
+    """
+
+    def __init__(
+        self,
+        default_rate: float = 1.0,
+        rates: dict[str, float] | None = None,
+        max_chars: int = MAX_PAYLOAD_CHARS,
+        preview_chars: int = TRACE_PREVIEW_CHARS,
+    ):
+        self.default_rate = default_rate
+        self.rates = dict(rates or {})
+        self.max_chars = max_chars
+        self.preview_chars = preview_chars
+
+    def sample_rate(self, feature: str) -> float:
+        return self.rates.get(feature, self.default_rate)
+
+    def sampled(self, feature: str, trace_id: str | None) -> bool:
+        if not trace_id:
+            return False
+        rate = self.sample_rate(feature)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        # trace ids are random hex, the first 8 digits are uniform enough
+        return int(trace_id[:8], 16) / 0xFFFFFFFF < rate
+
+    def compact(self, value, max_chars: int | None = None):
+        """Truncating long strings (recursively in dicts/lists) and tagging them with a content hash"""
+        limit = self.max_chars if max_chars is None else max_chars
+        if isinstance(value, str):
+            if len(value) <= limit:
+                return value
+            digest = hashlib.sha256(value.encode("utf-8", "replace")).hexdigest()[:16]
+            return f"{value[:limit]}… [truncated {len(value) - limit} of {len(value)} chars, sha256:{digest}]"
+        if isinstance(value, dict):
+            return {k: self.compact(v, limit) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.compact(v, limit) for v in value]
+        return value
+
+    def preview(self, value):
+        """Short form for trace-level input/output, the full payload lives on the generation"""
+        return self.compact(value, self.preview_chars)
+
+
+TRACE_POLICY = TracePolicy(
+    default_rate=float(os.getenv("TRACE_SAMPLE_RATE", "1.0")),
+    rates={**DEFAULT_SAMPLE_RATES, **_parse_rates(os.getenv("TRACE_SAMPLE_RATES", ""))},
+)
@@ -0,0 +1,55 @@
+# services/user_context.py
+# REQUEST-SCOPED SNAPSHOT OF A USER'S DATA, LOADED ONCE PER CHAT TURN FOR ALL FUNCTION-CALLING TOOLS
+
+from utils.database import load_user_data
+from services.tool_loop import turn_memo
+
+
+PROFESSIONAL_REPORT_TYPES = ("professional_cv", "professional_career_quiz")
+STUDENT_REPORT_TYPES = ("grades", "degree")
+
+
+class UserContext:
+    """Read-only view of one user's reports (newest first) and saved universities"""
+
+    def __init__(self, kind: str, user_id: str, reports: dict, saved_universities: list):
+        self.kind = kind
+        self.user_id = user_id
+        self._reports = reports
+        self.saved_universities = saved_universities
+
+    @classmethod
+    def for_professional(cls, user_id: str) -> "UserContext":
+        data = load_user_data(user_id, PROFESSIONAL_REPORT_TYPES)
+        return cls("professional", user_id, data["reports"], data["saved_universities"])
+
+    @classmethod
+    def for_student(cls, user_id: str) -> "UserContext":
+        data = load_user_data(user_id, STUDENT_REPORT_TYPES, include_universities=True)
+        return cls("student", user_id, data["reports"], data["saved_universities"])
+
+    @property
+    def memo_key(self) -> tuple:
+        """Turn memo key, so a page can hand the context it already loaded to run_tool_loop(memo_seed=...)"""
+        return ("user_context", self.kind, self.user_id)
+
+    @property
+    def reports_by_type(self) -> dict:
+        return dict(self._reports)
+
+    def reports(self, report_type: str) -> list:
+        return self._reports.get(report_type, [])
+
+    def latest(self, report_type: str) -> dict | None:
+        reports = self.reports(report_type)
+        return reports[0] if reports else None
+
+
+def professional_context(user_id: str) -> UserContext:
+    """CV and career quiz reports, shared by every tool call of the current chat turn"""
+    return turn_memo(("user_context", "professional", user_id), lambda: UserContext.for_professional(user_id))
+
+
+def student_context(user_id: str) -> UserContext:
+    """Grades and degree reports plus saved universities, shared by every tool call of the current chat turn"""
+    return turn_memo(("user_context", "student", user_id), lambda: UserContext.for_student(user_id))
@@ -0,0 +1,48 @@
+# services/user_profile.py
+# PER-SESSION CACHE OF THE LOGGED-IN USER'S CV AND QUIZ, RELOADED ONLY ON LOGIN AND AFTER SAVES
+
+from utils.database import load_user_cv, load_user_quiz, profile_version
+
+
+PROFILE_KEY = "user_profile"
+
+
+def _cv_payload(stored_cv):
+    # CVs were saved in a few shapes over time
+    if not stored_cv:
+        return None
+    if "parsed_data" in stored_cv:
+        return stored_cv["parsed_data"]
+    if "cv_data" in stored_cv:
+        return stored_cv["cv_data"]
+    return stored_cv
+
+
+def load_user_profile(session_state, user_id: str) -> bool:
+    """
+    Putting the user's stored CV and quiz into cv_data / quiz_result.
+
+    The database is read once per login and again only when save_user_cv or
+    save_quiz_result bumped the user's profile version; every other rerun is a
+    dict lookup. Returns whether the profile was (re)loaded.
+    """
+    cached = session_state.get(PROFILE_KEY)
+    # read before loading: a save that lands while we load triggers another reload
+    version = profile_version(user_id)
+    if cached and cached["user_id"] == user_id and cached["version"] == version:
+        return False
+
+    cv_data = _cv_payload(load_user_cv(user_id))
+    quiz = load_user_quiz(user_id)
+    if cv_data:
+        session_state["cv_data"] = cv_data
+    if quiz:
+        session_state["quiz_result"] = quiz
+    session_state[PROFILE_KEY] = {"user_id": user_id, "version": version}
+    return True
+
+
+def clear_user_profile(session_state):
+    """Called on logout so the next login loads its own profile"""
+    for key in (PROFILE_KEY, "cv_data", "quiz_result"):
+        session_state.pop(key, None)
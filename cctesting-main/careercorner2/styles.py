@@ -1,5 +1,8 @@
 import base64
+import hashlib
+import json
 import streamlit as st
+from functools import lru_cache
 from pathlib import Path
 
 def get_base64_image(image_path: str) -> str | None:
@@ -12,15 +15,43 @@ def get_base64_image(image_path: str) -> str | None:
 
 
 BASE_DIR = Path(__file__).parent
+STATIC_DIR = BASE_DIR / "static"
+ASSET_MANIFEST = STATIC_DIR / "assets.json"  # written by scripts/build_assets.py
 
-def apply_custom_css(
-    logo_path: str = "data/careercornerlogo2.png",
-    bg_image_path: str = "data/bg2.png",
-):
+_MIME_TYPES = {".png": "image/png", ".avif": "image/avif", ".jpg": "image/jpeg", ".webp": "image/webp"}
+
+
+@lru_cache(maxsize=1)
+def _asset_manifest() -> dict:
+    """Source image -> optimized variant in static/ (empty if the assets weren't built)"""
+    try:
+        return json.loads(ASSET_MANIFEST.read_text())
+    except Exception:
+        return {}
+
+
+def _image_url(source_path: str, relative_to_static: bool) -> str | None:
+    """
+    URL for a background image: the optimized static file when the CSS itself is
+    served from static/, otherwise a base64 data URI (optimized variant if built).
+    """
+    variant = _asset_manifest().get(source_path)
+    if variant and relative_to_static:
+        return variant
+    path = STATIC_DIR / variant if variant else BASE_DIR / source_path
+    image_base64 = get_base64_image(path)
+    if not image_base64:
+        return None
+    return f"data:{_MIME_TYPES.get(path.suffix, 'image/png')};base64,{image_base64}"
+
+
+@lru_cache(maxsize=4)
+def _build_css(bg_image_path: str, relative_to_static: bool) -> str:
+    """The app stylesheet, built once per process instead of on every rerun"""
     # main page background
-    bg_image_base64 = get_base64_image(BASE_DIR / bg_image_path)
+    bg_image_url = _image_url(bg_image_path, relative_to_static)
     background_image_css = ""
-    if bg_image_base64:
+    if bg_image_url:
         background_image_css = f"""
         .stApp::before {{
             content: "";
@@ -29,7 +60,7 @@ def apply_custom_css(
             left: 0;
             width: 100%;
             height: 100%;
-            background-image: url("data:image/png;base64,{bg_image_base64}");
+            background-image: url("{bg_image_url}");
             background-size: cover;
             background-repeat: no-repeat;
             background-position: center;
@@ -40,15 +71,15 @@ def apply_custom_css(
         }}
         """
 
-    sidebar_bg_base64 = get_base64_image(BASE_DIR / "data" / "crumpledpaper3.avif")
+    sidebar_bg_url = _image_url("data/crumpledpaper3.avif", relative_to_static)
     sidebar_image_css = ""
-    if sidebar_bg_base64:
+    if sidebar_bg_url:
         sidebar_image_css = f"""
         section[data-testid="stSidebar"]::before {{
             content: "";
             position: absolute;
             inset: 0;
-            background-image: url("data:image/avif;base64,{sidebar_bg_base64}");
+            background-image: url("{sidebar_bg_url}");
             background-size: cover;
             background-repeat: no-repeat;
             background-position: center;
@@ -58,10 +89,7 @@ def apply_custom_css(
         }}
         """
 
-
-    st.markdown(
-        f"""
-    <style>
+    return f"""
     @import url('https://fonts.googleapis.com/css2?family=DM+Sans:wght@300;400;500;600;700;800&display=swap');
 
     /* Global */
@@ -208,10 +236,36 @@ def apply_custom_css(
     #MainMenu {{visibility: hidden;}}
     footer {{visibility: hidden;}}
     
-    </style>
-    """,
-        unsafe_allow_html=True,
-    )
+    """
+
+
+@lru_cache(maxsize=4)
+def _stylesheet_href(bg_image_path: str) -> str | None:
+    """Writing the stylesheet to static/ under a content-hashed name, None if that isn't possible"""
+    css = _build_css(bg_image_path, relative_to_static=True)
+    name = f"career_corner.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:8]}.css"
+    try:
+        path = STATIC_DIR / name
+        if not path.exists():
+            STATIC_DIR.mkdir(exist_ok=True)
+            path.write_text(css, encoding="utf-8")
+        return f"app/static/{name}"
+    except OSError as e:
+        print(f"🔴 Could not write {name}, inlining CSS: {e}")
+        return None
+
+
+def apply_custom_css(
+    logo_path: str = "data/careercornerlogo2.png",
+    bg_image_path: str = "data/bg2.png",
+):
+    # with static serving each rerun only sends a one-line @import, the browser caches the rest
+    href = _stylesheet_href(bg_image_path) if st.get_option("server.enableStaticServing") else None
+    if href:
+        st.markdown(f'<style>@import url("{href}");</style>', unsafe_allow_html=True)
+    else:
+        st.markdown(f"<style>{_build_css(bg_image_path, relative_to_static=False)}</style>", unsafe_allow_html=True)
+
 
 def create_stat_card(title, value, icon="📊"):
     card_html = f"""
@@ -1,80 +1,154 @@
 import sqlite3
 import json
 import tempfile
+import threading
 from pathlib import Path
+from services.report_index import index_report, unindex_report
 DB_PATH = Path(tempfile.gettempdir()) / "career_corner.db"
 
+SCHEMA_VERSION = 4
+
+_init_lock = threading.Lock()
+_initialized_db = None  # DB_PATH this process already brought up to SCHEMA_VERSION
+
+# bumped by save_user_cv / save_quiz_result, compared by the per-session profile cache (services/user_profile.py)
+_profile_versions: dict[str, int] = {}
+_profile_lock = threading.Lock()
+
+
+def _add_cv_json_column(c):
+    # databases created before CV JSON was stored with the report
+    c.execute("PRAGMA table_info(professional_reports)")
+    if "cv_json" not in [col[1] for col in c.fetchall()]:
+        c.execute("ALTER TABLE professional_reports ADD COLUMN cv_json TEXT")
+
+
+# (version, steps): SQL strings or callables taking a cursor, each version applied once per database
+_MIGRATIONS = [
+    (1, [
+        # users table
+        """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                display_name TEXT NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                remember_token TEXT
+            )
+            """,
+        # saved_universities table
+        """
+            CREATE TABLE IF NOT EXISTS saved_universities (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                institution_name TEXT NOT NULL,
+                program_name TEXT NOT NULL,
+                location TEXT,
+                type TEXT,
+                grade_required TEXT,
+                duration TEXT,
+                acceptance_rate TEXT,
+                data TEXT NOT NULL,
+                saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(user_id, institution_name, program_name)
+            )
+            """,
+        # user_quizzes table
+        """
+            CREATE TABLE IF NOT EXISTS user_quizzes (
+                user_id TEXT PRIMARY KEY,
+                quiz_data TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        # user_cvs table
+        """
+            CREATE TABLE IF NOT EXISTS user_cvs (
+                user_id TEXT PRIMARY KEY,
+                parsed_data TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        # professional_reports table
+        """
+            CREATE TABLE IF NOT EXISTS professional_reports (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                report_type TEXT NOT NULL,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                cv_json TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+    ]),
+    (2, [
+        # chat_sessions table (compacted dashboard chat history)
+        """
+            CREATE TABLE IF NOT EXISTS chat_sessions (
+                user_id TEXT NOT NULL,
+                chat_key TEXT NOT NULL,
+                summary TEXT,
+                history TEXT NOT NULL,
+                turn INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, chat_key)
+            )
+            """,
+    ]),
+    (3, [_add_cv_json_column]),
+    (4, [
+        # session_offload table (cold session_state entries moved out of memory)
+        """
+            CREATE TABLE IF NOT EXISTS session_offload (
+                session_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (session_id, key)
+            )
+            """,
+    ]),
+]
+
+
 def init_database():
-    DB_PATH.parent.mkdir(exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
-    # users table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            display_name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            remember_token TEXT
-        )
-    """)
-
-    # saved_universities table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS saved_universities (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            institution_name TEXT NOT NULL,
-            program_name TEXT NOT NULL,
-            location TEXT,
-            type TEXT,
-            grade_required TEXT,
-            duration TEXT,
-            acceptance_rate TEXT,
-            data TEXT NOT NULL,
-            saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(user_id, institution_name, program_name)
-        )
-    """)
-
-    # user_quizzes table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS user_quizzes (
-            user_id TEXT PRIMARY KEY,
-            quiz_data TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    # user_cvs table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS user_cvs (
-            user_id TEXT PRIMARY KEY,
-            parsed_data TEXT,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    # professional_reports table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS professional_reports (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            report_type TEXT NOT NULL,
-            title TEXT NOT NULL,
-            content TEXT NOT NULL,
-            cv_json TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+    """
+    Bringing the database up to SCHEMA_VERSION once per process.
 
-    conn.commit()
-    conn.close()
+    The applied version is kept in PRAGMA user_version, so an up-to-date database
+    costs one PRAGMA read on the first call and later calls (every rerun) do no
+    database work at all.
+    """
+    global _initialized_db
+    if _initialized_db == DB_PATH:
+        return
+    with _init_lock:
+        if _initialized_db == DB_PATH:
+            return
+        DB_PATH.parent.mkdir(exist_ok=True)
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            c = conn.cursor()
+            version = c.execute("PRAGMA user_version").fetchone()[0]
+            pending = [(v, steps) for v, steps in _MIGRATIONS if v > version]
+            if pending:
+                for v, steps in pending:
+                    for step in steps:
+                        if callable(step):
+                            step(c)
+                        else:
+                            c.execute(step)
+                # PRAGMA can't take parameters, the version is our own int
+                c.execute(f"PRAGMA user_version = {pending[-1][0]}")
+                conn.commit()
+                print(f"✓ Database migrated from schema v{version} to v{pending[-1][0]}")
+        finally:
+            conn.close()
+        _initialized_db = DB_PATH
 
-    print("✓ Database initialized with reports table")
 
 # university functions
 def save_university(user_id: str, uni_data: dict) -> bool:
@@ -181,6 +255,14 @@ def clear_all_saved(user_id: str) -> bool:
         return False
 
 # CV functions
+def profile_version(user_id: str) -> int:
+    """In-process version of a user's CV and quiz, changes whenever either is saved"""
+    return _profile_versions.get(user_id, 0)
+
+def _bump_profile_version(user_id: str):
+    with _profile_lock:
+        _profile_versions[user_id] = _profile_versions.get(user_id, 0) + 1
+
 def save_user_cv(user_id: str, parsed_data: dict):
     """Save parsed CV data (modern version)"""
     try:
@@ -195,6 +277,7 @@ def save_user_cv(user_id: str, parsed_data: dict):
         """, (user_id, json.dumps(parsed_data)))
         conn.commit()
         conn.close()
+        _bump_profile_version(user_id)
     except Exception as e:
         print(f"Error saving CV: {e}")
 
@@ -228,6 +311,7 @@ def save_report(user_id: str, report_type: str, title: str, content: str, cv_dat
         report_id = c.lastrowid
         conn.commit()
         conn.close()
+        index_report(user_id, report_id, report_type, title, content)
         return report_id
     except Exception as e:
         print(f"Error saving report: {e}")
@@ -265,26 +349,13 @@ def load_reports(user_id: str, report_type: str):
         conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
         
-        # Check if cv_json column exists first (safe upgrade)
-        c.execute("PRAGMA table_info(professional_reports)")
-        columns = [col[1] for col in c.fetchall()]
-        has_cv_json = 'cv_json' in columns
-        
-        if has_cv_json:
-            c.execute("""
-                SELECT id, title, content, cv_json
-                FROM professional_reports
-                WHERE user_id = ? AND report_type = ?
-                ORDER BY id DESC
-            """, (user_id, report_type))
-        else:
-            # Fallback if column doesn't exist yet
-            c.execute("""
-                SELECT id, title, content
-                FROM professional_reports
-                WHERE user_id = ? AND report_type = ?
-                ORDER BY id DESC
-            """, (user_id, report_type))
+        # cv_json is guaranteed by the schema migrations in init_database
+        c.execute("""
+            SELECT id, title, content, cv_json
+            FROM professional_reports
+            WHERE user_id = ? AND report_type = ?
+            ORDER BY id DESC
+        """, (user_id, report_type))
         
         rows = c.fetchall()
         conn.close()
@@ -297,8 +368,8 @@ def load_reports(user_id: str, report_type: str):
                 "content": row[2],
             }
             
-            # Only add cv_data if column exists and has value
-            if has_cv_json and len(row) > 3 and row[3]:
+            # Only add cv_data if it has a value
+            if row[3]:
                 try:
                     report["cv_data"] = json.loads(row[3])
                 except:
@@ -314,14 +385,59 @@ def load_reports(user_id: str, report_type: str):
         print(f"✗ Error loading reports: {e}")
         return []
 
+def load_user_data(user_id: str, report_types: tuple, include_universities: bool = False) -> dict:
+    """
+    Loading several report types (and optionally saved universities) on one connection,
+    reports of all types in a single query. Same report shape as load_reports.
+    """
+    data = {"reports": {t: [] for t in report_types}, "saved_universities": []}
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        placeholders = ", ".join("?" for _ in report_types)
+        c.execute(f"""
+            SELECT report_type, id, title, content, cv_json
+            FROM professional_reports
+            WHERE user_id = ? AND report_type IN ({placeholders})
+            ORDER BY id DESC
+        """, (user_id, *report_types))
+        for report_type, report_id, title, content, cv_json in c.fetchall():
+            try:
+                cv_data = json.loads(cv_json) if cv_json else None
+            except:
+                cv_data = None
+            data["reports"][report_type].append({
+                "id": report_id,
+                "title": title,
+                "content": content,
+                "cv_data": cv_data,
+            })
+
+        if include_universities:
+            c.execute('SELECT data, saved_at FROM saved_universities WHERE user_id = ? ORDER BY saved_at DESC', (user_id,))
+            for uni_json, saved_at in c.fetchall():
+                uni_data = json.loads(uni_json)
+                uni_data['saved_at'] = saved_at
+                data["saved_universities"].append(uni_data)
+
+        conn.close()
+    except Exception as e:
+        print(f"Error loading user data: {e}")
+    return data
+
+
 def delete_report(report_id: int):
     try:
         conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
+        c.execute("SELECT user_id FROM professional_reports WHERE id = ?", (report_id,))
+        owner = c.fetchone()
         c.execute("DELETE FROM professional_reports WHERE id = ?", (report_id,))
         result = c.rowcount > 0
         conn.commit()
         conn.close()
+        if owner:
+            unindex_report(owner[0], report_id)
         return result
     except Exception as e:
         print(f"Error deleting report: {e}")
@@ -341,6 +457,7 @@ def save_quiz_result(user_id: str, quiz_data: dict):
         """, (user_id, json.dumps(quiz_data)))
         conn.commit()
         conn.close()
+        _bump_profile_version(user_id)
         print(f"✓ Saved quiz for user {user_id}")
         return True
     except Exception as e:
@@ -388,8 +505,97 @@ def load_career_quiz_metadata(user_id: str):
         return None
 
 
-# initialising on import
-if __name__ == "__main__":
-    init_database()
+# chat session functions
+def save_chat_session(user_id: str, chat_key: str, summary: str, history: list, turn: int) -> bool:
+    """Upserting the compacted history of one dashboard chat"""
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO chat_sessions (user_id, chat_key, summary, history, turn)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, chat_key) DO UPDATE SET
+                summary = excluded.summary,
+                history = excluded.history,
+                turn = excluded.turn,
+                updated_at = CURRENT_TIMESTAMP
+        """, (user_id, chat_key, summary, json.dumps(history), turn))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"✗ Error saving chat session: {e}")
+        return False
+
+def load_chat_session(user_id: str, chat_key: str):
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute(
+            "SELECT summary, history, turn FROM chat_sessions WHERE user_id = ? AND chat_key = ?",
+            (user_id, chat_key)
+        )
+        row = c.fetchone()
+        conn.close()
+        if row:
+            return {"summary": row[0] or "", "history": json.loads(row[1]), "turn": row[2] or 0}
+        return None
+    except Exception as e:
+        print(f"✗ Error loading chat session: {e}")
+        return None
+
+def delete_chat_session(user_id: str, chat_key: str) -> bool:
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute("DELETE FROM chat_sessions WHERE user_id = ? AND chat_key = ?", (user_id, chat_key))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"✗ Error deleting chat session: {e}")
+        return False
+
+
+# session offload functions
+def save_session_value(session_id: str, key: str, value) -> bool:
+    """Storing one session_state entry as JSON (numpy scalars become plain numbers)"""
+    try:
+        data = json.dumps(value, default=lambda o: o.item() if hasattr(o, "item") else str(o))
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO session_offload (session_id, key, value)
+            VALUES (?, ?, ?)
+            ON CONFLICT(session_id, key) DO UPDATE SET
+                value = excluded.value,
+                updated_at = CURRENT_TIMESTAMP
+        """, (session_id, key, data))
+        # sessions that ended without restoring their entries
+        c.execute("DELETE FROM session_offload WHERE updated_at < datetime('now', '-1 day')")
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"✗ Error offloading session value: {e}")
+        return False
+
+def pop_session_value(session_id: str, key: str):
+    """Loading and removing an offloaded entry, None if there is none"""
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute("SELECT value FROM session_offload WHERE session_id = ? AND key = ?", (session_id, key))
+        row = c.fetchone()
+        if row:
+            c.execute("DELETE FROM session_offload WHERE session_id = ? AND key = ?", (session_id, key))
+            conn.commit()
+        conn.close()
+        return json.loads(row[0]) if row else None
+    except Exception as e:
+        print(f"✗ Error restoring session value: {e}")
+        return None
+
 
+# initialising on import (once per process, see init_database)
 init_database()
@@ -0,0 +1,31 @@
+import importlib
+import time
+
+
+class LazyPage:
+    """
+    A page render function imported on first use.
+
+    Page modules have import-time side effects (Gemini wrappers, database init,
+    folium/reportlab/pandas imports), so the dashboards only import the page the
+    sidebar actually selected. Python caches the module afterwards.
+    """
+
+    def __init__(self, module: str, function: str):
+        self.module = module
+        self.function = function
+        self._render = None
+
+    def __call__(self, *args, **kwargs):
+        if self._render is None:
+            start = time.perf_counter()
+            self._render = getattr(importlib.import_module(self.module), self.function)
+            print(f"🟢 Loaded {self.module} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self._render(*args, **kwargs)
+
+
+def route(pages: dict[str, LazyPage], choice: str):
+    """Rendering the page registered for a sidebar choice (nothing for unknown choices)"""
+    page = pages.get(choice)
+    if page is not None:
+        page()
@@ -0,0 +1,82 @@
+import functools
+import os
+import time
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from services.metrics import record_rerun, rerun_stats
+
+RERUN_PROFILER = os.getenv("RERUN_PROFILER", "0") == "1"
+
+
+def _in_fragment_rerun() -> bool:
+    # set by Streamlit only for runs that execute fragments instead of the whole script
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return bool(ctx and ctx.fragment_ids_this_run)
+
+
+def profiled_fragment(scope: str):
+    """
+    st.fragment whose runs are timed under `scope`.
+
+    Widgets inside a fragment rerun only the fragment, so a chat turn or a quiz
+    answer doesn't re-execute zapp.py (CSS, CV/quiz loading, sidebar). Use
+    rerun_fragment() to stay inside it and st.rerun() where the whole app has
+    to change (redirects to another page or dashboard).
+
+    Only fragment reruns are recorded; when the body runs as part of a full
+    script run its time is already in the "app" scope.
+    """
+    def decorator(render):
+        @functools.wraps(render)
+        def timed(*args, **kwargs):
+            if not _in_fragment_rerun():
+                return render(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return render(*args, **kwargs)
+            finally:
+                # also runs when st.rerun()/st.stop() end the run early
+                record_rerun(scope, time.perf_counter() - start)
+        return st.fragment(timed)
+    return decorator
+
+
+def rerun_fragment():
+    """
+    st.rerun(scope="fragment") from inside a profiled_fragment.
+
+    Streamlit only allows it while the fragment itself is rerunning; when the
+    fragment body runs as part of a full script run (widget changes batched into
+    a full rerun, AppTest) the whole app is rerun instead.
+    """
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+class AppRunTimer:
+    """Full script run timing: started at the top of zapp.py, finished at the bottom (runs ended by st.stop() aren't recorded)"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+
+    def finish(self):
+        record_rerun("app", time.perf_counter() - self.start)
+
+
+def render_rerun_profile():
+    """Sidebar expander comparing full app reruns with fragment reruns (RERUN_PROFILER=1)"""
+    if not RERUN_PROFILER:
+        return
+    with st.sidebar.expander("Rerun cost"):
+        stats = rerun_stats()
+        if not stats:
+            st.caption("No runs recorded yet.")
+            return
+        st.dataframe(
+            [{"scope": scope, "runs": s["runs"], "p50 ms": round(s["p50_ms"], 1), "p95 ms": round(s["p95_ms"], 1)}
+             for scope, s in sorted(stats.items())],
+            hide_index=True,
+        )
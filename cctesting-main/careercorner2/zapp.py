@@ -1,20 +1,25 @@
 import os
 from pathlib import Path
-import sqlite3
 import pandas as pd
 import requests
 import streamlit as st
 from dotenv import load_dotenv
-from services.authentication import init_db, login_ui, register_ui, google_login_button, get_redirect_uri, DB_PATH
-from services.langfuse_helper import get_user_id
+from services.authentication import init_db, login_ui, register_ui, google_login_button, get_redirect_uri
+from services.langfuse_helper import get_user_id, get_session_id
+from services.metrics import start_metrics_server
+from services.session_budget import enforce_session_budget, render_session_memory_panel
 from pages.student_dashboard import render_student_dashboard
 from pages.professional_dashboard import render_professional_dashboard
 from styles import apply_custom_css
-from utils.database import load_user_cv, load_user_quiz
+from services.user_profile import load_user_profile, clear_user_profile
+from utils.rerun_profiler import AppRunTimer, render_rerun_profile
 import traceback
 import warnings
 warnings.filterwarnings("ignore", message=".*Session State.*|.*widget with key.*")
 
+# full script runs only; chat and quiz interactions rerun their fragment instead
+APP_RUN = AppRunTimer()
+
 
 st.set_page_config(
     page_title="Career Corner",
@@ -36,6 +41,7 @@ st.markdown(
 
 apply_custom_css()
 load_dotenv()
+start_metrics_server()
 
 if "reports" not in st.session_state:
     st.session_state.reports = {
@@ -114,11 +120,12 @@ if "code" in query_params and not st.session_state.get("logged_in", False):
             display_name = user_data.get("name", "Unknown User")
             
             # Save to database if new user
-            from services.authentication import get_user_by_username, create_user, DB_PATH
-            with sqlite3.connect(DB_PATH, check_same_thread=False) as conn:
+            from services.authentication import get_user_by_username, create_user, auth_connection
+            with auth_connection() as conn:
                 existing_user = get_user_by_username(conn, email)
-                if not existing_user:
-                    create_user(conn, username, display_name, email, "google_oauth_placeholder")
+            # hashed outside the borrowed connection, create_user takes its own
+            if not existing_user:
+                create_user(None, username, display_name, email, "google_oauth_placeholder")
 
             st.session_state.logged_in = True
             st.session_state.user = {
@@ -164,18 +171,8 @@ if not st.session_state.get("logged_in") or not st.session_state.user:
 # NOW USER IS LOGGED IN - Load their data
 if st.session_state.get("logged_in") and st.session_state.user:
     user_id = get_user_id()
-    stored_cv = load_user_cv(user_id)
-    if stored_cv:
-        if "parsed_data" in stored_cv:
-            st.session_state.cv_data = stored_cv["parsed_data"]
-        elif "cv_data" in stored_cv:
-            st.session_state.cv_data = stored_cv["cv_data"]
-        else:
-            st.session_state.cv_data = stored_cv
-
-    quiz_row = load_user_quiz(user_id)
-    if quiz_row:
-        st.session_state.quiz_result = quiz_row
+    # CV and quiz come from the database on login and after they are saved, not on every rerun
+    load_user_profile(st.session_state, user_id)
 
     with st.sidebar:
         BASE_DIR = Path(__file__).parent
@@ -188,6 +185,7 @@ if st.session_state.get("logged_in") and st.session_state.user:
             st.session_state.user_type = None
             st.session_state.user = None
             st.session_state.welcome_animated = False  # Reset animation flag
+            clear_user_profile(st.session_state)
 
         st.button("Logout", on_click=logout)
         st.markdown("---")
@@ -355,3 +353,10 @@ elif st.session_state.get("logged_in") and st.session_state.user and st.session_
 
     st.sidebar.button("← Back", on_click=reset)
     render_professional_dashboard(choice)
+
+# keeping this session's state within its memory budget (end of every rerun)
+if st.session_state.get("logged_in") and st.session_state.user:
+    render_session_memory_panel(enforce_session_budget(st.session_state, get_session_id()))
+
+APP_RUN.finish()
+render_rerun_profile()